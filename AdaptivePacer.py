@@ -0,0 +1,206 @@
+import os
+import json
+import time
+import tempfile
+import threading
+from contextlib import contextmanager
+from RateLimiter import RateLimiter
+from Metrics import get_metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 안에서만 직렬화
+    fcntl = None
+
+# 봇 확인 페이지로 판단하는 표시
+CHALLENGE_MARKERS = ('unusual traffic', 'our systems have detected', 'id="captcha-form"')
+
+# 상태 파일 경로별 잠금 (같은 파일을 쓰는 페이서끼리 공유)
+_state_locks = {}
+_state_locks_lock = threading.Lock()
+
+
+@contextmanager
+def _locked_state(state_path):
+    """
+    상태 파일 읽기-수정-쓰기 구간 잠금
+
+    같은 파일을 쓰는 페이서(출구별 페이서, 작업자 프로세스)가 서로의 호스트 항목을 덮어쓰지 않도록
+    프로세스 안에서는 경로별 잠금으로, 프로세스 사이에서는 '<상태 파일>.lock' 파일 잠금으로 직렬화한다.
+    """
+    with _state_locks_lock:
+        lock = _state_locks.setdefault(os.path.abspath(state_path), threading.Lock())
+    with lock:
+        if fcntl is None:
+            yield
+            return
+        with open(state_path + '.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class AdaptivePacer:
+    # 호스트(와 상태 파일)별로 공유되는 페이서
+    _registry = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, host='play.google.com', state_path=os.path.join("exports", ".play_pacer.json"),
+                 initial_rate=1.0, min_rate=0.1, max_rate=20.0, increase=0.5, decrease=0.5, block_pause=30):
+        """
+        응답에 따라 요청 속도를 조절하는 AIMD 방식 페이서
+
+        정상 응답이 오면 속도를 조금씩 올리고(가산 증가), 429/503이나 봇 확인
+        페이지를 받으면 속도를 크게 줄이고(승산 감소) 잠시 요청을 멈춘다.
+        학습한 속도는 파일에 저장되어 다음 실행에서 이어서 사용한다.
+        실제 대기는 호스트별 공유 RateLimiter가 담당하므로 같은 호스트로 가는
+        모든 요청(목록, 컬렉션 데이터, 상세 페이지)이 같은 속도를 따른다.
+
+        Args:
+            host: 속도를 조절할 호스트
+            state_path: 학습한 속도를 저장할 파일 (None이면 저장하지 않음)
+            initial_rate: 저장된 값이 없을 때의 초당 요청 수
+            min_rate, max_rate: 속도 범위
+            increase: 정상 응답 시 증가량 (현재 속도로 나눈 값만큼 증가)
+            decrease: 차단 시 곱할 감소 비율
+            block_pause: 차단 시 최소 대기 시간 (초, Retry-After가 더 길면 그 값)
+        """
+        self.host = host
+        self.state_path = state_path
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.block_pause = block_pause
+        self.stats = {'ok': 0, 'blocked': 0}
+        self._lock = threading.Lock()
+        self._saved_at = 0
+
+        self.rate = min(max(self._load_rate() or initial_rate, min_rate), max_rate)
+        self.limiter = RateLimiter.for_host(host)
+        self.limiter.configure(rate=self.rate, burst=1)
+
+    @classmethod
+    def for_host(cls, host, state_path=os.path.join("exports", ".play_pacer.json"), **kwargs):
+        """
+        호스트별 공유 페이서 반환 (없으면 생성)
+
+        생성자는 학습한 속도로 호스트의 공유 리미터를 다시 설정하므로, 호출마다 새로 만들면
+        다른 호출이 줄여 둔 속도가 저장된 값으로 되돌아간다. 같은 호스트에서는 이 함수로 하나를 공유한다.
+
+        Args:
+            host: 속도를 조절할 호스트
+            state_path: 학습한 속도를 저장할 파일
+            **kwargs: 처음 생성할 때 넘길 나머지 생성자 인자 (기존 페이서에는 적용하지 않음)
+        """
+        key = (host, os.path.abspath(state_path) if state_path else None)
+        with cls._registry_lock:
+            pacer = cls._registry.get(key)
+            if pacer is None:
+                pacer = cls(host=host, state_path=state_path, **kwargs)
+                cls._registry[key] = pacer
+            return pacer
+
+    def _load_rate(self):
+        if not self.state_path:
+            return None
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return float(json.load(f).get(self.host, {}).get('rate'))
+        except (OSError, ValueError, TypeError, AttributeError):
+            return None
+
+    def save(self):
+        """학습한 속도를 파일에 저장 (다른 호스트 값은 유지)"""
+        if not self.state_path:
+            return
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with _locked_state(self.state_path):
+            state = {}
+            try:
+                with open(self.state_path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                pass
+            state[self.host] = {'rate': round(self.rate, 4), 'updated_at': time.strftime('%Y-%m-%d %H:%M:%S')}
+
+            # 쓰다 만 파일을 읽지 않도록 고유한 임시 파일에 쓴 뒤 교체
+            fd, tmp_path = tempfile.mkstemp(dir=directory or '.', prefix=os.path.basename(self.state_path) + '.',
+                                            suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(state, f)
+                os.replace(tmp_path, self.state_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        self._saved_at = time.monotonic()
+
+    def wait(self):
+        """다음 요청을 보내도 될 때까지 대기"""
+        self.limiter.acquire()
+
+    @staticmethod
+    def is_challenge(response):
+        """봇 확인(차단) 페이지인지 판단"""
+        if response is None:
+            return False
+        if '/sorry/' in (response.url or ''):
+            return True
+        content_type = response.headers.get('Content-Type', '')
+        if 'html' not in content_type:
+            return False
+        head = response.text[:20000].lower()
+        return any(marker in head for marker in CHALLENGE_MARKERS)
+
+    def is_blocked(self, response):
+        return response is not None and (response.status_code in (429, 503) or self.is_challenge(response))
+
+    def record(self, response):
+        """
+        응답 결과를 반영해 속도 조절
+
+        Returns:
+            bool: 차단으로 판단했으면 True
+        """
+        blocked = self.is_blocked(response)
+        with self._lock:
+            if blocked:
+                self.stats['blocked'] += 1
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                pause = max(self.block_pause, self._retry_after(response))
+            elif response is not None and response.status_code < 400:
+                self.stats['ok'] += 1
+                self.rate = min(self.max_rate, self.rate + self.increase / max(self.rate, 1.0))
+                pause = 0
+            else:
+                return False
+            self.limiter.configure(rate=self.rate)
+            # 저장 시점 판단과 갱신을 잠금 안에서 처리해 주기마다 한 스레드만 저장
+            save_due = blocked or time.monotonic() - self._saved_at > 10
+            if save_due:
+                self._saved_at = time.monotonic()
+
+        get_metrics().set('pacer_rate', round(self.rate, 4), host=self.host)
+        if blocked:
+            get_metrics().increment('blocked_responses_total', host=self.host, status=response.status_code)
+            print(f"차단 응답 감지 ({response.status_code}): 속도 {self.rate:.2f}/s로 감소, {pause:.0f}초 대기")
+            self.limiter.pause(pause)
+        if save_due:
+            try:
+                self.save()
+            except OSError as e:
+                # 상태 저장 실패가 요청 처리까지 실패시키지 않도록 기록만 함
+                print(f"페이서 상태 저장 실패 ({self.state_path}): {e}")
+        return blocked
+
+    def _retry_after(self, response):
+        try:
+            return float(response.headers.get('Retry-After', 0))
+        except (TypeError, ValueError):
+            return 0
@@ -0,0 +1,225 @@
+import numpy as np
+import pandas as pd
+from SnapshotStore import SnapshotStore, ENTRY_COLUMNS
+
+# 차트 하나를 구분하는 열
+CHART_KEYS = ['store', 'country', 'chart']
+SNAPSHOT_KEYS = CHART_KEYS + ['taken_at']
+
+
+class Analytics:
+    def __init__(self, entries):
+        """
+        여러 스냅샷에 걸친 차트 분석 (pandas/NumPy 벡터 연산)
+
+        모든 결과는 출력하지 않고 DataFrame으로 반환한다.
+        입력은 SnapshotStore.fetch_entries 결과를 열 단위로 만든 DataFrame이며,
+        보통 from_store로 생성한다.
+
+        Args:
+            entries: ENTRY_COLUMNS 열을 가진 DataFrame
+        """
+        self.entries = self._prepare(entries)
+        self._movement = None
+
+    @classmethod
+    def from_store(cls, snapshot_store=None, stores=None, countries=None, charts=None, since=None, until=None):
+        """
+        SnapshotStore에서 조건에 맞는 스냅샷을 모두 불러와 생성
+
+        Args:
+            snapshot_store: SnapshotStore (기본값: exports/snapshots.db)
+            stores, countries, charts: 포함할 값 목록 (None이면 전체)
+            since, until: 조회 구간 ('YYYY-MM-DD HH:MM:SS' 형식 문자열)
+        """
+        snapshot_store = snapshot_store or SnapshotStore()
+        rows = snapshot_store.fetch_entries(stores, countries, charts, since, until)
+        return cls(pd.DataFrame.from_records(rows, columns=ENTRY_COLUMNS))
+
+    @classmethod
+    def from_records(cls, apps, store, country, chart, taken_at):
+        """스크래퍼 결과 리스트 하나로 생성 (저장하지 않은 단일 실행 분석용)"""
+        frame = pd.DataFrame([{
+            'app_id': str(app.get('app_id')), 'rank': app.get('rank') or i, 'name': app.get('name'),
+            'developer': app.get('artist') or app.get('developer'), 'category': app.get('category'),
+            'price': app.get('price'), 'rating': app.get('rating'), 'rating_count': app.get('rating_count'),
+            'version': app.get('version')
+        } for i, app in enumerate(apps, 1) if app.get('app_id')], columns=ENTRY_COLUMNS[4:])
+        frame.insert(0, 'taken_at', taken_at)
+        frame.insert(0, 'chart', chart)
+        frame.insert(0, 'country', country)
+        frame.insert(0, 'store', store)
+        return cls(frame)
+
+    @staticmethod
+    def _prepare(entries):
+        """열 타입 정리 (반복되는 문자열은 category, 숫자는 NaN 허용 실수)"""
+        entries = entries.copy()
+        for column in ('store', 'country', 'chart', 'category'):
+            entries[column] = entries[column].astype(object).fillna('Unknown').astype('category')
+        entries['taken_at'] = pd.to_datetime(entries['taken_at'])
+        entries['app_id'] = entries['app_id'].astype(str)
+        entries['rank'] = entries['rank'].astype('int32')
+        entries['rating'] = pd.to_numeric(entries['rating'], errors='coerce')
+        entries['rating_count'] = pd.to_numeric(entries['rating_count'], errors='coerce')
+        return entries
+
+    def snapshots(self):
+        """차트별 스냅샷 목록과 앱 수"""
+        return (self.entries.groupby(SNAPSHOT_KEYS, observed=True)
+                .size().rename('apps').reset_index()
+                .sort_values(SNAPSHOT_KEYS, ignore_index=True))
+
+    def category_share(self, per_snapshot=False):
+        """
+        카테고리 점유율
+
+        Args:
+            per_snapshot: True면 스냅샷별 값, False면 차트별로 스냅샷 평균
+
+        Returns:
+            DataFrame: store, country, chart, [taken_at,] category, apps, share
+        """
+        counts = (self.entries.groupby(SNAPSHOT_KEYS + ['category'], observed=True)
+                  .size().rename('apps').reset_index())
+        totals = counts.groupby(SNAPSHOT_KEYS, observed=True)['apps'].transform('sum')
+        counts['share'] = counts['apps'] / totals
+        if per_snapshot:
+            return counts.sort_values(SNAPSHOT_KEYS + ['share'], ascending=[True] * 4 + [False], ignore_index=True)
+
+        # 스냅샷에 없던 카테고리는 0으로 보고 평균
+        snapshot_count = counts.groupby(CHART_KEYS, observed=True)['taken_at'].transform('nunique')
+        counts['apps'] = counts['apps'] / snapshot_count
+        counts['share'] = counts['share'] / snapshot_count
+        share = (counts.groupby(CHART_KEYS + ['category'], observed=True)[['apps', 'share']]
+                 .sum().reset_index())
+        return share.sort_values(CHART_KEYS + ['share'], ascending=[True] * 3 + [False], ignore_index=True)
+
+    def weighted_ratings(self, by=('category',)):
+        """
+        평점 수로 가중한 평균 평점
+
+        Args:
+            by: 차트 키 외에 추가로 묶을 열 (빈 튜플이면 차트 전체)
+
+        Returns:
+            DataFrame: 묶음 열, apps, rating_count, mean_rating, weighted_rating
+        """
+        keys = CHART_KEYS + list(by)
+        frame = self.entries[keys + ['rating', 'rating_count']]
+        valid = frame['rating'].notna() & (frame['rating_count'].fillna(0) > 0)
+        frame = frame.assign(
+            weight=np.where(valid, frame['rating_count'], 0.0),
+            weighted=np.where(valid, frame['rating'] * frame['rating_count'], 0.0)
+        )
+        grouped = frame.groupby(keys, observed=True).agg(
+            apps=('rating', 'size'),
+            rating_count=('weight', 'sum'),
+            mean_rating=('rating', 'mean'),
+            weighted=('weighted', 'sum')
+        ).reset_index()
+        grouped['weighted_rating'] = grouped['weighted'] / grouped['rating_count'].replace(0, np.nan)
+        return grouped.drop(columns='weighted').sort_values(keys, ignore_index=True)
+
+    def rank_movement(self):
+        """
+        같은 차트의 바로 이전 스냅샷 대비 순위 변화 (모든 차트/스냅샷 한 번에)
+
+        각 차트의 스냅샷에 순번을 매기고, 순번 n과 n-1을 (차트, 앱) 기준으로 외부 조인한다.
+        첫 스냅샷은 비교 대상이 없으므로 제외한다.
+
+        Returns:
+            DataFrame: store, country, chart, taken_at, app_id, name, rank, previous_rank, delta, status
+                       status는 moved / unchanged / entered / dropped (dropped는 rank가 NaN)
+        """
+        if self._movement is not None:
+            return self._movement
+
+        entries = self.entries[SNAPSHOT_KEYS + ['app_id', 'name', 'rank']].copy()
+        entries['snapshot'] = (entries.groupby(CHART_KEYS, observed=True)['taken_at']
+                               .rank(method='dense').astype('int32'))
+        snapshot_times = entries[CHART_KEYS + ['snapshot', 'taken_at']].drop_duplicates()
+
+        previous = entries.drop(columns='taken_at').rename(columns={'rank': 'previous_rank', 'name': 'previous_name'})
+        previous['snapshot'] += 1
+        merged = entries.drop(columns='taken_at').merge(
+            previous, on=CHART_KEYS + ['snapshot', 'app_id'], how='outer')
+
+        # 첫 스냅샷은 이전이 없고, 마지막 스냅샷 다음 순번은 아직 수집되지 않음
+        last_snapshot = entries.groupby(CHART_KEYS, observed=True)['snapshot'].max().rename('last_snapshot')
+        merged = merged[merged['snapshot'] > 1].merge(last_snapshot.reset_index(), on=CHART_KEYS)
+        merged = merged[merged['snapshot'] <= merged['last_snapshot']].drop(columns='last_snapshot')
+
+        merged = merged.merge(snapshot_times, on=CHART_KEYS + ['snapshot'], how='left')
+        merged['name'] = merged['name'].where(merged['name'].notna(), merged['previous_name'])
+        merged['delta'] = merged['previous_rank'] - merged['rank']
+        merged['status'] = np.select(
+            [merged['rank'].isna(), merged['previous_rank'].isna(), merged['delta'] == 0],
+            ['dropped', 'entered', 'unchanged'],
+            default='moved'
+        )
+        for column in CHART_KEYS:
+            merged[column] = merged[column].astype(self.entries[column].dtype)
+
+        columns = SNAPSHOT_KEYS + ['app_id', 'name', 'rank', 'previous_rank', 'delta', 'status']
+        self._movement = merged[columns].sort_values(SNAPSHOT_KEYS + ['rank'], ignore_index=True)
+        return self._movement
+
+    def new_entries(self):
+        """이전 스냅샷에 없다가 새로 진입한 앱"""
+        movement = self.rank_movement()
+        return movement[movement['status'] == 'entered'].reset_index(drop=True)
+
+    def drop_offs(self):
+        """이전 스냅샷에 있다가 빠진 앱 (previous_rank가 마지막 순위)"""
+        movement = self.rank_movement()
+        return movement[movement['status'] == 'dropped'].drop(columns=['rank', 'delta']).reset_index(drop=True)
+
+    def top_movers(self, n=10, latest_only=True):
+        """
+        순위가 가장 많이 오른/내린 앱
+
+        Args:
+            n: 차트별로 고를 개수 (상승/하락 각각)
+            latest_only: True면 차트별 가장 최근 스냅샷만 사용
+
+        Returns:
+            DataFrame: rank_movement 열 + direction (up/down)
+        """
+        movement = self.rank_movement()
+        movement = movement[movement['status'] == 'moved']
+        if latest_only:
+            latest = movement.groupby(CHART_KEYS, observed=True)['taken_at'].transform('max')
+            movement = movement[movement['taken_at'] == latest]
+        ordered = movement.sort_values('delta', ascending=False)
+        up = ordered[ordered['delta'] > 0].groupby(CHART_KEYS, observed=True).head(n).assign(direction='up')
+        down = ordered[ordered['delta'] < 0].groupby(CHART_KEYS, observed=True).tail(n).assign(direction='down')
+        return pd.concat([up, down], ignore_index=True).sort_values(
+            CHART_KEYS + ['direction', 'delta'], ascending=[True, True, True, False, False], ignore_index=True)
+
+    def app_presence(self):
+        """
+        앱별 차트 체류 요약 (국가/차트 전체)
+
+        Returns:
+            DataFrame: store, country, chart, app_id, name, snapshots, best_rank, mean_rank, first_seen, last_seen
+        """
+        return (self.entries.groupby(CHART_KEYS + ['app_id'], observed=True)
+                .agg(name=('name', 'last'), snapshots=('taken_at', 'nunique'), best_rank=('rank', 'min'),
+                     mean_rank=('rank', 'mean'), first_seen=('taken_at', 'min'), last_seen=('taken_at', 'max'))
+                .reset_index()
+                .sort_values(CHART_KEYS + ['best_rank'], ignore_index=True))
+
+
+if __name__ == "__main__":
+    analytics = Analytics.from_store()
+    if analytics.entries.empty:
+        print("분석할 스냅샷이 없습니다. 먼저 수집을 실행하세요.")
+    else:
+        print(f"스냅샷 {len(analytics.snapshots())}개, 항목 {len(analytics.entries)}개")
+        print("\n=== 카테고리 점유율 ===")
+        print(analytics.category_share().head(20).to_string(index=False))
+        print("\n=== 평점 수 가중 평균 평점 ===")
+        print(analytics.weighted_ratings(by=()).to_string(index=False))
+        print("\n=== 최근 순위 변화 상위 ===")
+        print(analytics.top_movers(5).to_string(index=False))
@@ -0,0 +1,125 @@
+from collections.abc import MutableMapping
+
+# 두 스토어 레코드가 가질 수 있는 필드 (순서 = 키 순서 = 내보내기 컬럼 순서)
+RECORD_FIELDS = (
+    'rank', 'name', 'artist', 'developer', 'category', 'price', 'currency', 'release_date', 'app_id', 'bundle_id',
+    'app_url', 'url', 'icon_url', 'summary', 'rights',
+    'version', 'file_size', 'rating', 'rating_count', 'installs', 'updated', 'content_rating', 'description',
+    'screenshots', 'languages', 'genres', 'minimum_os_version', 'current_version_release_date',
+    'developer_website', 'support_url', 'scraped_at'
+)
+_FIELD_SET = frozenset(RECORD_FIELDS)
+
+# 병합/순위 계산에 필요해 프로젝션과 관계없이 항상 유지하는 필드
+KEY_FIELDS = frozenset(('rank', 'app_id', 'name'))
+
+
+def make_projection(fields):
+    """
+    유지할 필드 집합 생성
+
+    Args:
+        fields: 유지할 필드 이름 목록 (None이면 전체 유지)
+
+    Returns:
+        frozenset 또는 None
+    """
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        fields = [field.strip() for field in fields.split(',') if field.strip()]
+    return frozenset(fields) | KEY_FIELDS
+
+
+def wants(projection, field):
+    """프로젝션에 field가 포함되는지 (None이면 항상 True)"""
+    return projection is None or field in projection
+
+
+class AppRecord(MutableMapping):
+    __slots__ = RECORD_FIELDS + ('_extra',)
+
+    def __init__(self, values=None, projection=None, **kwargs):
+        """
+        앱 한 개의 정보를 담는 고정 필드 레코드
+
+        dict 대신 __slots__에 값을 저장해 레코드당 메모리를 줄이고,
+        get / [] / update / keys / items 등 dict와 같은 방식으로 사용할 수 있다.
+        설정하지 않은 필드는 키로 보이지 않으며, RECORD_FIELDS에 없는 키는 별도 dict에 보관한다.
+
+        Args:
+            values: 초기 값 (dict 또는 매핑)
+            projection: make_projection 결과 (포함되지 않은 필드는 저장하지 않음)
+            **kwargs: 추가 초기 값
+        """
+        self._extra = None
+        if values:
+            for key, value in values.items():
+                if projection is None or key in projection:
+                    self[key] = value
+        for key, value in kwargs.items():
+            if projection is None or key in projection:
+                self[key] = value
+
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in _FIELD_SET:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in _FIELD_SET:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        for field in RECORD_FIELDS:
+            if hasattr(self, field):
+                yield field
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, key):
+        if key in _FIELD_SET:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def get(self, key, default=None):
+        if key in _FIELD_SET:
+            return getattr(self, key, default)
+        if self._extra is not None:
+            return self._extra.get(key, default)
+        return default
+
+    def __repr__(self):
+        return f"AppRecord({self.to_dict()!r})"
+
+    def to_dict(self):
+        """JSON/CSV/DataFrame으로 내보낼 일반 dict"""
+        return {key: self[key] for key in self}
+
+
+def to_dicts(records):
+    """레코드 리스트를 dict 리스트로 변환 (이미 dict인 항목은 그대로)"""
+    return [record if isinstance(record, dict) else record.to_dict() for record in records]
@@ -1,109 +1,242 @@
+import os
+import time
+import hashlib
 import requests
-import json
-import pandas as pd
 from datetime import datetime
-import time
+from RateLimiter import RateLimiter
+from ConcurrentEnricher import ConcurrentEnricher
+from HttpClient import get_default_client
+from StreamingExporter import StreamingExporter
+from Metrics import get_metrics
+import FastJson
+from AppRecord import AppRecord, make_projection, wants, to_dicts
+
+# RSS 피드의 genre= 경로에 들어가는 주요 장르 ID
+GENRE_IDS = {
+    'books': 6018,
+    'business': 6000,
+    'education': 6017,
+    'entertainment': 6016,
+    'finance': 6015,
+    'games': 6014,
+    'health': 6013,
+    'lifestyle': 6012,
+    'music': 6011,
+    'navigation': 6010,
+    'news': 6009,
+    'photo': 6008,
+    'productivity': 6007,
+    'reference': 6006,
+    'shopping': 6024,
+    'social': 6005,
+    'sports': 6004,
+    'travel': 6003,
+    'utilities': 6002,
+    'weather': 6001
+}
+
+# 내보내기 컬럼 순서 (RSS 기본 정보 + lookup 상세 정보)
+EXPORT_FIELDS = (
+    'rank', 'name', 'artist', 'category', 'price', 'release_date', 'app_id', 'bundle_id', 'app_url',
+    'icon_url', 'summary', 'rights', 'version', 'file_size', 'rating', 'rating_count', 'content_rating',
+    'description', 'screenshots', 'languages', 'genres', 'minimum_os_version',
+    'current_version_release_date', 'developer_website', 'support_url'
+)
+
+# lookup 결과에서 상세 정보를 가져오는 위치: (필드, lookup 키, 기본값 - 호출 가능하면 호출 결과)
+DETAIL_SOURCES = (
+    ('version', 'version', ''),
+    ('file_size', 'fileSizeBytes', 0),
+    ('rating', 'averageUserRating', 0),
+    ('rating_count', 'userRatingCount', 0),
+    ('content_rating', 'contentAdvisoryRating', ''),
+    ('description', 'description', ''),
+    ('screenshots', 'screenshotUrls', list),
+    ('languages', 'languageCodesISO2A', list),
+    ('genres', 'genres', list),
+    ('minimum_os_version', 'minimumOsVersion', ''),
+    ('current_version_release_date', 'currentVersionReleaseDate', ''),
+    ('developer_website', 'artistViewUrl', ''),
+    ('support_url', 'supportUrl', '')
+)
+
+# RSS 데이터 중 바뀌면 새 릴리스로 보는 필드 (증분 모드)
+FINGERPRINT_FIELDS = ('name', 'artist', 'price', 'release_date', 'icon_url', 'summary')
+
+# RSS 항목에서 'label' 값을 꺼낼 필드: (필드, 항목 키)
+RSS_LABEL_FIELDS = (
+    ('name', 'im:name'),
+    ('artist', 'im:artist'),
+    ('price', 'im:price'),
+    ('release_date', 'im:releaseDate'),
+    ('summary', 'summary'),
+    ('rights', 'rights')
+)
+# RSS 항목에서 'attributes' 값을 꺼낼 필드: (필드, 항목 키, 속성 이름)
+RSS_ATTRIBUTE_FIELDS = (
+    ('category', 'category', 'label'),
+    ('app_id', 'id', 'im:id'),
+    ('bundle_id', 'id', 'im:bundleId')
+)
+
+
+def extract_rss_entry(entry, rank, projection=None):
+    """
+    RSS 피드 항목 하나를 앱 정보 dict로 변환
+
+    경로를 직접 인덱싱하고 구조가 다를 때만 예외로 빈 문자열을 쓰므로
+    항목마다 단계별 타입 검사를 하지 않는다 (링크는 dict/리스트 모두, 아이콘은 가장 큰 이미지).
+    프로젝션에 없는 필드는 값을 꺼내지 않는다.
+
+    Args:
+        entry: RSS feed.entry 항목
+        rank: 순위
+        projection: make_projection 결과 (None이면 전체)
+
+    Returns:
+        dict: 앱 정보
+    """
+    app_info = {'rank': rank}
+    for field, key in RSS_LABEL_FIELDS:
+        if projection is None or field in projection:
+            try:
+                value = entry[key]['label']
+            except (KeyError, TypeError, IndexError):
+                value = ''
+            app_info[field] = value if value.__class__ is str else ''
+
+    for field, key, name in RSS_ATTRIBUTE_FIELDS:
+        if projection is None or field in projection:
+            try:
+                value = entry[key]['attributes'][name]
+            except (KeyError, TypeError, IndexError):
+                value = ''
+            app_info[field] = value if value.__class__ is str else ''
+
+    if projection is None or 'app_url' in projection:
+        link = entry.get('link')
+        if link.__class__ is list:
+            link = link[0] if link else None
+        try:
+            href = link['attributes']['href']
+        except (KeyError, TypeError, IndexError):
+            href = ''
+        app_info['app_url'] = href if href.__class__ is str else ''
+
+    if projection is None or 'icon_url' in projection:
+        images = entry.get('im:image')
+        try:
+            # 가장 큰 이미지 선택 (마지막 요소)
+            icon = images[-1]['label'] if images.__class__ is list and images else ''
+        except (KeyError, TypeError, IndexError):
+            icon = ''
+        app_info['icon_url'] = icon if icon.__class__ is str else ''
+
+    return app_info
+
 
 class AppStoreTopScraper:
-    def __init__(self, country='kr', limit=100):
+    def __init__(self, country='kr', limit=100, max_workers=4, requests_per_second=2.0, client=None,
+                 incremental=False, snapshot_dir=os.path.join("exports", ".snapshots"), details_max_age=24 * 60 * 60,
+                 snapshot_store=None, base_url="https://itunes.apple.com",
+                 fields=None, blob_store=None):
         """
         앱스토어 Top 앱 정보를 수집하는 클래스
 
         Args:
             country: 국가 코드 (kr, us, jp 등)
             limit: 수집할 앱 개수 (최대 200)
+            max_workers: 상세 정보 동시 요청 수
+            requests_per_second: iTunes 호스트에 대한 초당 요청 수 제한
+                                 (같은 호스트의 공유 리미터에는 지금까지 지정된 값 중 가장 낮은 값이 적용됨)
+            client: 사용할 HttpClient (기본값: 공유 클라이언트)
+            incremental: 이전 스냅샷과 비교해 바뀐 앱만 상세 정보를 다시 수집할지 여부
+            snapshot_dir: 증분 모드용 스냅샷 저장 폴더
+            details_max_age: 재사용할 상세 정보의 최대 나이 (초, 지나면 다시 수집)
+            snapshot_store: 수집 결과를 누적할 SnapshotStore (None이면 저장 안 함)
+            base_url: iTunes RSS / lookup 서버 주소 (벤치마크용 로컬 서버 지정 시 사용)
+            fields: 레코드에 남길 필드 목록 (None이면 전체). 나머지는 파싱 시점에 버리며,
+                    상세 필드를 하나도 요청하지 않으면 lookup 요청을 생략한다.
+            blob_store: 내보낼 때 설명/스크린샷 등 큰 필드를 내용 해시 참조로 바꿀 BlobStore (선택)
         """
         self.country = country
         self.limit = limit
-        self.base_url = "https://itunes.apple.com"
+        self.base_url = base_url.rstrip('/')
+        self.max_workers = max_workers
+        self.client = client or get_default_client()
+        self.incremental = incremental
+        self.snapshot_dir = snapshot_dir
+        self.details_max_age = details_max_age
+        self.snapshot_store = snapshot_store
+        self.blob_store = blob_store
+        self.metrics = get_metrics()
+        self.projection = make_projection(fields)
+        self.detail_sources = [source for source in DETAIL_SOURCES if wants(self.projection, source[0])]
+        self.rate_limiter = RateLimiter.for_host(self.base_url, rate=requests_per_second, burst=max_workers,
+                                                 lowest=True)
 
     def get_top_apps(self, category="all", chart_type="topfreeapplications"):
         """
         iTunes RSS API를 사용하여 Top 앱 정보 수집
 
         Args:
-            category: 카테고리 (all, games, productivity 등)
+            category: 카테고리 (all, games, productivity 등 또는 장르 ID)
             chart_type: 차트 타입 (topfreeapplications, toppaidapplications, topgrossingapplications)
 
         Returns:
             list: 앱 정보 리스트
         """
         # iTunes RSS API 엔드포인트
-        url = f"{self.base_url}/{self.country}/rss/{chart_type}/limit={self.limit}/json"
+        genre_id = self._get_genre_id(category)
+        genre_path = f"/genre={genre_id}" if genre_id else ""
+        url = f"{self.base_url}/{self.country}/rss/{chart_type}/limit={self.limit}{genre_path}/json"
 
         try:
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-
-            data = response.json()
-            entries = data['feed']['entry']
-
-            apps = []
-            for entry in entries:
-                try:
-                    # 데이터 구조 안전하게 접근
-                    app_info = {
-                        'rank': len(apps) + 1,
-                        'name': self._safe_get(entry, 'im:name', 'label'),
-                        'artist': self._safe_get(entry, 'im:artist', 'label'),
-                        'category': self._safe_get(entry, 'category', 'attributes', 'label'),
-                        'price': self._safe_get(entry, 'im:price', 'label'),
-                        'release_date': self._safe_get(entry, 'im:releaseDate', 'label'),
-                        'app_id': self._safe_get(entry, 'id', 'attributes', 'im:id'),
-                        'bundle_id': self._safe_get(entry, 'id', 'attributes', 'im:bundleId'),
-                        'app_url': self._get_app_url(entry),
-                        'icon_url': self._get_icon_url(entry),
-                        'summary': self._safe_get(entry, 'summary', 'label'),
-                        'rights': self._safe_get(entry, 'rights', 'label')
-                    }
-                    apps.append(app_info)
-                except Exception as e:
-                    print(f"앱 정보 파싱 실패 (순위 {len(apps) + 1}): {e}")
-                    continue
+            with self.metrics.stage('appstore', 'fetch'):
+                response = self.client.get(url, rate_limiter=self.rate_limiter)
+                response.raise_for_status()
 
+            with self.metrics.stage('appstore', 'parse'):
+                apps = self._parse_entries(response)
+            self.metrics.increment('records_total', len(apps), store='appstore', stage='fetch')
             return apps
 
+        except (KeyError, ValueError) as e:
+            # 본문이 JSON이 아닌 경우(requests의 JSONDecodeError)도 파싱 실패로 집계
+            self.metrics.increment('parse_failures_total', store='appstore', page='rss')
+            print(f"데이터 파싱 실패: {e}")
+            return []
         except requests.RequestException as e:
+            self.metrics.increment('stage_failures_total', store='appstore', stage='fetch')
             print(f"API 요청 실패: {e}")
             return []
-        except KeyError as e:
-            print(f"데이터 파싱 실패: {e}")
-            return []
 
-    def _safe_get(self, data, *keys):
-        """안전하게 중첩된 딕셔너리 값 가져오기"""
-        try:
-            for key in keys:
-                if isinstance(data, dict):
-                    data = data.get(key, {})
-                else:
-                    return ''
-            return data if isinstance(data, str) else ''
-        except:
-            return ''
+    def _parse_entries(self, response):
+        """RSS 응답의 항목들을 앱 정보 리스트로 변환"""
+        data = FastJson.loads(response.content)
+        entries = data['feed']['entry']
 
-    def _get_app_url(self, entry):
-        """앱 URL 안전하게 가져오기"""
-        try:
-            link = entry.get('link', {})
-            if isinstance(link, dict):
-                return link.get('attributes', {}).get('href', '')
-            elif isinstance(link, list) and len(link) > 0:
-                return link[0].get('attributes', {}).get('href', '')
-            return ''
-        except:
-            return ''
-
-    def _get_icon_url(self, entry):
-        """아이콘 URL 안전하게 가져오기"""
-        try:
-            images = entry.get('im:image', [])
-            if isinstance(images, list) and len(images) > 0:
-                # 가장 큰 이미지 선택 (마지막 요소)
-                return images[-1].get('label', '')
-            return ''
-        except:
-            return ''
+        apps = []
+        for entry in entries:
+            try:
+                apps.append(AppRecord(extract_rss_entry(entry, len(apps) + 1, self.projection)))
+            except Exception as e:
+                self.metrics.increment('parse_failures_total', store='appstore', page='rss_entry')
+                print(f"앱 정보 파싱 실패 (순위 {len(apps) + 1}): {e}")
+                continue
+
+        return apps
+
+    def _get_genre_id(self, category):
+        """카테고리 이름/ID를 RSS 장르 ID로 변환 (all이면 None)"""
+        if not category or str(category).lower() == 'all':
+            return None
+        if str(category).isdigit():
+            return int(category)
+        genre_id = GENRE_IDS.get(str(category).lower())
+        if genre_id is None:
+            print(f"알 수 없는 카테고리: {category} (전체 차트로 수집)")
+        return genre_id
 
     def get_app_details(self, app_id):
         """
@@ -123,39 +256,103 @@ class AppStoreTopScraper:
         }
 
         try:
-            response = requests.get(url, params=params, timeout=30)
+            response = self.client.get(url, params=params, rate_limiter=self.rate_limiter)
             response.raise_for_status()
 
-            data = response.json()
+            data = FastJson.loads(response.content)
             if data['resultCount'] > 0:
-                app = data['results'][0]
-                return {
-                    'version': app.get('version', ''),
-                    'file_size': app.get('fileSizeBytes', 0),
-                    'rating': app.get('averageUserRating', 0),
-                    'rating_count': app.get('userRatingCount', 0),
-                    'content_rating': app.get('contentAdvisoryRating', ''),
-                    'description': app.get('description', ''),
-                    'screenshots': app.get('screenshotUrls', []),
-                    'languages': app.get('languageCodesISO2A', []),
-                    'genres': app.get('genres', []),
-                    'minimum_os_version': app.get('minimumOsVersion', ''),
-                    'current_version_release_date': app.get('currentVersionReleaseDate', ''),
-                    'developer_website': app.get('artistViewUrl', ''),
-                    'support_url': app.get('supportUrl', '')
-                }
+                return self._parse_app_details(data['results'][0])
             return {}
 
-        except requests.RequestException as e:
+        except (requests.RequestException, ValueError) as e:
             print(f"앱 상세 정보 요청 실패 (ID: {app_id}): {e}")
             return {}
 
-    def scrape_top_apps_with_details(self, chart_type="topfreeapplications"):
+    def get_app_details_batch(self, app_ids, batch_size=100):
+        """
+        여러 앱의 상세 정보를 /lookup 일괄 요청으로 수집
+
+        /lookup 엔드포인트는 쉼표로 구분된 여러 ID를 한 번에 받으므로
+        차트 전체를 몇 번의 요청으로 보강할 수 있다. 배치들은 max_workers 만큼
+        동시에 요청되고, 호스트별 RateLimiter로 속도가 제한된다.
+
+        Args:
+            app_ids: 앱 ID 리스트
+            batch_size: 요청 1회당 ID 개수
+
+        Returns:
+            dict: {app_id: 상세 정보} (결과가 없는 ID는 빈 dict)
+        """
+        details = {}
+        for batch_details in self.iter_app_details_batches(app_ids, batch_size):
+            details.update(batch_details)
+        return details
+
+    def iter_app_details_batches(self, app_ids, batch_size=100):
+        """
+        get_app_details_batch와 같지만 배치가 끝날 때마다 결과를 순서대로 반환
+
+        Returns:
+            iterator: 배치별 {app_id: 상세 정보}
+        """
+        app_ids = [str(app_id) for app_id in app_ids if app_id]
+        batches = [app_ids[start:start + batch_size] for start in range(0, len(app_ids), batch_size)]
+
+        enricher = ConcurrentEnricher(max_workers=self.max_workers)
+        for batch, batch_details in zip(batches, enricher.map(self._lookup_batch, batches)):
+            missing = [app_id for app_id in batch if app_id not in batch_details]
+            if missing:
+                print(f"상세 정보 없음 ({len(missing)}개): {', '.join(missing[:10])}")
+            yield {app_id: batch_details.get(app_id, {}) for app_id in batch}
+
+    def _lookup_batch(self, batch):
+        """ID 묶음 하나를 /lookup으로 요청하여 {app_id: 상세 정보} 반환"""
+        url = f"{self.base_url}/lookup"
+        params = {
+            'id': ','.join(batch),
+            'country': self.country,
+            'entity': 'software'
+        }
+
+        details = {}
+        try:
+            with self.metrics.stage('appstore', 'lookup'):
+                response = self.client.get(url, params=params, rate_limiter=self.rate_limiter)
+                response.raise_for_status()
+
+                data = FastJson.loads(response.content)
+                for app in data.get('results', []):
+                    track_id = str(app.get('trackId', ''))
+                    if track_id:
+                        details[track_id] = self._parse_app_details(app)
+
+        except (requests.RequestException, ValueError) as e:
+            self.metrics.increment('stage_failures_total', len(batch), store='appstore', stage='lookup')
+            print(f"앱 상세 정보 일괄 요청 실패 ({len(batch)}개): {e}")
+
+        self.metrics.increment('lookup_missing_total', len(batch) - len(details), store='appstore')
+        return details
+
+    def _parse_app_details(self, app):
+        """lookup 결과 항목을 상세 정보 dict로 변환 (프로젝션에 포함된 필드만)"""
+        details = {}
+        for field, key, default in self.detail_sources:
+            if key in app:
+                details[field] = app[key]
+            else:
+                details[field] = default() if callable(default) else default
+        return details
+
+    def scrape_top_apps_with_details(self, chart_type="topfreeapplications", category="all", fetch_details=None,
+                                     sink=None):
         """
         Top 앱 정보와 상세 정보를 모두 수집
 
         Args:
             chart_type: 차트 타입
+            category: 카테고리 (all, games 등 또는 장르 ID)
+            fetch_details: 상세 정보 수집 여부 (None이면 입력으로 확인)
+            sink: 레코드가 완성되는 즉시 기록할 StreamingExporter (선택)
 
         Returns:
             list: 완전한 앱 정보 리스트
@@ -163,7 +360,7 @@ class AppStoreTopScraper:
         print(f"Top {self.limit} 앱 정보 수집 시작...")
 
         # 기본 Top 앱 정보 수집
-        apps = self.get_top_apps(chart_type=chart_type)
+        apps = self.get_top_apps(category=category, chart_type=chart_type)
 
         if not apps:
             print("기본 앱 정보 수집 실패")
@@ -172,30 +369,137 @@ class AppStoreTopScraper:
         print(f"{len(apps)}개 앱 기본 정보 수집 완료")
 
         # 상세 정보 수집 여부 확인
-        get_details = input("상세 정보도 수집하시겠습니까? (y/n): ").lower().strip()
-
-        if get_details == 'y':
-            print("상세 정보 수집 시작...")
+        if fetch_details is None:
+            fetch_details = input("상세 정보도 수집하시겠습니까? (y/n): ").lower().strip() == 'y'
 
-            # 각 앱의 상세 정보 수집
-            for i, app in enumerate(apps, 1):
-                if app.get('app_id'):  # app_id가 있는 경우만 상세 정보 수집
-                    print(f"({i}/{len(apps)}) {app['name']} 상세 정보 수집 중...")
+        if fetch_details and not self.detail_sources:
+            print("요청한 필드에 상세 정보가 없어 lookup을 생략합니다.")
+            fetch_details = False
 
-                    details = self.get_app_details(app['app_id'])
-                    app.update(details)
+        if fetch_details:
+            print("상세 정보 수집 시작...")
 
-                    # API 요청 제한을 위한 대기
-                    time.sleep(0.5)
+            with self.metrics.stage('appstore', 'enrich'):
+                if self.incremental:
+                    details_batches = [self._get_details_incremental(apps, chart_type, category)]
                 else:
-                    print(f"({i}/{len(apps)}) {app['name']} - app_id 없음, 상세 정보 스킵")
+                    # 차트 전체를 일괄 lookup 요청으로 수집
+                    app_ids = [app['app_id'] for app in apps if app.get('app_id')]
+                    details_batches = self.iter_app_details_batches(app_ids) if app_ids else [{}]
+
+                # 배치가 도착하는 대로 순위 순서를 지키며 병합하고 바로 기록
+                details = {}
+                position = 0
+                for batch_details in details_batches:
+                    details.update(batch_details)
+                    while position < len(apps):
+                        app = apps[position]
+                        if app.get('app_id') and app['app_id'] not in details:
+                            break
+                        position += 1
+
+                        if app.get('app_id'):  # app_id가 있는 경우만 상세 정보 병합
+                            app.update(details[app['app_id']])
+                        else:
+                            print(f"({position}/{len(apps)}) {app['name']} - app_id 없음, 상세 정보 스킵")
+                        if sink:
+                            sink.write(app)
 
             print("모든 앱 정보 수집 완료!")
         else:
+            if sink:
+                sink.write_all(apps)
             print("기본 정보만 수집 완료!")
 
+        if self.snapshot_store:
+            chart = chart_type if category == "all" else f"{chart_type}/{category}"
+            self.snapshot_store.append('appstore', self.country, chart, apps)
+
         return apps
 
+    def _get_details_incremental(self, apps, chart_type, category):
+        """
+        이전 스냅샷과 RSS 데이터를 비교해 새로 진입했거나 바뀐 앱만 lookup
+
+        Returns:
+            dict: {app_id: 상세 정보}
+        """
+        snapshot_path = self._get_snapshot_path(chart_type, category)
+        snapshot = self._load_snapshot(snapshot_path)
+        now = time.time()
+
+        apps_by_id = {app['app_id']: app for app in apps if app.get('app_id')}
+        details = {}
+        changed_ids = []
+        for app_id, app in apps_by_id.items():
+            previous = snapshot.get(app_id)
+            # 이전 실행보다 많은 상세 필드를 요청했으면 재사용하지 않음
+            if (previous and previous.get('fingerprint') == self._get_fingerprint(app)
+                    and now - previous.get('fetched_at', 0) < self.details_max_age
+                    and all(field in previous.get('details', {}) for field, _, _ in self.detail_sources)):
+                details[app_id] = {field: previous['details'][field] for field, _, _ in self.detail_sources}
+            else:
+                changed_ids.append(app_id)
+
+        print(f"증분 수집: 변경/신규 {len(changed_ids)}개 lookup, {len(details)}개 재사용")
+        if changed_ids:
+            fetched = self.get_app_details_batch(changed_ids)
+            for app_id, app_details in fetched.items():
+                details[app_id] = app_details
+                if app_details:
+                    snapshot[app_id] = {
+                        'fingerprint': self._get_fingerprint(apps_by_id[app_id]),
+                        'fetched_at': now,
+                        'details': app_details
+                    }
+
+        # 현재 차트에 있는 앱만 남겨 스냅샷 크기 유지
+        self._save_snapshot(snapshot_path, {app_id: entry for app_id, entry in snapshot.items() if app_id in apps_by_id})
+        return details
+
+    def _get_fingerprint(self, app):
+        """RSS 필드로 릴리스 변경 감지용 지문 생성"""
+        raw = '\x1f'.join(str(app.get(field, '')) for field in FINGERPRINT_FIELDS)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _get_snapshot_path(self, chart_type, category):
+        """국가/차트/카테고리별 스냅샷 파일 경로"""
+        return os.path.join(self.snapshot_dir, f"appstore_{self.country}_{chart_type}_{category}.json")
+
+    def _load_snapshot(self, path):
+        """이전 스냅샷 읽기 (없거나 깨졌으면 빈 dict)"""
+        try:
+            with open(path, 'rb') as f:
+                return FastJson.loads(f.read())
+        except (OSError, ValueError):
+            return {}
+
+    def _save_snapshot(self, path, snapshot):
+        """스냅샷 저장 (임시 파일에 쓴 뒤 교체)"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        FastJson.dump_file(snapshot, tmp_path)
+        os.replace(tmp_path, path)
+
+    def open_stream(self, filepath):
+        """
+        scrape_top_apps_with_details(sink=...)에 넘길 스트리밍 내보내기 생성
+
+        Args:
+            filepath: 저장 경로 (.jsonl, .jsonl.gz, .csv, .csv.gz)
+
+        Returns:
+            StreamingExporter
+        """
+        return StreamingExporter(filepath, fieldnames=[field for field in EXPORT_FIELDS if wants(self.projection, field)],
+                                 blob_store=self.blob_store)
+
+    def _export_records(self, apps):
+        """내보낼 dict 리스트 (blob_store가 있으면 큰 필드를 참조로 바꿈)"""
+        if self.blob_store:
+            return self.blob_store.pack_all(apps)
+        return to_dicts(apps)
+
     def save_to_csv(self, apps, filename=None):
         """
         수집한 앱 정보를 CSV 파일로 저장
@@ -208,24 +512,31 @@ class AppStoreTopScraper:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"app_store_top_{self.limit}_{self.country}_{timestamp}.csv"
 
-        df = pd.DataFrame(apps)
-        df.to_csv(filename, index=False, encoding='utf-8-sig')
+        # pandas는 불러오는 데만 수백 ms가 걸리므로 CSV 저장 시점에 불러옴
+        import pandas as pd
+
+        with self.metrics.stage('appstore', 'export'):
+            df = pd.DataFrame(self._export_records(apps))
+            df.to_csv(filename, index=False, encoding='utf-8-sig')
+        self.metrics.increment('exported_records_total', len(apps), format='csv')
         print(f"CSV 파일 저장 완료: {filename}")
 
-    def save_to_json(self, apps, filename=None):
+    def save_to_json(self, apps, filename=None, compact=False):
         """
         수집한 앱 정보를 JSON 파일로 저장
 
         Args:
             apps: 앱 정보 리스트
             filename: 저장할 파일명
+            compact: True면 들여쓰기/공백 없이 저장 (파일 크기와 저장 시간 감소)
         """
         if not filename:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"app_store_top_{self.limit}_{self.country}_{timestamp}.json"
 
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(apps, f, ensure_ascii=False, indent=2)
+        with self.metrics.stage('appstore', 'export'):
+            FastJson.dump_file(self._export_records(apps), filename, indent=not compact)
+        self.metrics.increment('exported_records_total', len(apps), format='json')
         print(f"JSON 파일 저장 완료: {filename}")
 
 
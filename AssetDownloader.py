@@ -0,0 +1,262 @@
+import os
+import time
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime
+import requests
+from ConcurrentEnricher import ConcurrentEnricher
+from StreamingExporter import StreamingExporter
+from Metrics import get_metrics
+
+# 레코드에서 내려받을 URL을 꺼낼 필드 (문자열 또는 문자열 리스트)
+ASSET_FIELDS = ('icon_url', 'screenshots')
+
+# 매니페스트 컬럼
+MANIFEST_FIELDS = ('app_id', 'field', 'index', 'url', 'sha256', 'path', 'size', 'content_type', 'status')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    url TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    content_type TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    checked_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_assets_sha256 ON assets (sha256);
+"""
+
+CHUNK_SIZE = 64 * 1024
+
+
+class AssetDownloader:
+    def __init__(self, asset_dir=os.path.join("exports", "assets"), client=None, max_workers=8,
+                 rate_limiter=None, revalidate_after=7 * 24 * 60 * 60, metrics=None):
+        """
+        아이콘/스크린샷을 병렬로 내려받아 내용 해시 기준으로 한 번만 저장하는 클래스
+
+        파일은 objects/<해시 앞 2자리>/<sha256>에 저장하므로 국가/실행마다 URL이 달라도
+        내용이 같으면 파일은 하나만 남는다. URL별 해시/ETag/Last-Modified는 assets.db에 기록해
+        이미 받은 URL은 revalidate_after 동안 요청하지 않고, 그 뒤에는 조건부 요청으로 재검증한다.
+
+        Args:
+            asset_dir: 저장 폴더
+            client: 요청에 사용할 HttpClient (기본값: 공유 클라이언트)
+            max_workers: 동시에 내려받을 최대 개수
+            rate_limiter: 요청 전에 토큰을 확보할 RateLimiter (없으면 제한 없음)
+            revalidate_after: 이 시간(초) 안에 확인한 URL은 네트워크 없이 재사용 (0이면 항상 재검증)
+            metrics: 다운로드 결과를 기록할 Metrics (기본값: 공유 Metrics)
+        """
+        if client is None:
+            from HttpClient import get_default_client
+            client = get_default_client()
+        self.client = client
+        self.asset_dir = asset_dir
+        self.objects_dir = os.path.join(asset_dir, "objects")
+        self.revalidate_after = revalidate_after
+        self.metrics = metrics or get_metrics()
+        self.enricher = ConcurrentEnricher(max_workers=max_workers, rate_limiter=rate_limiter)
+        self.stats = {'downloaded': 0, 'deduplicated': 0, 'revalidated': 0, 'cached': 0, 'failed': 0,
+                      'bytes': 0}
+        self._stats_lock = threading.Lock()
+
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(asset_dir, "assets.db"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def object_path(self, sha256):
+        """
+        해시에 해당하는 저장 경로
+
+        같은 내용을 서버마다 다른 Content-Type으로 보내도 파일이 하나만 남도록 확장자 없이 해시로만 정한다.
+        형식은 assets.db와 매니페스트의 content_type으로 확인한다.
+        """
+        return os.path.join(self.objects_dir, sha256[:2], sha256)
+
+    def _lookup(self, url):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT sha256, size, content_type, etag, last_modified, checked_at FROM assets WHERE url = ?",
+                (url,)
+            ).fetchone()
+
+    def _save(self, url, sha256, size, content_type, etag, last_modified):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO assets (url, sha256, size, content_type, etag, last_modified, checked_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, sha256, size, content_type, etag, last_modified, time.time())
+            )
+
+    def _touch(self, url):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE assets SET checked_at = ? WHERE url = ?", (time.time(), url))
+
+    def _record(self, status, size=0):
+        with self._stats_lock:
+            self.stats[status] += 1
+            self.stats['bytes'] += size
+        self.metrics.increment('asset_downloads_total', status=status)
+        if size:
+            self.metrics.increment('asset_received_bytes_total', size)
+
+    def download(self, url):
+        """
+        URL 하나 내려받기 (이미 있으면 재사용 또는 조건부 재검증)
+
+        Returns:
+            dict: url, sha256, path, size, content_type, status
+                  status는 downloaded / deduplicated / revalidated / cached / failed
+        """
+        known = self._lookup(url)
+        if known:
+            sha256, size, content_type, etag, last_modified, checked_at = known
+            path = self.object_path(sha256)
+            if os.path.exists(path):
+                if time.time() - checked_at < self.revalidate_after:
+                    self._record('cached')
+                    return self._result(url, sha256, path, size, content_type, 'cached')
+            else:
+                # 파일이 지워졌으면 조건부 요청 없이 다시 받음
+                etag = last_modified = None
+        else:
+            etag = last_modified = None
+
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        try:
+            response = self.client.get(url, headers=headers, stream=True)
+            try:
+                if response.status_code == 304 and known:
+                    self._touch(url)
+                    self._record('revalidated')
+                    return self._result(url, sha256, path, size, content_type, 'revalidated')
+                response.raise_for_status()
+                return self._store(url, response)
+            finally:
+                response.close()
+        except (requests.RequestException, OSError) as e:
+            print(f"에셋 다운로드 실패: {url} ({e})")
+            self._record('failed')
+            return self._result(url, None, None, 0, None, 'failed')
+
+    def _store(self, url, response):
+        """응답 본문을 해시를 계산하며 임시 파일에 쓰고, 같은 내용이 없을 때만 저장 위치로 이동"""
+        content_type = response.headers.get('Content-Type')
+        digest = hashlib.sha256()
+        size = 0
+        tmp_path = os.path.join(self.objects_dir, f".{threading.get_ident()}.{time.monotonic_ns()}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+            sha256 = digest.hexdigest()
+            path = self.object_path(sha256)
+            if os.path.exists(path):
+                status = 'deduplicated'
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+                status = 'downloaded'
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        self._save(url, sha256, size, content_type,
+                   response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        self._record(status, size)
+        return self._result(url, sha256, path, size, content_type, status)
+
+    @staticmethod
+    def _result(url, sha256, path, size, content_type, status):
+        return {'url': url, 'sha256': sha256, 'path': path, 'size': size,
+                'content_type': content_type, 'status': status}
+
+    def download_all(self, urls):
+        """
+        URL 목록을 병렬로 내려받기 (중복 URL은 한 번만 요청)
+
+        Returns:
+            dict: {url: download 결과}
+        """
+        unique = list(dict.fromkeys(url for url in urls if url))
+        return dict(zip(unique, self.enricher.map(self.download, unique)))
+
+    def download_records(self, apps, fields=ASSET_FIELDS, manifest_path=None):
+        """
+        앱 레코드의 아이콘/스크린샷을 내려받고 레코드-파일 연결 목록 생성
+
+        Args:
+            apps: 스크래퍼 결과 리스트 (App Store / Google Play 모두 가능)
+            fields: URL을 꺼낼 필드
+            manifest_path: 매니페스트 저장 경로 (.jsonl, .csv 등, None이면 저장하지 않음)
+
+        Returns:
+            list: MANIFEST_FIELDS 키를 가진 dict 리스트 (레코드 순서, 필드 안의 순서 유지)
+        """
+        links = []
+        for app in apps:
+            for field in fields:
+                value = app.get(field)
+                urls = value if isinstance(value, (list, tuple)) else [value]
+                for index, url in enumerate(urls):
+                    if url:
+                        links.append((app.get('app_id'), field, index, url))
+
+        started = time.time()
+        results = self.download_all(url for _, _, _, url in links)
+        manifest = []
+        for app_id, field, index, url in links:
+            result = results[url]
+            manifest.append({
+                'app_id': app_id, 'field': field, 'index': index, 'url': url, 'sha256': result['sha256'],
+                'path': os.path.relpath(result['path'], self.asset_dir) if result['path'] else None,
+                'size': result['size'], 'content_type': result['content_type'], 'status': result['status']
+            })
+
+        print(f"에셋 {len(results)}개 처리 ({time.time() - started:.1f}초): "
+              f"새로 받음 {self.stats['downloaded']}, 중복 {self.stats['deduplicated']}, "
+              f"재검증 {self.stats['revalidated']}, 재사용 {self.stats['cached']}, 실패 {self.stats['failed']}")
+
+        if manifest_path:
+            self.save_manifest(manifest, manifest_path)
+        return manifest
+
+    def manifest_path_for(self, export_path):
+        """내보내기 파일 하나에 대응하는 매니페스트 경로 (asset_dir/manifests/<파일 이름>.jsonl)"""
+        name = os.path.basename(export_path).split('.')[0]
+        return os.path.join(self.asset_dir, "manifests", name + ".jsonl")
+
+    def save_manifest(self, manifest, filepath=None):
+        """매니페스트 저장 (기본값: asset_dir/manifest_날짜.jsonl)"""
+        if filepath is None:
+            filepath = os.path.join(self.asset_dir, f"manifest_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
+        with StreamingExporter(filepath, fieldnames=MANIFEST_FIELDS) as exporter:
+            exporter.write_all(manifest)
+        print(f"매니페스트 저장 완료: {filepath}")
+        return filepath
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+if __name__ == "__main__":
+    from AppStoreTopScraper import AppStoreTopScraper
+
+    scraper = AppStoreTopScraper(country='kr', limit=10)
+    apps = scraper.scrape_top_apps_with_details()
+    downloader = AssetDownloader()
+    downloader.download_records(apps, manifest_path=os.path.join("exports", "assets", "manifest.jsonl"))
+    downloader.close()
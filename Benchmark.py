@@ -0,0 +1,301 @@
+import os
+import sys
+import json
+import time
+import shutil
+import subprocess
+import argparse
+import tempfile
+import tracemalloc
+from AppStoreTopScraper import AppStoreTopScraper
+from GooglePlayStoreTopScraper import GooglePlayStoreTopScraper
+from AdaptivePacer import AdaptivePacer
+from HttpClient import HttpClient
+from ReplayServer import ReplayServer
+from StreamingExporter import StreamingExporter
+
+SCENARIOS = ('appstore_rss', 'appstore_details', 'googleplay', 'googleplay_details', 'export', 'import')
+
+# 시작 시간을 측정할 모듈과, 모듈을 불러오는 것만으로는 로드되면 안 되는 무거운 의존성
+IMPORT_TARGETS = ('main', 'AppStoreTopScraper', 'GooglePlayStoreTopScraper', 'MatrixScheduler')
+HEAVY_MODULES = ('pandas', 'numpy', 'bs4', 'lxml.etree')
+IMPORT_SCRIPT = (
+    "import sys, time, json\n"
+    "started = time.perf_counter()\n"
+    "import {module}\n"
+    "elapsed = time.perf_counter() - started\n"
+    "print(json.dumps({{'seconds': elapsed, 'heavy': [m for m in {heavy!r} if m in sys.modules]}}))\n"
+)
+
+# 비교 시 회귀로 판단할 지표와 방향 (True면 클수록 좋음)
+COMPARED_METRICS = {'throughput': True, 'p50': False, 'p99': False, 'peak_memory_mb': False}
+
+
+def percentile(values, fraction):
+    """정렬한 값에서 fraction 위치의 값 (최근접 순위 방식)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+class Benchmark:
+    def __init__(self, server, iterations=5, limit=200, max_workers=8, output_dir=None):
+        """
+        ReplayServer를 대상으로 스크래퍼와 내보내기를 반복 실행하여 성능 측정
+
+        각 시나리오마다 반복 실행 시간, 요청별 응답 시간(p50/p99), 처리량(초당 레코드 수),
+        tracemalloc 기준 최대 메모리를 기록한다.
+
+        Args:
+            server: 실행 중인 ReplayServer
+            iterations: 시나리오별 반복 횟수
+            limit: 차트당 앱 개수
+            max_workers: 상세 정보 동시 요청 수
+            output_dir: 내보내기 시나리오용 임시 폴더 (None이면 자동 생성 후 삭제)
+        """
+        self.server = server
+        self.iterations = iterations
+        self.limit = limit
+        self.max_workers = max_workers
+        self.output_dir = output_dir
+
+    def make_client(self, latencies):
+        """캐시 없이 요청마다 응답 시간을 기록하는 HttpClient"""
+        client = HttpClient(pool_maxsize=max(20, self.max_workers * 2), backoff_factor=0.01, backoff_jitter=0)
+        client.session.hooks['response'].append(
+            lambda response, *args, **kwargs: latencies.append(response.elapsed.total_seconds()))
+        return client
+
+    def make_pacer(self):
+        """벤치마크용 페이서 (상태 파일을 쓰지 않고, 속도 제한이 측정을 가리지 않도록 높게 설정)"""
+        return AdaptivePacer(host=self.server.url.split('//')[-1], state_path=None, initial_rate=1000.0,
+                             max_rate=1000.0, block_pause=0.1)
+
+    def measure(self, name, func):
+        """
+        func(client)를 반복 실행하여 지표 계산
+
+        Args:
+            name: 시나리오 이름
+            func: client를 받아 처리한 레코드 수를 반환하는 함수
+
+        Returns:
+            dict: 시나리오 결과
+        """
+        latencies = []
+        durations = []
+        records = 0
+        client = self.make_client(latencies)
+
+        tracemalloc.start()
+        try:
+            for _ in range(self.iterations):
+                started = time.perf_counter()
+                records += func(client)
+                durations.append(time.perf_counter() - started)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            client.session.close()
+
+        total = sum(durations)
+        # 요청이 없는 시나리오(내보내기)는 반복 실행 시간으로 분위수 계산
+        samples = latencies or durations
+        result = {
+            'scenario': name,
+            'iterations': self.iterations,
+            'records': records,
+            'requests': len(latencies),
+            'seconds': round(total, 4),
+            'throughput': round(records / total, 2) if total else 0.0,
+            'p50': round(percentile(samples, 0.50) * 1000, 2),
+            'p99': round(percentile(samples, 0.99) * 1000, 2),
+            'peak_memory_mb': round(peak / (1024 * 1024), 2)
+        }
+        print(f"{name}: {result['throughput']}건/초, p50 {result['p50']}ms, p99 {result['p99']}ms, "
+              f"최대 메모리 {result['peak_memory_mb']}MB ({result['requests']}회 요청)")
+        return result
+
+    def run_appstore_rss(self, client):
+        scraper = AppStoreTopScraper(limit=self.limit, max_workers=self.max_workers, requests_per_second=1000.0,
+                                     client=client, base_url=self.server.url)
+        return len(scraper.get_top_apps())
+
+    def run_appstore_details(self, client):
+        scraper = AppStoreTopScraper(limit=self.limit, max_workers=self.max_workers, requests_per_second=1000.0,
+                                     client=client, base_url=self.server.url)
+        return len(scraper.scrape_top_apps_with_details(fetch_details=True))
+
+    def run_googleplay(self, client, fetch_details=False):
+        apps = GooglePlayStoreTopScraper.get_google_play_top_apps(
+            client=client, limit=self.limit, fetch_details=fetch_details, pacer=self.make_pacer(),
+            base_url=self.server.url)
+        return len(apps)
+
+    def run_export(self, scraper, records, output_dir):
+        """목록 저장(csv/json)과 스트리밍 저장(jsonl/csv.gz)을 모두 실행"""
+        scraper.save_to_csv(records, os.path.join(output_dir, 'bench.csv'))
+        scraper.save_to_json(records, os.path.join(output_dir, 'bench.json'))
+        for extension in ('jsonl', 'csv.gz'):
+            with StreamingExporter(os.path.join(output_dir, f'bench.{extension}')) as exporter:
+                exporter.write_all(records)
+        return len(records) * 4
+
+    def measure_import(self, module):
+        """
+        새 인터프리터에서 module을 불러오는 시간 측정 (반복마다 새 프로세스)
+
+        Returns:
+            dict: 시나리오 결과 (peak_memory_mb 대신 불러온 무거운 모듈 목록 포함)
+        """
+        script = IMPORT_SCRIPT.format(module=module, heavy=HEAVY_MODULES)
+        project_dir = os.path.dirname(os.path.abspath(__file__))
+        durations = []
+        heavy = set()
+        for _ in range(self.iterations):
+            output = subprocess.run([sys.executable, '-c', script], cwd=project_dir, capture_output=True,
+                                    text=True, check=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            durations.append(result['seconds'])
+            heavy.update(result['heavy'])
+
+        name = f"import_{module}"
+        total = sum(durations)
+        result = {
+            'scenario': name,
+            'iterations': self.iterations,
+            'records': self.iterations,
+            'requests': 0,
+            'seconds': round(total, 4),
+            'throughput': round(self.iterations / total, 2) if total else 0.0,
+            'p50': round(percentile(durations, 0.50) * 1000, 2),
+            'p99': round(percentile(durations, 0.99) * 1000, 2),
+            'heavy_modules': sorted(heavy)
+        }
+        print(f"{name}: p50 {result['p50']}ms, p99 {result['p99']}ms, "
+              f"무거운 모듈: {', '.join(result['heavy_modules']) or '없음'}")
+        return result
+
+    def run(self, scenarios=SCENARIOS):
+        """
+        선택한 시나리오 실행
+
+        Returns:
+            dict: {'scenarios': {이름: 결과}, 'server': 서버 통계}
+        """
+        results = {}
+        output_dir = self.output_dir or tempfile.mkdtemp(prefix='bench_')
+        try:
+            for name in scenarios:
+                print(f"\n=== {name} ===")
+                if name == 'appstore_rss':
+                    results[name] = self.measure(name, self.run_appstore_rss)
+                elif name == 'appstore_details':
+                    results[name] = self.measure(name, self.run_appstore_details)
+                elif name == 'googleplay':
+                    results[name] = self.measure(name, self.run_googleplay)
+                elif name == 'googleplay_details':
+                    results[name] = self.measure(name, lambda client: self.run_googleplay(client, True))
+                elif name == 'export':
+                    # 내보내기 대상은 측정 밖에서 한 번만 수집
+                    scraper = AppStoreTopScraper(limit=self.limit, max_workers=self.max_workers,
+                                                 requests_per_second=1000.0, base_url=self.server.url,
+                                                 client=HttpClient())
+                    records = scraper.scrape_top_apps_with_details(fetch_details=True)
+                    results[name] = self.measure(name, lambda client: self.run_export(scraper, records, output_dir))
+                elif name == 'import':
+                    for module in IMPORT_TARGETS:
+                        results[f"import_{module}"] = self.measure_import(module)
+        finally:
+            if not self.output_dir:
+                shutil.rmtree(output_dir, ignore_errors=True)
+        return {'scenarios': results, 'server': dict(self.server.stats)}
+
+
+def compare_results(results, baseline, tolerance):
+    """
+    기준 결과와 비교하여 tolerance 비율 이상 나빠진 지표 목록 반환
+
+    Returns:
+        list: 회귀 설명 문자열
+    """
+    regressions = []
+    for name, result in results['scenarios'].items():
+        base = baseline.get('scenarios', {}).get(name)
+        if not base:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = base.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{name}.{metric}: {old} -> {new} ({change:+.0%})")
+        # 모듈을 불러오기만 해도 새로 로드되는 무거운 의존성
+        added = sorted(set(result.get('heavy_modules', ())) - set(base.get('heavy_modules', ())))
+        if added:
+            regressions.append(f"{name}.heavy_modules: {', '.join(added)} 추가 로드")
+    return regressions
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="로컬 재생 서버를 이용한 오프라인 성능 측정")
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS), help="실행할 시나리오")
+    parser.add_argument('--iterations', type=int, default=5, help="시나리오별 반복 횟수")
+    parser.add_argument('--limit', type=int, default=200, help="차트당 앱 개수")
+    parser.add_argument('--workers', type=int, default=8, help="상세 정보 동시 요청 수")
+    parser.add_argument('--fixtures', help="녹화한 응답 폴더 (없으면 합성 응답 사용)")
+    parser.add_argument('--record', action='store_true', help="실제 서버 응답을 --fixtures 폴더에 녹화하고 종료")
+    parser.add_argument('--latency', type=float, default=0.0, help="요청당 지연 (초)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="무작위 추가 지연 최대값 (초)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="HTTP 오류 주입 확률 (0~1)")
+    parser.add_argument('--error-status', type=int, default=503, help="주입할 HTTP 상태 코드")
+    parser.add_argument('--challenge-rate', type=float, default=0.0, help="Play 봇 확인 페이지 주입 확률 (0~1)")
+    parser.add_argument('--seed', type=int, default=1, help="지연/오류 주입 난수 시드")
+    parser.add_argument('--output', help="결과를 저장할 JSON 파일")
+    parser.add_argument('--baseline', help="비교할 이전 결과 JSON 파일")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="회귀로 판단할 악화 비율")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    if args.record:
+        if not args.fixtures:
+            print("--record에는 --fixtures 폴더가 필요합니다.")
+            return 1
+        ReplayServer.record_fixtures(args.fixtures, HttpClient())
+        return 0
+
+    with ReplayServer(fixtures_dir=args.fixtures, latency=args.latency, jitter=args.jitter,
+                      error_rate=args.error_rate, error_status=args.error_status,
+                      challenge_rate=args.challenge_rate, seed=args.seed) as server:
+        print(f"재생 서버 시작: {server.url}")
+        benchmark = Benchmark(server, iterations=args.iterations, limit=args.limit, max_workers=args.workers)
+        results = benchmark.run(args.scenarios)
+
+    results['options'] = {key: value for key, value in vars(args).items() if key not in ('output', 'baseline')}
+    print(f"\n서버 통계: {results['server']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장 완료: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare_results(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\n성능 회귀 발견:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("\n기준 대비 성능 회귀 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+import os
+import csv
+import gzip
+import zlib
+import hashlib
+import sqlite3
+import threading
+from functools import lru_cache
+import FastJson
+
+# 내용 해시 참조로 바꿔 저장할 큰 필드
+BLOB_FIELDS = ('description', 'summary', 'screenshots', 'languages')
+
+# 레코드에 남는 참조 문자열: blob:<sha256>
+REF_PREFIX = 'blob:'
+REF_LENGTH = len(REF_PREFIX) + 64
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL
+);
+"""
+
+
+def is_ref(value):
+    """값이 blob 참조 문자열인지 여부"""
+    return value.__class__ is str and len(value) == REF_LENGTH and value.startswith(REF_PREFIX)
+
+
+class BlobStore:
+    def __init__(self, db_path=os.path.join("exports", "blobs.db"), fields=BLOB_FIELDS, min_size=64,
+                 cache_size=4096):
+        """
+        큰 필드 값을 내용 해시 기준으로 한 번만 저장하는 저장소
+
+        설명/요약/스크린샷/언어처럼 크고 잘 바뀌지 않는 값은 국가/차트/실행마다 같은 내용이 반복되므로,
+        값은 blobs.db에 zlib 압축해 한 번만 두고 내보내는 레코드에는 'blob:<sha256>' 참조만 남긴다.
+        읽을 때는 rehydrate / read로 필요한 필드만 원래 값으로 되돌린다.
+
+        Args:
+            db_path: 저장소 데이터베이스 경로
+            fields: 참조로 바꿀 필드
+            min_size: 인코딩한 크기가 이보다 작은 값은 참조보다 작으므로 그대로 둠 (바이트)
+            cache_size: 읽기용으로 메모리에 둘 최근 값 개수
+        """
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.db_path = db_path
+        self.fields = tuple(fields)
+        self.min_size = min_size
+        self.stats = {'stored': 0, 'deduplicated': 0, 'inline': 0, 'bytes_saved': 0}
+        self._known = set()  # 이 프로세스에서 이미 저장을 확인한 해시
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._load = lru_cache(maxsize=cache_size)(self._load_uncached)
+
+    def put(self, value):
+        """
+        값 하나 저장
+
+        Returns:
+            str: 참조 문자열 (min_size보다 작은 값이면 None)
+        """
+        data = FastJson.dumpb(value)
+        if len(data) < self.min_size:
+            self.stats['inline'] += 1
+            return None
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            if digest in self._known:
+                self.stats['deduplicated'] += 1
+            else:
+                with self._conn:
+                    cursor = self._conn.execute("INSERT OR IGNORE INTO blobs (hash, data, size) VALUES (?, ?, ?)",
+                                                (digest, zlib.compress(data), len(data)))
+                self._known.add(digest)
+                self.stats['stored' if cursor.rowcount else 'deduplicated'] += 1
+            self.stats['bytes_saved'] += len(data) - REF_LENGTH
+        return REF_PREFIX + digest
+
+    def get(self, ref):
+        """참조 문자열의 원래 값 (없는 참조면 KeyError)"""
+        return self._load(ref[len(REF_PREFIX):])
+
+    def _load_uncached(self, digest):
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM blobs WHERE hash = ?", (digest,)).fetchone()
+        if row is None:
+            raise KeyError(f"저장소에 없는 blob: {digest}")
+        return FastJson.loads(zlib.decompress(row[0]))
+
+    def pack(self, record):
+        """
+        레코드의 큰 필드를 참조로 바꾼 dict 반환 (원본 레코드는 바꾸지 않음)
+        """
+        packed = dict(record)
+        for field in self.fields:
+            value = packed.get(field)
+            if value is None or value == '' or value == [] or is_ref(value):
+                continue
+            ref = self.put(value)
+            if ref:
+                packed[field] = ref
+        return packed
+
+    def pack_all(self, records):
+        """레코드 리스트 전체를 pack (내보내기 직전에 사용)"""
+        return [self.pack(record) for record in records]
+
+    def rehydrate(self, record, fields=None):
+        """
+        참조를 원래 값으로 되돌린 dict 반환
+
+        Args:
+            record: pack한 레코드
+            fields: 되돌릴 필드 (None이면 참조인 필드 전체, 필요한 필드만 지정하면 나머지는 읽지 않음)
+        """
+        restored = dict(record)
+        for field in (fields or restored.keys()):
+            value = restored.get(field)
+            if is_ref(value):
+                restored[field] = self.get(value)
+        return restored
+
+    def read(self, filepath, fields=None):
+        """
+        pack해서 내보낸 파일을 읽으며 레코드를 하나씩 되돌려 반환
+
+        Args:
+            filepath: .json / .jsonl / .jsonl.gz / .csv / .csv.gz 파일
+            fields: 되돌릴 필드 (None이면 전체)
+
+        Returns:
+            iterator: 레코드 dict
+        """
+        for record in iter_records(filepath):
+            yield self.rehydrate(record, fields)
+
+    def size(self):
+        """저장된 blob 수와 (원본 크기, 압축 크기) 합계"""
+        with self._lock:
+            count, raw, stored = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(LENGTH(data)), 0) FROM blobs").fetchone()
+        return {'blobs': count, 'raw_bytes': raw, 'stored_bytes': stored}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def iter_records(filepath):
+    """
+    내보낸 파일을 레코드 단위로 읽기 (형식은 확장자로 판단)
+
+    CSV는 JSON 문자열로 기록된 리스트/딕셔너리 값을 다시 디코딩한다.
+    """
+    if filepath.endswith('.json'):
+        with open(filepath, 'rb') as f:
+            records = FastJson.loads(f.read())
+        yield from (records if isinstance(records, list) else [records])
+        return
+
+    opener = gzip.open if filepath.endswith('.gz') else open
+    if '.jsonl' in filepath:
+        with opener(filepath, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield FastJson.loads(line)
+        return
+
+    with opener(filepath, 'rt', encoding='utf-8-sig', newline='') as f:
+        for row in csv.DictReader(f):
+            for key, value in row.items():
+                if value and value[0] in '[{':
+                    try:
+                        row[key] = FastJson.loads(value)
+                    except ValueError:
+                        pass
+            yield row
+
+
+def pack_file(source, target, blob_store):
+    """
+    기존 내보내기 파일을 참조 형식으로 다시 저장 (기존 보관 파일 정리용)
+
+    Returns:
+        int: 기록한 레코드 수
+    """
+    from StreamingExporter import StreamingExporter
+
+    if target.endswith('.json'):
+        records = blob_store.pack_all(iter_records(source))
+        FastJson.dump_file(records, target)
+        return len(records)
+    with StreamingExporter(target, blob_store=blob_store) as exporter:
+        exporter.write_all(iter_records(source))
+        return exporter.count
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 3:
+        print("사용법: python BlobStore.py <원본 파일> <저장할 파일> [blobs.db 경로]")
+        sys.exit(1)
+    store = BlobStore(sys.argv[3]) if len(sys.argv) > 3 else BlobStore()
+    count = pack_file(sys.argv[1], sys.argv[2], store)
+    print(f"{count}개 레코드 저장: {sys.argv[2]} ({os.path.getsize(sys.argv[1]):,} → {os.path.getsize(sys.argv[2]):,} 바이트)")
+    print(f"blob 저장소: {store.size()}")
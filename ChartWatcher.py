@@ -0,0 +1,225 @@
+import os
+import time
+import threading
+from urllib.parse import urlparse
+from datetime import datetime
+from StreamingExporter import StreamingExporter
+from Metrics import get_metrics
+
+EVENT_TYPES = ('entered', 'exited', 'moved', 'price_changed')
+
+# 변화 비교에 필요한 필드만 수집 (rank/app_id/name은 항상 포함, 상세 요청 생략)
+WATCH_FIELDS = ['price']
+
+
+def diff_charts(previous, current, min_move=1):
+    """
+    두 순위 목록의 차이를 이벤트로 변환
+
+    Args:
+        previous: 이전 순위 목록 (앱 정보 리스트)
+        current: 새 순위 목록
+        min_move: moved 이벤트로 볼 최소 순위 변화 폭
+
+    Returns:
+        list: 이벤트 dict 리스트 (exited → entered → moved → price_changed, 각각 순위 순서)
+    """
+    before = {str(app['app_id']): app for app in previous if app.get('app_id')}
+    after = {str(app['app_id']): app for app in current if app.get('app_id')}
+
+    events = []
+    for app_id, app in before.items():
+        if app_id not in after:
+            events.append({'type': 'exited', 'app_id': app_id, 'name': app.get('name'),
+                           'rank': None, 'previous_rank': app.get('rank')})
+
+    moved = []
+    price_changed = []
+    for app_id, app in after.items():
+        old = before.get(app_id)
+        if old is None:
+            events.append({'type': 'entered', 'app_id': app_id, 'name': app.get('name'),
+                           'rank': app.get('rank'), 'previous_rank': None})
+            continue
+        rank, previous_rank = app.get('rank'), old.get('rank')
+        if rank is not None and previous_rank is not None and abs(previous_rank - rank) >= min_move:
+            moved.append({'type': 'moved', 'app_id': app_id, 'name': app.get('name'),
+                          'rank': rank, 'previous_rank': previous_rank, 'delta': previous_rank - rank})
+        if 'price' in app and 'price' in old and app['price'] != old['price']:
+            price_changed.append({'type': 'price_changed', 'app_id': app_id, 'name': app.get('name'),
+                                  'rank': rank, 'price': app['price'], 'previous_price': old['price']})
+    return events + moved + price_changed
+
+
+class ChartWatcher:
+    def __init__(self, targets, interval=300, output=None, callback=None, min_move=1, limit=100,
+                 client=None, requests_per_second=2.0, appstore_base_url="https://itunes.apple.com",
+                 play_base_url="https://play.google.com", cache_dir=os.path.join("exports", ".watch_cache")):
+        """
+        차트를 주기적으로 다시 받아 바뀐 내용만 이벤트로 내보내는 감시 데몬
+
+        (스토어, 국가, 차트)별 마지막 순위 목록을 메모리에 두고, 매 주기마다 새 목록과 비교해
+        entered / exited / moved / price_changed 이벤트만 JSONL 파일이나 콜백으로 보낸다.
+        순위 비교에 필요한 필드만 받으므로 상세 정보 요청과 전체 파일 저장이 없고,
+        RSS 응답은 ETag / Last-Modified로 재검증해 바뀌지 않은 피드는 본문을 다시 받지 않는다.
+
+        Args:
+            targets: 감시 대상 (store, country, chart, genre) 튜플 리스트 (make_targets로 생성)
+            interval: 폴링 주기 (초)
+            output: 이벤트를 이어서 기록할 JSONL 파일 경로 (None이면 기록하지 않음)
+            callback: 이벤트 하나마다 호출할 함수 (선택)
+            min_move: moved 이벤트로 볼 최소 순위 변화 폭
+            limit: 차트당 비교할 순위 수
+            client: 사용할 HttpClient (기본값: RSS를 매번 재검증하는 전용 클라이언트)
+            requests_per_second: iTunes 호스트에 대한 초당 요청 수 제한
+            appstore_base_url, play_base_url: 서버 주소 (로컬 재생 서버 지정 시 사용)
+            cache_dir: 기본 클라이언트가 RSS 응답을 재검증용으로 저장할 폴더 (client를 넘기면 사용 안 함)
+        """
+        self.targets = [tuple(target) for target in targets]
+        self.interval = interval
+        self.output = output
+        self.callback = callback
+        self.min_move = min_move
+        self.limit = limit
+        self.requests_per_second = requests_per_second
+        self.appstore_base_url = appstore_base_url
+        self.play_base_url = play_base_url
+        self.metrics = get_metrics()
+        self.charts = {}  # (store, country, chart, genre) -> 마지막 순위 목록
+        self.stats = {'polls': 0, 'checks': 0, 'failures': 0, 'events': 0}
+        self._stop = threading.Event()
+        self._scrapers = {}
+        # 구글 플레이는 폴링마다 새로 만들지 않도록 페이서(학습한 속도)와 파서(학습한 선택자)를 유지
+        self._play_pacer = None
+        self._play_parser = None
+
+        if client is None:
+            from HttpClient import HttpClient
+            from HttpCache import HttpCache
+            # TTL 0: 매번 조건부 요청으로 재검증 (바뀌지 않았으면 304, 본문 없음)
+            client = HttpClient(cache=HttpCache(cache_dir, ttls=((r'/rss/', 0),)))
+        self.client = client
+        self._exporter = StreamingExporter(output, append=True) if output else None
+
+    @staticmethod
+    def make_targets(stores, countries, charts=('topfreeapplications',), genres=('all',)):
+        """스토어 × 국가 × 차트 × 장르 감시 대상 목록 (구글 플레이는 국가별 인기 무료 차트 하나)"""
+        targets = []
+        for store in stores:
+            for country in countries:
+                if store == 'googleplay':
+                    targets.append(('googleplay', country, 'topselling_free', 'all'))
+                else:
+                    targets.extend(('appstore', country, chart, genre) for chart in charts for genre in genres)
+        return targets
+
+    def fetch(self, target):
+        """
+        대상 하나의 현재 순위 목록 (실패하면 빈 리스트)
+        """
+        store, country, chart, genre = target
+        if store == 'googleplay':
+            from GooglePlayStoreTopScraper import GooglePlayStoreTopScraper
+            if self._play_pacer is None:
+                from AdaptivePacer import AdaptivePacer
+                from GooglePlayParser import GooglePlayParser
+                self._play_pacer = AdaptivePacer.for_host(urlparse(self.play_base_url).netloc)
+                self._play_parser = GooglePlayParser(fields=WATCH_FIELDS)
+            return GooglePlayStoreTopScraper.get_google_play_top_apps(
+                client=self.client, country=country, limit=self.limit, fetch_details=False,
+                pacer=self._play_pacer, base_url=self.play_base_url, fields=WATCH_FIELDS,
+                parser=self._play_parser)
+
+        scraper = self._scrapers.get(country)
+        if scraper is None:
+            from AppStoreTopScraper import AppStoreTopScraper
+            scraper = AppStoreTopScraper(country=country, limit=self.limit, client=self.client,
+                                         requests_per_second=self.requests_per_second,
+                                         base_url=self.appstore_base_url, fields=WATCH_FIELDS)
+            self._scrapers[country] = scraper
+        return scraper.get_top_apps(category=genre, chart_type=chart)
+
+    def poll_once(self):
+        """
+        모든 대상을 한 번씩 확인하고 이벤트 내보내기
+
+        처음 받은 목록은 기준으로만 저장하고, 받지 못한 대상은 이전 목록을 유지한다
+        (수집 실패를 전체 이탈로 잘못 보내지 않도록).
+
+        Returns:
+            list: 이번 주기의 이벤트
+        """
+        taken_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        events = []
+        for target in self.targets:
+            store, country, chart, genre = target
+            apps = self.fetch(target)
+            self.stats['checks'] += 1
+            if not apps:
+                self.stats['failures'] += 1
+                self.metrics.increment('watch_failures_total', store=store)
+                continue
+
+            current = [{'app_id': app.get('app_id'), 'rank': app.get('rank'), 'name': app.get('name'),
+                        **({'price': app['price']} if 'price' in app else {})} for app in apps]
+            previous = self.charts.get(target)
+            self.charts[target] = current
+            if previous is None:
+                continue
+
+            for event in diff_charts(previous, current, self.min_move):
+                event.update(store=store, country=country, chart=chart, genre=genre, taken_at=taken_at)
+                events.append(event)
+                self.metrics.increment('watch_events_total', store=store, type=event['type'])
+
+        self.stats['polls'] += 1
+        self.stats['events'] += len(events)
+        self.emit(events)
+        return events
+
+    def emit(self, events):
+        """이벤트를 JSONL 파일(한 줄씩 flush)과 콜백으로 전달"""
+        for event in events:
+            if self._exporter:
+                self._exporter.write(event)
+            if self.callback:
+                self.callback(event)
+
+    def run(self, iterations=None):
+        """
+        stop()이 호출되거나 iterations번 확인할 때까지 interval마다 폴링
+
+        확인에 걸린 시간을 빼고 대기하므로 주기가 밀리지 않는다.
+        """
+        print(f"차트 감시 시작: 대상 {len(self.targets)}개, {self.interval}초 주기")
+        count = 0
+        try:
+            while not self._stop.is_set():
+                started = time.monotonic()
+                events = self.poll_once()
+                count += 1
+                summary = ', '.join(f"{kind} {sum(1 for event in events if event['type'] == kind)}"
+                                    for kind in EVENT_TYPES)
+                print(f"[{datetime.now().strftime('%H:%M:%S')}] 확인 {count}회: 이벤트 {len(events)}개 ({summary})")
+                if iterations is not None and count >= iterations:
+                    break
+                self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+        except KeyboardInterrupt:
+            print("감시 중단")
+        finally:
+            self.close()
+        return self.stats
+
+    def stop(self):
+        """다른 스레드에서 감시 종료 요청"""
+        self._stop.set()
+
+    def close(self):
+        if self._exporter:
+            self._exporter.close()
+
+
+if __name__ == "__main__":
+    watcher = ChartWatcher(ChartWatcher.make_targets(['appstore'], ['kr', 'us']), interval=300,
+                           output=os.path.join("exports", "chart_events.jsonl"))
+    watcher.run()
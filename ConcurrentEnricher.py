@@ -0,0 +1,40 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ConcurrentEnricher:
+    def __init__(self, max_workers=4, rate_limiter=None):
+        """
+        상세 정보 요청을 스레드 풀로 병렬 처리하는 클래스
+
+        Args:
+            max_workers: 동시에 실행할 최대 요청 수
+            rate_limiter: 요청 전에 토큰을 확보할 RateLimiter (없으면 제한 없음)
+        """
+        self.max_workers = max(1, int(max_workers))
+        self.rate_limiter = rate_limiter
+
+    def _call(self, func, item):
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        return func(item)
+
+    def map(self, func, items):
+        """
+        items 각각에 func를 병렬 적용
+
+        Args:
+            func: 항목 하나를 받아 결과를 반환하는 함수
+            items: 처리할 항목 리스트
+
+        Returns:
+            iterator: 입력 순서(순위 순서) 그대로의 결과
+        """
+        items = list(items)
+        if self.max_workers == 1 or len(items) <= 1:
+            for item in items:
+                yield self._call(func, item)
+            return
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as executor:
+            for result in executor.map(lambda item: self._call(func, item), items):
+                yield result
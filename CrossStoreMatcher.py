@@ -0,0 +1,407 @@
+import re
+import threading
+import unicodedata
+from collections import Counter
+import FastJson
+
+# 이름 비교 전에 제거하는 흔한 단어
+NAME_STOPWORDS = frozenset(('the', 'app', 'apps', 'for', 'and', 'free', 'lite', 'pro', 'hd', 'official', 'mobile'))
+
+# 개발사 이름 비교 전에 제거하는 법인 형태 표기
+DEVELOPER_SUFFIXES = frozenset((
+    'inc', 'incorporated', 'llc', 'ltd', 'limited', 'co', 'corp', 'corporation', 'company', 'gmbh', 'ag', 'sa',
+    'sas', 'srl', 'bv', 'ab', 'oy', 'kk', 'plc', 'pte', 'pty', 'group', 'holdings', 'games', 'studio', 'studios',
+    'entertainment', 'interactive', 'technologies', 'technology', 'software', 'labs', 'mobile',
+    '주식회사', '유한회사', '주', '株式会社'
+))
+
+_PUNCTUATION = re.compile(r"[^\w\s]+")
+_SUBTITLE = re.compile(r"\s+[-–—:|]\s+.*$")
+
+# 신뢰도 가중치 (이름 유사도, 개발사 유사도)
+NAME_WEIGHT = 0.65
+DEVELOPER_WEIGHT = 0.35
+# 토큰 포함 관계만으로 얻는 이름 유사도 상한
+CONTAINMENT_WEIGHT = 0.85
+
+
+def _fold(text):
+    """유니코드 정규화 + 소문자 + 구두점 제거"""
+    text = unicodedata.normalize('NFKC', str(text or '')).lower()
+    return _PUNCTUATION.sub(' ', text)
+
+
+def normalize_name(name):
+    """
+    앱 이름 정규화 (부제목 '- ...', ': ...' 와 흔한 단어 제거)
+
+    Returns:
+        tuple: 정규화된 토큰
+    """
+    name = unicodedata.normalize('NFKC', str(name or ''))
+    stripped = _SUBTITLE.sub('', name)
+    tokens = _fold(stripped or name).split()
+    kept = [token for token in tokens if token not in NAME_STOPWORDS]
+    return tuple(kept or tokens)
+
+
+def normalize_developer(developer):
+    """개발사 이름 정규화 (법인 형태 표기 제거)"""
+    tokens = _fold(developer).split()
+    kept = [token for token in tokens if token not in DEVELOPER_SUFFIXES]
+    return tuple(kept or tokens)
+
+
+def trigrams(tokens):
+    """토큰을 이어 붙인 문자열의 3글자 조각 집합 (짧은 이름은 양끝을 채워서 생성)"""
+    text = f"  {' '.join(tokens)} "
+    return frozenset(text[i:i + 3] for i in range(len(text) - 2))
+
+
+def _containment(left, right):
+    """짧은 쪽 토큰 중 긴 쪽에도 있는 비율"""
+    if not left or not right:
+        return 0.0
+    return len(set(left) & set(right)) / min(len(set(left)), len(set(right)))
+
+
+def _jaccard(left, right):
+    if not left or not right:
+        return 0.0
+    shared = len(left & right)
+    return shared / (len(left) + len(right) - shared)
+
+
+class _Entry:
+    __slots__ = ('app_id', 'name', 'developer', 'bundle_id', 'name_tokens', 'developer_tokens', 'grams')
+
+    def __init__(self, app_id, name, developer, bundle_id):
+        self.app_id = app_id
+        self.name = name
+        self.developer = developer
+        self.bundle_id = bundle_id
+        self.name_tokens = normalize_name(name)
+        self.developer_tokens = normalize_developer(developer)
+        self.grams = trigrams(self.name_tokens)
+
+
+class CrossStoreMatcher:
+    def __init__(self, min_confidence=0.6, max_candidates=50, max_gram_frequency=500):
+        """
+        App Store 레코드와 Google Play 레코드를 같은 제품끼리 연결하는 인덱스
+
+        모든 쌍을 비교하지 않도록 스토어별로 다음 인덱스를 두고, 후보만 점수를 매긴다.
+        - 번들 ID 인덱스: App Store bundle_id == Play 패키지 이름이면 신뢰도 1.0으로 바로 연결
+        - 이름 3글자 조각 인덱스: 조각을 많이 공유하는 이름만 후보로 선정 (blocking)
+        - 개발사 인덱스: 정규화한 개발사 이름이 같은 앱도 후보에 추가
+
+        레코드는 여러 번 나누어 추가할 수 있으며, 새로 추가되거나 바뀐 레코드만 반대편 인덱스와 비교한다.
+        연결은 1:1이며, 더 높은 신뢰도의 후보가 나타나면 기존 연결을 교체한다.
+
+        Args:
+            min_confidence: 연결로 인정할 최소 신뢰도 (0~1)
+            max_candidates: 레코드 하나당 점수를 매길 최대 후보 수
+            max_gram_frequency: 이보다 많은 이름에 나오는 조각은 후보 선정에 쓰지 않음 (흔한 조각 제외)
+        """
+        self.min_confidence = min_confidence
+        self.max_candidates = max_candidates
+        self.max_gram_frequency = max_gram_frequency
+
+        self._entries = {'appstore': {}, 'googleplay': {}}
+        self._gram_index = {'appstore': {}, 'googleplay': {}}  # 조각 -> app_id 집합
+        self._developer_index = {'appstore': {}, 'googleplay': {}}  # 정규화 개발사 -> app_id 집합
+        self._bundle_index = {}  # bundle_id -> App Store app_id
+
+        self._links = {}  # App Store app_id -> (Play app_id, 신뢰도, 방법)
+        self._reverse = {}  # Play app_id -> App Store app_id
+        self._lock = threading.Lock()
+
+    def add_appstore(self, apps):
+        """
+        App Store 레코드 추가 (get_top_apps / scrape_top_apps_with_details 결과)
+
+        Returns:
+            list: 이번 추가로 새로 생기거나 바뀐 연결 (pairs와 같은 형식)
+        """
+        return self._add('appstore', [
+            (app.get('app_id'), app.get('name'), app.get('artist') or app.get('developer'), app.get('bundle_id'))
+            for app in apps
+        ])
+
+    def add_googleplay(self, apps):
+        """
+        Google Play 레코드 추가 (get_google_play_top_apps 결과, app_id가 패키지 이름)
+
+        Returns:
+            list: 이번 추가로 새로 생기거나 바뀐 연결
+        """
+        return self._add('googleplay', [
+            (app.get('app_id'), app.get('name'), app.get('developer'), None)
+            for app in apps
+        ])
+
+    def add_snapshots(self, snapshot_store, since=None, countries=None):
+        """
+        SnapshotStore에 저장된 항목을 추가 (스냅샷이 쌓일 때마다 since만 옮겨 호출)
+
+        스냅샷에는 bundle_id가 없으므로 이 경로로 들어온 App Store 앱은 이름/개발사로만 연결된다.
+
+        Returns:
+            list: 새로 생기거나 바뀐 연결
+        """
+        by_store = {'appstore': [], 'googleplay': []}
+        for store, _, _, _, app_id, _, name, developer, *_ in snapshot_store.fetch_entries(
+                countries=countries, since=since):
+            if store in by_store:
+                by_store[store].append((app_id, name, developer, None))
+        return self._add('appstore', by_store['appstore']) + self._add('googleplay', by_store['googleplay'])
+
+    def _add(self, store, rows):
+        pending = []
+        with self._lock:
+            entries = self._entries[store]
+            for app_id, name, developer, bundle_id in rows:
+                if not app_id or not name:
+                    continue
+                app_id = str(app_id)
+                current = entries.get(app_id)
+                if current is not None:
+                    # 이미 본 레코드: bundle_id만 새로 알게 된 경우가 아니면 다시 비교하지 않음
+                    if current.name == name and current.developer == developer and (
+                            not bundle_id or current.bundle_id == bundle_id):
+                        continue
+                    bundle_id = bundle_id or current.bundle_id
+                    self._unindex(store, current)
+                    # 바뀐 레코드의 기존 연결은 끊고 다시 비교 (풀린 반대편도 다시 비교)
+                    freed = self._unlink(store, app_id)
+                    if freed:
+                        pending.append(freed)
+                entry = _Entry(app_id, name, developer, bundle_id)
+                entries[app_id] = entry
+                self._index(store, entry)
+                pending.append((store, app_id))
+
+            # 더 강한 후보에게 연결을 빼앗긴 레코드는 다음 후보로 다시 비교
+            # (교체는 양쪽 기존 연결보다 신뢰도가 높을 때만 일어나므로 반드시 끝남)
+            links = {}
+            while pending:
+                pending_store, app_id = pending.pop(0)
+                link, displaced = self._match(pending_store, self._entries[pending_store][app_id])
+                if link:
+                    links[link['appstore_id']] = link
+                pending.extend(displaced)
+            return [link for link in links.values()
+                    if self._links.get(link['appstore_id'], (None,))[0] == link['googleplay_id']]
+
+    def _unlink(self, store, app_id):
+        """
+        레코드의 기존 연결 제거
+
+        Returns:
+            tuple: 연결이 풀린 반대편 (스토어, app_id) (연결이 없었으면 None)
+        """
+        if store == 'appstore':
+            link = self._links.pop(app_id, None)
+            if link:
+                self._reverse.pop(link[0], None)
+                return 'googleplay', link[0]
+        else:
+            owner = self._reverse.pop(app_id, None)
+            if owner:
+                self._links.pop(owner, None)
+                return 'appstore', owner
+        return None
+
+    def _index(self, store, entry):
+        for gram in entry.grams:
+            self._gram_index[store].setdefault(gram, set()).add(entry.app_id)
+        if entry.developer_tokens:
+            self._developer_index[store].setdefault(entry.developer_tokens, set()).add(entry.app_id)
+        if entry.bundle_id:
+            self._bundle_index[entry.bundle_id] = entry.app_id
+
+    def _unindex(self, store, entry):
+        for gram in entry.grams:
+            ids = self._gram_index[store].get(gram)
+            if ids:
+                ids.discard(entry.app_id)
+        ids = self._developer_index[store].get(entry.developer_tokens)
+        if ids:
+            ids.discard(entry.app_id)
+        if entry.bundle_id and self._bundle_index.get(entry.bundle_id) == entry.app_id:
+            del self._bundle_index[entry.bundle_id]
+
+    def _candidates(self, other, entry):
+        """반대편 스토어에서 점수를 매길 후보 ID (공유 조각 수가 많은 순)"""
+        shared = Counter()
+        for gram in entry.grams:
+            ids = self._gram_index[other].get(gram)
+            if ids and len(ids) <= self.max_gram_frequency:
+                shared.update(ids)
+        # 조각의 4분의 1도 공유하지 않으면 이름이 비슷하다고 보기 어려움
+        threshold = max(1, len(entry.grams) // 4)
+        candidates = [app_id for app_id, count in shared.most_common(self.max_candidates) if count >= threshold]
+        candidates.extend(self._developer_index[other].get(entry.developer_tokens, ()))
+        return set(candidates)
+
+    def score(self, appstore_entry, play_entry):
+        """
+        두 레코드가 같은 제품일 신뢰도
+
+        Returns:
+            tuple: (신뢰도 0~1, 방법 'bundle_id' / 'exact_name' / 'fuzzy')
+        """
+        if appstore_entry.bundle_id and appstore_entry.bundle_id == play_entry.app_id:
+            return 1.0, 'bundle_id'
+
+        # 한쪽 이름이 다른 쪽 이름의 토큰을 모두 포함하는 경우('카카오톡' / '카카오톡 KakaoTalk')도 높게 평가
+        name_score = max(_jaccard(appstore_entry.grams, play_entry.grams),
+                         CONTAINMENT_WEIGHT * _containment(appstore_entry.name_tokens, play_entry.name_tokens))
+        if appstore_entry.developer_tokens and play_entry.developer_tokens:
+            developer_score = _jaccard(set(appstore_entry.developer_tokens), set(play_entry.developer_tokens))
+            if appstore_entry.developer_tokens == play_entry.developer_tokens:
+                developer_score = 1.0
+        else:
+            developer_score = 0.0
+
+        if appstore_entry.name_tokens == play_entry.name_tokens:
+            if developer_score >= 0.5:
+                return round(0.9 + 0.05 * developer_score, 4), 'exact_name'
+            name_score = 1.0
+        return round(NAME_WEIGHT * name_score + DEVELOPER_WEIGHT * developer_score, 4), 'fuzzy'
+
+    def _match(self, store, entry):
+        """
+        레코드 하나의 연결 찾기 (신뢰도 높은 후보부터, 1:1을 지키며 차지할 수 있는 첫 후보와 연결)
+
+        Returns:
+            tuple: (새로 생기거나 바뀐 연결 또는 None, 연결을 빼앗긴 (스토어, app_id) 리스트)
+        """
+        other = 'googleplay' if store == 'appstore' else 'appstore'
+        if store == 'appstore':
+            match = entry.bundle_id if entry.bundle_id in self._entries['googleplay'] else None
+        else:
+            match = self._bundle_index.get(entry.app_id)
+
+        scored = []
+        for candidate_id in [match] if match else self._candidates(other, entry):
+            candidate = self._entries[other][candidate_id]
+            appstore_entry, play_entry = (entry, candidate) if store == 'appstore' else (candidate, entry)
+            confidence, method = self.score(appstore_entry, play_entry)
+            if confidence >= self.min_confidence:
+                scored.append((confidence, method, appstore_entry.app_id, play_entry.app_id))
+        scored.sort(key=lambda item: -item[0])
+
+        for confidence, method, appstore_id, play_id in scored:
+            # 1:1 연결 유지: 양쪽의 다른 기존 연결보다 신뢰도가 높을 때만 교체
+            current = self._links.get(appstore_id)
+            if current == (play_id, confidence, method):
+                break
+            if current and current[0] != play_id and current[1] >= confidence:
+                if store == 'appstore':
+                    break  # 이 레코드의 기존 연결보다 나은 후보가 더 없음
+                continue
+            owner = self._reverse.get(play_id)
+            if owner and owner != appstore_id and self._links[owner][1] >= confidence:
+                if store == 'googleplay':
+                    break
+                continue
+
+            displaced = []
+            if current and current[0] != play_id:
+                self._reverse.pop(current[0], None)
+                displaced.append(('googleplay', current[0]))
+            if owner and owner != appstore_id:
+                self._links.pop(owner, None)
+                displaced.append(('appstore', owner))
+            self._links[appstore_id] = (play_id, confidence, method)
+            self._reverse[play_id] = appstore_id
+            return self._pair(appstore_id, play_id, confidence, method), displaced
+        return None, []
+
+    def _pair(self, appstore_id, play_id, confidence, method):
+        appstore_entry = self._entries['appstore'][appstore_id]
+        play_entry = self._entries['googleplay'][play_id]
+        return {
+            'appstore_id': appstore_id,
+            'bundle_id': appstore_entry.bundle_id,
+            'appstore_name': appstore_entry.name,
+            'artist': appstore_entry.developer,
+            'googleplay_id': play_id,
+            'googleplay_name': play_entry.name,
+            'developer': play_entry.developer,
+            'confidence': confidence,
+            'method': method
+        }
+
+    def pairs(self, min_confidence=None):
+        """
+        현재 연결 목록
+
+        Args:
+            min_confidence: 이 값 미만 연결은 제외 (기본값: 생성 시 지정한 값)
+
+        Returns:
+            list: 연결 dict 리스트 (신뢰도 높은 순)
+        """
+        threshold = self.min_confidence if min_confidence is None else min_confidence
+        with self._lock:
+            pairs = [self._pair(appstore_id, play_id, confidence, method)
+                     for appstore_id, (play_id, confidence, method) in self._links.items()
+                     if confidence >= threshold]
+        return sorted(pairs, key=lambda pair: (-pair['confidence'], pair['appstore_name']))
+
+    def get_link(self, app_id):
+        """한쪽 스토어 app_id로 연결된 반대편 app_id 조회 (없으면 None)"""
+        app_id = str(app_id)
+        with self._lock:
+            if app_id in self._links:
+                return self._links[app_id][0]
+            return self._reverse.get(app_id)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'appstore_records': len(self._entries['appstore']),
+                'googleplay_records': len(self._entries['googleplay']),
+                'links': len(self._links)
+            }
+
+    def save(self, filepath):
+        """인덱스 원본 레코드와 연결을 JSON으로 저장 (load로 이어서 갱신 가능)"""
+        with self._lock:
+            state = {
+                store: [[entry.app_id, entry.name, entry.developer, entry.bundle_id] for entry in entries.values()]
+                for store, entries in self._entries.items()
+            }
+            state['links'] = [[appstore_id, *link] for appstore_id, link in self._links.items()]
+        FastJson.dump_file(state, filepath)
+        print(f"매칭 인덱스 저장 완료: {filepath}")
+
+    @classmethod
+    def load(cls, filepath, **kwargs):
+        """save로 저장한 파일에서 인덱스 복원 (연결은 다시 계산하지 않고 그대로 사용)"""
+        with open(filepath, 'rb') as f:
+            state = FastJson.loads(f.read())
+        matcher = cls(**kwargs)
+        for store in ('appstore', 'googleplay'):
+            for app_id, name, developer, bundle_id in state.get(store, []):
+                entry = _Entry(app_id, name, developer, bundle_id)
+                matcher._entries[store][app_id] = entry
+                matcher._index(store, entry)
+        for appstore_id, play_id, confidence, method in state.get('links', []):
+            if appstore_id in matcher._entries['appstore'] and play_id in matcher._entries['googleplay']:
+                matcher._links[appstore_id] = (play_id, confidence, method)
+                matcher._reverse[play_id] = appstore_id
+        return matcher
+
+
+if __name__ == "__main__":
+    from SnapshotStore import SnapshotStore
+
+    matcher = CrossStoreMatcher()
+    matcher.add_snapshots(SnapshotStore())
+    print(f"레코드: {matcher.stats()}")
+    for pair in matcher.pairs()[:20]:
+        print(f"{pair['confidence']:.2f} [{pair['method']}] {pair['appstore_name']} ↔ "
+              f"{pair['googleplay_name']} ({pair['googleplay_id']})")
@@ -0,0 +1,64 @@
+import json
+from collections.abc import Mapping
+
+try:
+    import orjson
+    JSON_BACKEND = 'orjson'
+except ImportError:
+    orjson = None
+    JSON_BACKEND = 'json'
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    """기본 직렬화기가 모르는 값 처리 (AppRecord 등 매핑 → dict)"""
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"JSON으로 변환할 수 없는 값: {type(obj).__name__}")
+
+
+def loads(data):
+    """
+    JSON 문자열/바이트 디코딩 (orjson이 있으면 사용)
+
+    Args:
+        data: str 또는 bytes (response.content를 그대로 넘기면 텍스트 디코딩 단계를 건너뜀)
+
+    Raises:
+        ValueError: 올바른 JSON이 아닐 때 (orjson.JSONDecodeError도 ValueError의 하위 클래스)
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumpb(obj, indent=False):
+    """
+    UTF-8 JSON 바이트로 인코딩 (ensure_ascii=False와 같은 결과)
+
+    Args:
+        obj: 인코딩할 값
+        indent: True면 2칸 들여쓰기, False면 공백 없는 압축 형식
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0))
+    return dumps(obj, indent).encode('utf-8')
+
+
+def dumps(obj, indent=False):
+    """JSON 문자열로 인코딩 (옵션은 dumpb와 같음)"""
+    if orjson is not None:
+        return dumpb(obj, indent).decode('utf-8')
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2, default=_default)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=_default)
+
+
+def dump_file(obj, filepath, indent=False):
+    """JSON 파일 저장 (인코딩 결과를 바이너리로 한 번에 기록)"""
+    with open(filepath, 'wb') as f:
+        f.write(dumpb(obj, indent))
@@ -0,0 +1,458 @@
+import os
+import re
+import json
+from importlib.util import find_spec
+from datetime import datetime
+import FastJson
+from AppRecord import AppRecord, make_projection
+
+# lxml은 설치 여부만 확인하고, bs4/lxml 모듈은 DOM 파싱이 필요할 때 불러옴
+PARSER_BACKEND = 'lxml' if find_spec('lxml') else 'html.parser'
+
+DETAILS_PATH = '/store/apps/details?id='
+PLAY_BASE_URL = 'https://play.google.com'
+
+# 앱 컨테이너 / 이름 / 개발자 후보 선택자 (기본 시도 순서)
+CONTAINER_SELECTORS = (
+    'div[data-ds-package-name]',  # 앱 패키지명이 있는 div
+    'a[href*="/store/apps/details?id="]',  # 앱 상세 링크
+    '.ULeU3b',  # 일반적인 앱 컨테이너 클래스
+    '.Qfxief',  # 다른 가능한 클래스
+    '.VfPpkd-EScbFb-JIbuQc',  # 원래 시도했던 클래스
+    '.Si6A0c'  # 또 다른 가능한 클래스
+)
+LINK_SELECTOR = CONTAINER_SELECTORS[1]
+NAME_SELECTORS = ('.Epkrse', '.DdYX5', '.WsMG1c', 'h3', '.BNeawe')
+DEVELOPER_SELECTORS = ('.ubGTjb', '.wMUdtb', '.x4FaRb')
+
+
+# 페이지에 포함된 AF_initDataCallback({key: 'ds:N', ..., data: [...], sideChannel: {}}) 블록
+INIT_DATA_PATTERN = re.compile(
+    r"AF_initDataCallback\(\{key:\s*'(ds:\d+)'.*?data:(.*?), sideChannel: \{\}\}\);</script", re.DOTALL)
+PACKAGE_PATTERN = re.compile(r'^[A-Za-z][\w]*(\.[\w]+)+$')
+
+# 컬렉션 항목 배열에서 각 값의 위치
+ENTRY_PATHS = {
+    'app_id': (0, 0, 0),
+    'name': (0, 3),
+    'developer': (0, 14),
+    'rating': (0, 4, 1),
+    'price': (0, 8, 1, 0, 0),
+    'currency': (0, 8, 1, 0, 1),
+    'icon_url': (0, 1, 3, 2),
+    'summary': (0, 13, 1),
+    'url': (0, 10, 4, 2)
+}
+
+
+# 컬렉션 데이터 요청(rpcid vyAe2)에 쓰이는 필드 요청 목록
+COLLECTION_FIELD_GROUPS = (
+    (7, [1, 73, 96, 103, 97, 58, 50, 92, 52, 112, 69, 19, 31, 101, 123, 74, 49, 80, 38, 20, 10, 14, 79, 43, 42, 139]),
+    (9, [1, 7, 9, 24, 12, 31, 5, 15, 27, 8, 13, 10]),
+    (17, [1, 7, 9, 25, 13, 31, 5, 41, 27, 8, 14, 10]),
+    (10, [1, 7, 6, 9]),
+    (1, [1, 5, 14, 38, 19, 29, 34, 4, 12, 11, 6, 30, 43, 40, 42, 16, 10, 7]),
+    (4, [1, 3, 5, 4, 7, 6, 11, 19, 21, 17, 15, 12, 16, 20]),
+    (3, [1, 5, 14, 4, 10, 17]),
+    (2, [1, 5, 7, 4, 13, 16, 12, 18])
+)
+COLLECTION_SURFACES = (1, 31, 104, 9, 8, 27, 12, 65, 110, 88, 11, 56, 55, 96, 10, 122, 72, 71, 64, 113,
+                       139, 150, 169, 165, 151, 163, 32, 16, 108, 100)
+
+
+def build_collection_request(collection, category, num):
+    """
+    컬렉션 전체 순위를 한 번에 받는 batchexecute 요청 본문 생성
+
+    Args:
+        collection: 컬렉션 이름 (topselling_free, topselling_paid, topgrossing)
+        category: 카테고리 (APPLICATION, GAME 등)
+        num: 받을 앱 개수
+
+    Returns:
+        dict: form 데이터 {'f.req': ...}
+    """
+    empty = [[None, []]]
+    filters = [
+        [[True], None, empty, None, None, None, None, [None, 2], None, None, None, None, None, None, [1],
+         None, None, None, None, None, None, None, [1]],
+        [None, empty],
+        [None, empty, None, [True]],
+        [None, empty],
+        None, None, None, None,
+        [empty],
+        [empty]
+    ]
+    fields = [[[group, surface], [field_ids]] for group, field_ids in COLLECTION_FIELD_GROUPS
+              for surface in COLLECTION_SURFACES]
+    inner = [[None, [[8, [20, num]], True, None,
+                     [64, 1, 195, 71, 8, 72, 9, 10, 11, 139, 12, 16, 145, 148, 150, 151, 152, 27, 30, 31, 96, 32,
+                      34, 163, 100, 165, 104, 169, 108, 110, 113, 55, 56, 57, 122],
+                     [None, None, filters, [fields]], None, None, [[[1, 2], [10, 8, 9], [], []]]],
+              [2, collection, category]]]
+    payload = [[["vyAe2", json.dumps(inner, separators=(',', ':')), None, "generic"]]]
+    return {'f.req': json.dumps(payload, separators=(',', ':'))}
+
+
+# 상세 페이지 구조화 데이터(ds:5 블록)에서 각 값의 위치
+DETAIL_PATHS = {
+    'rating': (1, 2, 51, 0, 1),
+    'rating_count': (1, 2, 51, 2, 1),
+    'installs': (1, 2, 13, 0),
+    'updated': (1, 2, 145, 0, 1, 0)
+}
+
+
+def get_path(data, path):
+    """중첩 리스트에서 path 위치의 값 (없으면 None)"""
+    for index in path:
+        if isinstance(data, list) and -len(data) <= index < len(data):
+            data = data[index]
+        else:
+            return None
+    return data
+
+
+def extract_init_data(html):
+    """
+    페이지에 포함된 구조화 데이터 블록 추출
+
+    Returns:
+        dict: {'ds:N': 디코딩된 데이터}
+    """
+    blocks = {}
+    for key, raw in INIT_DATA_PATTERN.findall(html):
+        try:
+            blocks[key] = FastJson.loads(raw)
+        except ValueError:
+            continue
+    return blocks
+
+
+def find_app_entries(data):
+    """
+    구조화 데이터에서 앱 항목 배열을 순서대로 찾기
+
+    항목은 [[[패키지명], ..., 이름, ...], ...] 형태이며,
+    같은 앱이 여러 번 나오면 처음 나온 것만 사용한다.
+    """
+    entries = []
+    seen = set()
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, list):
+            continue
+        app_id = get_path(node, ENTRY_PATHS['app_id'])
+        name = get_path(node, ENTRY_PATHS['name'])
+        if isinstance(app_id, str) and isinstance(name, str) and PACKAGE_PATTERN.match(app_id):
+            if app_id not in seen:
+                seen.add(app_id)
+                entries.append(node)
+            continue
+        # 문서 순서를 유지하도록 역순으로 쌓음
+        stack.extend(reversed(node))
+    return entries
+
+
+def make_soup(html):
+    """BeautifulSoup 문서 생성 (구조화 데이터로 처리되는 실행에서는 bs4를 불러오지 않음)"""
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, PARSER_BACKEND)
+
+
+def _matches(tag, selector):
+    """위 선택자 목록에 쓰이는 형태만 빠르게 판별 (CSS 엔진을 거치지 않음)"""
+    if selector.startswith('.'):
+        return selector[1:] in (tag.get('class') or ())
+    if selector == 'div[data-ds-package-name]':
+        return tag.name == 'div' and tag.has_attr('data-ds-package-name')
+    if selector == LINK_SELECTOR:
+        return tag.name == 'a' and DETAILS_PATH in (tag.get('href') or '')
+    return tag.name == selector
+
+
+class GooglePlayParser:
+    def __init__(self, cache_path=os.path.join("exports", ".play_selector_cache.json"), fields=None):
+        """
+        구글 플레이 목록 페이지 파서
+
+        문서 트리를 한 번만 순회하면서 모든 후보 선택자의 요소를 모으고,
+        지난번에 성공한 선택자를 먼저 시도한다.
+
+        Args:
+            cache_path: 성공한 선택자를 기억할 파일 (None이면 메모리에만 유지)
+            fields: 레코드에 남길 필드 목록 (None이면 전체)
+        """
+        self.cache_path = cache_path
+        self.projection = make_projection(fields)
+        self.learned = self._load_cache()
+        self._learned_changed = False
+
+    def _load_cache(self):
+        if not self.cache_path:
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_cache(self):
+        """새로 학습한 선택자가 있으면 파일에 저장"""
+        if not self.cache_path or not self._learned_changed:
+            return
+        if os.path.dirname(self.cache_path):
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        with open(self.cache_path, 'w', encoding='utf-8') as f:
+            json.dump(self.learned, f, ensure_ascii=False)
+        self._learned_changed = False
+
+    def learn(self, kind, selector):
+        if self.learned.get(kind) != selector:
+            self.learned[kind] = selector
+            self._learned_changed = True
+
+    def ordered(self, kind, selectors):
+        """학습한 선택자를 맨 앞으로 옮긴 시도 순서"""
+        learned = self.learned.get(kind)
+        if learned in selectors:
+            return (learned,) + tuple(selector for selector in selectors if selector != learned)
+        return selectors
+
+    def parse(self, html, limit=10):
+        """
+        목록 페이지 HTML에서 앱 정보 추출
+
+        Args:
+            html: 페이지 HTML
+            limit: 최대 앱 개수
+
+        Returns:
+            list: 앱 정보 리스트 (찾지 못하면 빈 리스트)
+        """
+        soup = make_soup(html)
+
+        # 한 번의 순회로 모든 컨테이너 후보 수집
+        buckets = {selector: [] for selector in CONTAINER_SELECTORS}
+        for tag in soup.find_all(True):
+            for selector in CONTAINER_SELECTORS:
+                if _matches(tag, selector):
+                    buckets[selector].append(tag)
+
+        for selector in self.ordered('container', CONTAINER_SELECTORS):
+            elements = buckets[selector]
+            if not elements:
+                continue
+            apps = self.parse_apps_from_elements(elements, limit)
+            if apps:
+                print(f"선택자 {selector}: {len(apps)}개 앱 정보 추출")
+                self.learn('container', selector)
+                self.save_cache()
+                return apps
+
+        # 컨테이너에서 찾지 못하면 앱 링크에서 직접 추출
+        links = buckets[LINK_SELECTOR]
+        if links:
+            apps = self.parse_apps_from_links(links, limit)
+            self.save_cache()
+            return apps
+        return []
+
+    def parse_embedded(self, html, limit=100):
+        """
+        페이지에 포함된 구조화 데이터(JSON)에서 순위대로 앱 정보 추출
+
+        페이지에는 차트 외에도 추천/관련 앱 블록(ds:N)이 함께 들어 있으므로,
+        앱 항목이 가장 많은 블록 하나를 차트로 보고 그 항목만 순위를 매긴다.
+
+        Returns:
+            list: 앱 정보 리스트 (구조화 데이터가 없으면 빈 리스트)
+        """
+        entries = max((find_app_entries(data) for data in extract_init_data(html).values()), key=len, default=[])
+        return [self.build_entry_record(entry, rank) for rank, entry in enumerate(entries[:limit], 1)]
+
+    def parse_collection_payload(self, text, limit=100):
+        """
+        컬렉션 데이터 요청(batchexecute) 응답에서 앱 정보 추출
+
+        Returns:
+            list: 앱 정보 리스트
+        """
+        for line in text.splitlines():
+            if '"wrb.fr"' not in line:
+                continue
+            try:
+                envelope = FastJson.loads(line)
+                payload = FastJson.loads(envelope[0][2])
+            except (ValueError, IndexError, TypeError):
+                continue
+            entries = get_path(payload, (0, 1, 0, 28, 0)) or find_app_entries(payload)
+            return [self.build_entry_record(entry, rank) for rank, entry in enumerate(entries[:limit], 1)]
+        return []
+
+    def build_entry_record(self, entry, rank):
+        """구조화 데이터 항목 하나를 앱 정보 dict로 변환"""
+        values = {field: get_path(entry, path) for field, path in ENTRY_PATHS.items()}
+        price = values['price']
+        url = values['url'] or f"/store/apps/details?id={values['app_id']}"
+        return AppRecord({
+            'rank': rank,
+            'name': values['name'],
+            'developer': values['developer'] or 'Unknown Developer',
+            'rating': round(values['rating'], 2) if isinstance(values['rating'], (int, float)) else 'N/A',
+            'price': price / 1000000 if isinstance(price, (int, float)) else 'N/A',
+            'currency': values['currency'] or '',
+            'app_id': values['app_id'],
+            'url': url if url.startswith('http') else PLAY_BASE_URL + url,
+            'icon_url': values['icon_url'] or '',
+            'summary': values['summary'] or '',
+            'scraped_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }, self.projection)
+
+    def parse_details(self, html):
+        """
+        상세 페이지에서 평점, 평점 수, 설치 수, 업데이트 날짜 추출
+
+        구조화 데이터를 우선 사용하고, 없으면 DOM에서 평점만 찾는다.
+
+        Returns:
+            dict: 상세 정보 (찾지 못한 값은 'N/A')
+        """
+        details = {'rating': 'N/A', 'rating_count': 'N/A', 'installs': 'N/A', 'updated': 'N/A'}
+
+        blocks = extract_init_data(html)
+        block = blocks.get('ds:5')
+        if get_path(block, DETAIL_PATHS['installs']) is None:
+            block = next((data for data in blocks.values() if get_path(data, DETAIL_PATHS['installs']) is not None), None)
+
+        if block is not None:
+            rating = get_path(block, DETAIL_PATHS['rating'])
+            rating_count = get_path(block, DETAIL_PATHS['rating_count'])
+            installs = get_path(block, DETAIL_PATHS['installs'])
+            updated = get_path(block, DETAIL_PATHS['updated'])
+            if isinstance(rating, (int, float)):
+                details['rating'] = round(rating, 2)
+            if isinstance(rating_count, int):
+                details['rating_count'] = rating_count
+            if isinstance(installs, str):
+                details['installs'] = installs
+            if isinstance(updated, int):
+                details['updated'] = datetime.fromtimestamp(updated).strftime('%Y-%m-%d')
+            return details
+
+        soup = make_soup(html)
+        rating_elem = soup.select_one('[data-g-id="text"] div')
+        if rating_elem and rating_elem.get_text(strip=True):
+            details['rating'] = rating_elem.get_text(strip=True)
+        return details
+
+    def parse_apps_from_elements(self, elements, limit=10):
+        apps = []
+        for i, element in enumerate(elements[:limit], 1):
+            try:
+                app_info = self.extract_app_info(element, i)
+                if app_info:
+                    apps.append(app_info)
+            except Exception as e:
+                print(f"요소 {i} 파싱 오류: {e}")
+                continue
+        return apps
+
+    def extract_app_info(self, element, rank):
+        """컨테이너 요소 하나에서 앱 정보 추출 (하위 트리 1회 순회)"""
+        try:
+            name = 'Unknown App'
+            developer = 'Unknown Developer'
+            app_id = 'unknown'
+            app_url = ''
+
+            link_elem = element if element.name == 'a' and element.get('href') else None
+            texts = {}
+            wanted = NAME_SELECTORS + DEVELOPER_SELECTORS
+            for tag in element.find_all(True):
+                if link_elem is None and tag.name == 'a' and tag.get('href'):
+                    link_elem = tag
+                for selector in wanted:
+                    if selector not in texts and _matches(tag, selector):
+                        text = tag.get_text(strip=True)
+                        if text:
+                            texts[selector] = text
+
+            for selector in self.ordered('name', NAME_SELECTORS):
+                if selector in texts:
+                    name = texts[selector]
+                    self.learn('name', selector)
+                    break
+
+            for selector in self.ordered('developer', DEVELOPER_SELECTORS):
+                if selector in texts:
+                    developer = texts[selector]
+                    self.learn('developer', selector)
+                    break
+
+            # 앱 링크 찾기
+            link_elem = link_elem or element.find_parent('a', href=True)
+            if link_elem:
+                href = link_elem['href']
+                app_url = href if href.startswith('http') else PLAY_BASE_URL + href
+                if 'id=' in href:
+                    app_id = href.split('id=')[-1].split('&')[0]
+
+            # data 속성에서 패키지명 찾기
+            if app_id == 'unknown':
+                package_name = element.get('data-ds-package-name')
+                if package_name:
+                    app_id = package_name
+
+            return AppRecord({
+                'rank': rank,
+                'name': name,
+                'developer': developer,
+                'rating': 'N/A',
+                'app_id': app_id,
+                'url': app_url,
+                'scraped_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            }, self.projection)
+
+        except Exception as e:
+            print(f"앱 정보 추출 오류: {e}")
+            return None
+
+    def parse_apps_from_links(self, app_links, limit=10):
+        apps = []
+        for i, link in enumerate(app_links[:limit], 1):
+            try:
+                href = link.get('href', '')
+                if not href.startswith('http'):
+                    href = PLAY_BASE_URL + href
+
+                app_id = href.split('id=')[-1].split('&')[0] if 'id=' in href else 'unknown'
+
+                # 링크 텍스트나 주변 요소에서 앱 이름 찾기
+                name = link.get_text(strip=True) or link.get('title', '') or 'Unknown App'
+
+                # 부모 요소의 텍스트에서 개발자 정보 찾기
+                developer = 'Unknown Developer'
+                parent = link.parent
+                for text in (parent.find_all(string=True) if parent else []):
+                    text = text.strip()
+                    if text and text != name and len(text) > 2:
+                        developer = text
+                        break
+
+                apps.append(AppRecord({
+                    'rank': i,
+                    'name': name,
+                    'developer': developer,
+                    'rating': 'N/A',
+                    'app_id': app_id,
+                    'url': href,
+                    'scraped_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                }, self.projection))
+
+            except Exception as e:
+                print(f"링크 {i} 파싱 오류: {e}")
+                continue
+
+        return apps
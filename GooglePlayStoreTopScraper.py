@@ -1,21 +1,53 @@
 import requests
-import json
 import csv
 import os
+from urllib.parse import urlparse
 from datetime import datetime
-from bs4 import BeautifulSoup
-import time
-import random
+from RateLimiter import RateLimiter
+from AdaptivePacer import AdaptivePacer
+from ConcurrentEnricher import ConcurrentEnricher
+from HttpClient import get_default_client
+from Metrics import get_metrics
+import FastJson
+from AppRecord import make_projection, wants, to_dicts
+from GooglePlayParser import GooglePlayParser, PLAY_BASE_URL, build_collection_request
+
+# 상세 페이지에서 채우는 필드
+PLAY_DETAIL_FIELDS = ('rating', 'rating_count', 'installs', 'updated')
+
+# CSV 컬럼 순서
+PLAY_FIELDS = ['rank', 'name', 'developer', 'rating', 'rating_count', 'installs', 'updated', 'price',
+               'currency', 'app_id', 'url', 'icon_url', 'summary', 'scraped_at']
 
 
 class GooglePlayStoreTopScraper:
     @staticmethod
-    def get_google_play_top_apps():
+    def get_google_play_top_apps(client=None, country='kr', snapshot_store=None, debug=False, limit=100,
+                                 fetch_details=True, pacer=None, base_url=PLAY_BASE_URL, fields=None, parser=None):
+        """
+        구글 플레이 Top 앱 정보 수집
+
+        Args:
+            client: 사용할 HttpClient (기본값: 공유 클라이언트)
+            country: 국가 코드 (gl 파라미터)
+            snapshot_store: 수집 결과를 누적할 SnapshotStore (None이면 저장 안 함)
+            debug: True면 받은 HTML을 debug_response.html로 저장
+            limit: 수집할 앱 개수 (최대 200)
+            fetch_details: 상세 페이지에서 평점 수/설치 수/업데이트 날짜까지 수집할지 여부
+            pacer: 요청 속도를 조절할 AdaptivePacer (기본값: 호스트별 공유 페이서)
+                   여러 출구로 나눠 보내려면 같은 EgressPool을 client와 pacer에 함께 지정
+            base_url: 구글 플레이 서버 주소 (벤치마크용 로컬 서버 지정 시 사용)
+            fields: 레코드에 남길 필드 목록 (None이면 전체, 상세 필드가 없으면 상세 페이지 요청 생략)
+            parser: 사용할 GooglePlayParser (기본값: fields로 새로 생성, 반복 호출 시 넘겨서 재사용)
+
+        Returns:
+            list: 앱 정보 리스트 (AppRecord)
+        """
         # 다양한 URL 시도
         urls = [
-            "https://play.google.com/store/apps/collection/topselling_free",
-            "https://play.google.com/store/apps/category/GAME/collection/topselling_free",
-            "https://play.google.com/store/apps/top"
+            f"{base_url}/store/apps/collection/topselling_free",
+            f"{base_url}/store/apps/category/GAME/collection/topselling_free",
+            f"{base_url}/store/apps/top"
         ]
         
         # 더 현실적인 헤더
@@ -23,7 +55,6 @@ class GooglePlayStoreTopScraper:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
             'Accept-Language': 'ko-KR,ko;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
             'DNT': '1',
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
@@ -34,246 +65,307 @@ class GooglePlayStoreTopScraper:
             'Cache-Control': 'max-age=0'
         }
 
-        session = requests.Session()
-        session.headers.update(headers)
+        # 압축(gzip/br) 협상과 커넥션 재사용은 공유 클라이언트가 담당
+        client = client or get_default_client()
+        parser = parser or GooglePlayParser(fields=fields)
+        pacer = pacer or AdaptivePacer.for_host(urlparse(base_url).netloc)
+        projection = make_projection(fields)
+        if fetch_details and not any(wants(projection, field) for field in PLAY_DETAIL_FIELDS):
+            fetch_details = False
+        metrics = get_metrics()
 
         for url in urls:
             try:
                 print(f"시도 중인 URL: {url}")
                 
-                # 랜덤 지연
-                time.sleep(random.uniform(2, 5))
-                
-                response = session.get(url, timeout=30)
+                # 고정 지연 대신 응답에 따라 학습한 속도로 대기
+                with metrics.stage('googleplay', 'fetch'):
+                    pacer.wait()
+                    response = client.get(url, params={'gl': country.upper()}, headers=headers)
                 print(f"응답 상태 코드: {response.status_code}")
-                
+
+                if pacer.record(response):
+                    print("봇 확인 페이지 또는 차단 응답, 다음 URL 시도")
+                    continue
+
                 if response.status_code == 200:
-                    # HTML 내용 확인
                     html_content = response.text
                     print(f"HTML 길이: {len(html_content)}")
-                    
-                    # 응답 내용을 파일로 저장하여 구조 확인
-                    with open('debug_response.html', 'w', encoding='utf-8') as f:
-                        f.write(html_content)
-                    print("디버그용 HTML 파일 저장 완료: debug_response.html")
-                    
-                    soup = BeautifulSoup(html_content, 'html.parser')
-                    
-                    # 여러 가능한 선택자 시도
-                    selectors = [
-                        'div[data-ds-package-name]',  # 앱 패키지명이 있는 div
-                        'a[href*="/store/apps/details?id="]',  # 앱 상세 링크
-                        '.ULeU3b',  # 일반적인 앱 컨테이너 클래스
-                        '.Qfxief',  # 다른 가능한 클래스
-                        '.VfPpkd-EScbFb-JIbuQc',  # 원래 시도했던 클래스
-                        '.Si6A0c'   # 또 다른 가능한 클래스
-                    ]
-                    
-                    apps = []
-                    
-                    for selector in selectors:
-                        print(f"선택자 시도: {selector}")
-                        elements = soup.select(selector)
-                        print(f"찾은 요소 수: {len(elements)}")
-                        
-                        if elements:
-                            apps = GooglePlayStoreTopScraper.parse_apps_from_elements(elements, selector)
-                            if apps:
-                                print(f"성공적으로 {len(apps)}개 앱 정보 추출")
-                                return apps
-                    
-                    # 직접 앱 링크 찾기
-                    app_links = soup.find_all('a', href=lambda x: x and '/store/apps/details?id=' in x)
-                    print(f"발견된 앱 링크 수: {len(app_links)}")
-                    
-                    if app_links:
-                        apps = GooglePlayStoreTopScraper.parse_apps_from_links(app_links[:10])
-                        if apps:
-                            return apps
-                
+
+                    if debug:
+                        # 응답 내용을 파일로 저장하여 구조 확인
+                        with open('debug_response.html', 'w', encoding='utf-8') as f:
+                            f.write(html_content)
+                        print("디버그용 HTML 파일 저장 완료: debug_response.html")
+
+                    # 페이지에 포함된 구조화 데이터를 먼저 사용하고,
+                    # 페이지에 없는 나머지 순위는 컬렉션 데이터 요청으로 받음
+                    with metrics.stage('googleplay', 'parse'):
+                        apps = parser.parse_embedded(html_content, limit)
+                    if len(apps) < limit:
+                        more = GooglePlayStoreTopScraper.get_collection_apps(url, client, country, limit, parser, pacer,
+                                                                       base_url)
+                        if len(more) > len(apps):
+                            apps = more
+
+                    # 구조화 데이터가 없으면 DOM에서 추출
+                    if not apps:
+                        with metrics.stage('googleplay', 'parse'):
+                            apps = parser.parse(html_content, limit)
+
+                    if not apps:
+                        metrics.increment('parse_failures_total', store='googleplay', page='list')
+                    if apps:
+                        metrics.increment('records_total', len(apps), store='googleplay', stage='fetch')
+                        print(f"성공적으로 {len(apps)}개 앱 정보 추출")
+                        if fetch_details:
+                            GooglePlayStoreTopScraper.enrich_apps_with_details(apps, client=client, pacer=pacer,
+                                                                            base_url=base_url, fields=fields)
+                        GooglePlayStoreTopScraper.record_snapshot(snapshot_store, country, url, apps)
+                        pacer.save()
+                        return apps
+
                 else:
                     print(f"HTTP 오류: {response.status_code}")
                     
             except requests.RequestException as e:
+                metrics.increment('stage_failures_total', store='googleplay', stage='fetch')
                 print(f"요청 오류 ({url}): {e}")
                 continue
             except Exception as e:
+                metrics.increment('parse_failures_total', store='googleplay', page='list')
                 print(f"파싱 오류 ({url}): {e}")
                 continue
 
+        pacer.save()
         print("모든 URL에서 데이터 추출 실패")
         return []
 
+    @staticmethod
+    def get_collection_apps(url, client=None, country='kr', limit=100, parser=None, pacer=None,
+                            base_url=PLAY_BASE_URL):
+        """
+        컬렉션 전체 순위를 구조화 데이터 요청(batchexecute)으로 가져오는 함수
+
+        Args:
+            url: 컬렉션 페이지 URL (컬렉션/카테고리 판단용)
+            client: 사용할 HttpClient
+            country: 국가 코드
+            limit: 받을 앱 개수
+            parser: 사용할 GooglePlayParser
+            pacer: 요청 속도를 조절할 AdaptivePacer (없으면 호스트별 RateLimiter만 사용)
+            base_url: 구글 플레이 서버 주소
+
+        Returns:
+            list: 앱 정보 리스트 (실패 시 빈 리스트)
+        """
+        client = client or get_default_client()
+        parser = parser or GooglePlayParser()
+        collection, category = GooglePlayStoreTopScraper.get_collection_from_url(url)
+        endpoint = f"{base_url}/_/PlayStoreUi/data/batchexecute"
+        params = {'rpcids': 'vyAe2', 'source-path': '/store/apps', 'hl': 'ko', 'gl': country.upper(), 'rt': 'c'}
+        headers = {'Content-Type': 'application/x-www-form-urlencoded;charset=UTF-8'}
+
+        metrics = get_metrics()
+
+        try:
+            with metrics.stage('googleplay', 'collection'):
+                if pacer:
+                    pacer.wait()
+                else:
+                    RateLimiter.for_host(endpoint).acquire()
+                response = client.post(endpoint, data=build_collection_request(collection, category, limit),
+                                       params=params, headers=headers)
+            if pacer:
+                pacer.record(response)
+            if response.status_code != 200:
+                print(f"컬렉션 데이터 요청 실패: HTTP {response.status_code}")
+                return []
+            with metrics.stage('googleplay', 'parse'):
+                apps = parser.parse_collection_payload(response.text, limit)
+            if not apps:
+                metrics.increment('parse_failures_total', store='googleplay', page='collection')
+            print(f"컬렉션 데이터에서 {len(apps)}개 앱 정보 추출 ({collection}/{category})")
+            return apps
+        except requests.RequestException as e:
+            metrics.increment('stage_failures_total', store='googleplay', stage='collection')
+            print(f"컬렉션 데이터 요청 오류: {e}")
+            return []
+
+    @staticmethod
+    def get_collection_from_url(url):
+        """페이지 URL에서 (컬렉션, 카테고리) 추출"""
+        path = url.split('/store/apps/')[-1]
+        collection = path.split('collection/')[-1] if 'collection/' in path else 'topselling_free'
+        category = path.split('category/')[-1].split('/')[0] if 'category/' in path else 'APPLICATION'
+        return collection, category
+
+    @staticmethod
+    def record_snapshot(snapshot_store, country, url, apps):
+        """수집 결과를 스냅샷 저장소에 추가 (차트 이름은 URL 경로에서 만듦)"""
+        if not snapshot_store:
+            return
+        chart = url.split('/store/apps/')[-1]
+        snapshot_store.append('googleplay', country, chart, apps)
+
     @staticmethod
     def parse_apps_from_elements(elements, selector):
-        apps = []
-        for i, element in enumerate(elements[:10], 1):
-            try:
-                app_info = GooglePlayStoreTopScraper.extract_app_info(element, i)
-                if app_info:
-                    apps.append(app_info)
-            except Exception as e:
-                print(f"요소 {i} 파싱 오류: {e}")
-                continue
-        return apps
+        return GooglePlayParser(cache_path=None).parse_apps_from_elements(elements)
 
     @staticmethod
     def parse_apps_from_links(app_links):
-        apps = []
-        for i, link in enumerate(app_links[:10], 1):
-            try:
-                href = link.get('href', '')
-                if not href.startswith('http'):
-                    href = 'https://play.google.com' + href
-                
-                app_id = href.split('id=')[-1].split('&')[0] if 'id=' in href else 'unknown'
-                
-                # 링크 텍스트나 주변 요소에서 앱 이름 찾기
-                name = link.get_text(strip=True) or link.get('title', '') or 'Unknown App'
-                
-                # 부모 요소에서 추가 정보 찾기
-                parent = link.parent
-                developer = 'Unknown Developer'
-                
-                # 개발자 정보 찾기
-                dev_elements = parent.find_all(text=True) if parent else []
-                for text in dev_elements:
-                    text = text.strip()
-                    if text and text != name and len(text) > 2:
-                        developer = text
-                        break
-
-                app_info = {
-                    'rank': i,
-                    'name': name,
-                    'developer': developer,
-                    'rating': 'N/A',
-                    'app_id': app_id,
-                    'url': href,
-                    'scraped_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                }
-                
-                apps.append(app_info)
-                
-            except Exception as e:
-                print(f"링크 {i} 파싱 오류: {e}")
-                continue
-                
-        return apps
+        return GooglePlayParser(cache_path=None).parse_apps_from_links(app_links)
 
     @staticmethod
     def extract_app_info(element, rank):
-        try:
-            # 다양한 방법으로 앱 정보 추출 시도
-            name = 'Unknown App'
-            developer = 'Unknown Developer'
-            app_id = 'unknown'
-            app_url = ''
-            
-            # 앱 이름 찾기
-            name_selectors = ['.Epkrse', '.DdYX5', '.WsMG1c', 'h3', '.BNeawe']
-            for selector in name_selectors:
-                name_elem = element.select_one(selector)
-                if name_elem and name_elem.get_text(strip=True):
-                    name = name_elem.get_text(strip=True)
-                    break
-            
-            # 개발자 이름 찾기
-            dev_selectors = ['.ubGTjb', '.wMUdtb', '.x4FaRb']
-            for selector in dev_selectors:
-                dev_elem = element.select_one(selector)
-                if dev_elem and dev_elem.get_text(strip=True):
-                    developer = dev_elem.get_text(strip=True)
-                    break
-            
-            # 앱 링크 찾기
-            link_elem = element.find('a', href=True) or element.find_parent('a', href=True)
-            if link_elem:
-                href = link_elem['href']
-                if not href.startswith('http'):
-                    app_url = 'https://play.google.com' + href
-                else:
-                    app_url = href
-                    
-                if 'id=' in href:
-                    app_id = href.split('id=')[-1].split('&')[0]
-            
-            # data 속성에서 패키지명 찾기
-            if app_id == 'unknown':
-                package_name = element.get('data-ds-package-name')
-                if package_name:
-                    app_id = package_name
-
-            return {
-                'rank': rank,
-                'name': name,
-                'developer': developer,
-                'rating': 'N/A',
-                'app_id': app_id,
-                'url': app_url,
-                'scraped_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            }
-            
-        except Exception as e:
-            print(f"앱 정보 추출 오류: {e}")
-            return None
+        return GooglePlayParser(cache_path=None).extract_app_info(element, rank)
 
     @staticmethod
-    def get_app_details(app_id):
-        """개별 앱의 상세 정보를 가져오는 함수"""
+    def get_app_details(app_id, client=None, parser=None, pacer=None, base_url=PLAY_BASE_URL):
+        """
+        개별 앱의 상세 정보를 가져오는 함수
+
+        Returns:
+            dict: {'rating', 'rating_count', 'installs', 'updated'} (실패한 값은 'N/A')
+        """
+        client = client or get_default_client()
+        parser = parser or GooglePlayParser(cache_path=None)
+        metrics = get_metrics()
         try:
-            url = f"https://play.google.com/store/apps/details?id={app_id}"
+            url = f"{base_url}/store/apps/details?id={app_id}"
             headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+                'Accept-Language': 'ko-KR,ko;q=0.9,en;q=0.8'
             }
-            
-            response = requests.get(url, headers=headers, timeout=10)
+
+            with metrics.stage('googleplay', 'details'):
+                if pacer:
+                    pacer.wait()
+                else:
+                    RateLimiter.for_host(url).acquire()
+                response = client.get(url, headers=headers, timeout=10)
+            if pacer:
+                pacer.record(response)
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # 평점 추출
-                rating_elem = soup.select_one('[data-g-id="text"] div')
-                rating = rating_elem.get_text(strip=True) if rating_elem else 'N/A'
-                
-                return rating
-                
+                with metrics.stage('googleplay', 'parse_details'):
+                    details = parser.parse_details(response.text)
+                if details['installs'] == 'N/A':
+                    metrics.increment('parse_failures_total', store='googleplay', page='details')
+                return details
+            metrics.increment('stage_failures_total', store='googleplay', stage='details')
+            print(f"앱 상세 정보 HTTP 오류 ({app_id}): {response.status_code}")
+
         except Exception as e:
+            metrics.increment('stage_failures_total', store='googleplay', stage='details')
             print(f"앱 상세 정보 가져오기 오류 ({app_id}): {e}")
-            
-        return 'N/A'
+
+        return {'rating': 'N/A', 'rating_count': 'N/A', 'installs': 'N/A', 'updated': 'N/A'}
+
+    @staticmethod
+    def get_apps_details(app_ids, max_workers=16, requests_per_second=None, client=None, pacer=None,
+                         base_url=PLAY_BASE_URL):
+        """
+        여러 앱의 상세 정보를 병렬로 가져오는 함수
+
+        Args:
+            app_ids: 앱 패키지명 리스트
+            max_workers: 동시 요청 수
+            requests_per_second: 고정 초당 요청 수 (None이면 AdaptivePacer가 학습한 속도 사용)
+            client: 사용할 HttpClient (기본값: 공유 클라이언트)
+            pacer: 요청 속도를 조절할 AdaptivePacer
+            base_url: 구글 플레이 서버 주소
+
+        Returns:
+            list: 입력 순서대로의 get_app_details 결과
+        """
+        if requests_per_second:
+            RateLimiter.for_host(base_url, rate=requests_per_second, burst=max_workers)
+        else:
+            pacer = pacer or AdaptivePacer.for_host(urlparse(base_url).netloc)
+        enricher = ConcurrentEnricher(max_workers=max_workers)
+        parser = GooglePlayParser(cache_path=None)
+        details = list(enricher.map(
+            lambda app_id: GooglePlayStoreTopScraper.get_app_details(app_id, client, parser, pacer, base_url), app_ids))
+        if pacer:
+            pacer.save()
+        return details
+
+    @staticmethod
+    def enrich_apps_with_details(apps, max_workers=16, requests_per_second=None, client=None, pacer=None,
+                                 base_url=PLAY_BASE_URL, fields=None, strict=False):
+        """
+        수집한 앱 전체의 상세 페이지를 병렬로 받아 순위 순서대로 병합
+
+        Args:
+            apps: get_google_play_top_apps 결과
+            max_workers: 동시 요청 수
+            requests_per_second: 고정 초당 요청 수 (None이면 AdaptivePacer가 학습한 속도 사용)
+            client: 사용할 HttpClient
+            pacer: 요청 속도를 조절할 AdaptivePacer
+            base_url: 구글 플레이 서버 주소
+            fields: 병합할 필드 목록 (None이면 상세 필드 전체)
+            strict: True면 상세 정보를 하나도 얻지 못한 앱이 있을 때 병합하지 않고 RuntimeError 발생
+
+        Returns:
+            list: 상세 정보가 병합된 앱 정보 리스트 (apps 그대로 갱신)
+        """
+        projection = make_projection(fields)
+        targets = [app for app in apps if app.get('app_id') and app['app_id'] != 'unknown']
+        print(f"{len(targets)}개 앱 상세 정보 병렬 수집 시작 (동시 {max_workers}개)...")
+
+        with get_metrics().stage('googleplay', 'enrich'):
+            details = GooglePlayStoreTopScraper.get_apps_details(
+                [app['app_id'] for app in targets], max_workers, requests_per_second, client, pacer, base_url)
+            failed = [app['app_id'] for app, app_details in zip(targets, details)
+                      if all(value == 'N/A' for value in app_details.values())]
+            if strict and failed:
+                raise RuntimeError(f"상세 정보 수집 실패 {len(failed)}개: {', '.join(failed[:5])}")
+            for app, app_details in zip(targets, details):
+                # 목록에서 이미 받은 평점은 상세 페이지 값이 없을 때 유지
+                if app_details.get('rating') == 'N/A' and app.get('rating') not in (None, 'N/A'):
+                    app_details = {**app_details, 'rating': app['rating']}
+                app.update({key: value for key, value in app_details.items() if wants(projection, key)})
+
+        print("상세 정보 수집 완료")
+        return apps
 
     @staticmethod
-    def save_to_csv(data, filepath):
+    def save_to_csv(data, filepath, blob_store=None):
+        """앱 정보를 CSV 파일로 저장 (blob_store가 있으면 큰 필드를 내용 해시 참조로 저장)"""
         if not data:
             print("저장할 데이터가 없습니다.")
             return
 
         try:
-            with open(filepath, 'w', newline='', encoding='utf-8-sig') as csvfile:
-                fieldnames = ['rank', 'name', 'developer', 'rating', 'app_id', 'url', 'scraped_at']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(data)
+            with get_metrics().stage('googleplay', 'export'):
+                with open(filepath, 'w', newline='', encoding='utf-8-sig') as csvfile:
+                    writer = csv.DictWriter(csvfile, fieldnames=PLAY_FIELDS, extrasaction='ignore')
+                    writer.writeheader()
+                    writer.writerows(blob_store.pack_all(data) if blob_store else data)
+            get_metrics().increment('exported_records_total', len(data), format='csv')
             print(f"CSV 저장 완료: {filepath}")
         except Exception as e:
             print(f"CSV 저장 중 오류: {e}")
 
     @staticmethod
-    def save_to_json(data, filepath):
+    def save_to_json(data, filepath, compact=False, blob_store=None):
+        """앱 정보를 JSON 파일로 저장 (compact=True면 들여쓰기/공백 없이, blob_store가 있으면 큰 필드를 참조로 저장)"""
         if not data:
             print("저장할 데이터가 없습니다.")
             return
 
         try:
-            with open(filepath, 'w', encoding='utf-8') as jsonfile:
-                json.dump(data, jsonfile, ensure_ascii=False, indent=2)
+            with get_metrics().stage('googleplay', 'export'):
+                records = blob_store.pack_all(data) if blob_store else to_dicts(data)
+                FastJson.dump_file(records, filepath, indent=not compact)
+            get_metrics().increment('exported_records_total', len(data), format='json')
             print(f"JSON 저장 완료: {filepath}")
         except Exception as e:
             print(f"JSON 저장 중 오류: {e}")
 
     @staticmethod
     def main():
-        print("구글 플레이스토어 Top 10 무료 앱 스크래핑 시작...")
+        print("구글 플레이스토어 Top 무료 앱 스크래핑 시작...")
         print("주의: Google Play Store는 봇 차단 정책이 있어 성공률이 낮을 수 있습니다.")
 
         script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -0,0 +1,187 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from urllib.parse import urlencode
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# (URL 패턴, TTL 초) - 처음 일치하는 규칙을 사용하고, 일치하지 않으면 캐시하지 않음
+DEFAULT_TTLS = (
+    (r'/rss/', 15 * 60),
+    (r'/lookup', 60 * 60),
+)
+
+# 캐시에 보관할 응답 헤더 (본문은 압축 해제된 상태로 저장)
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control', 'Date')
+
+
+class HttpCache:
+    def __init__(self, cache_dir=os.path.join("exports", ".http_cache"), ttls=DEFAULT_TTLS, max_bytes=200 * 1024 * 1024):
+        """
+        URL+파라미터 기준의 디스크 응답 캐시
+
+        TTL 안의 응답은 네트워크 없이 반환하고, TTL이 지난 응답은
+        ETag / Last-Modified 조건부 요청으로 재검증한다.
+        전체 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 항목부터 삭제한다.
+
+        Args:
+            cache_dir: 캐시 파일을 저장할 폴더
+            ttls: (URL 정규식, TTL 초) 규칙 목록
+            max_bytes: 캐시 전체 크기 상한 (바이트)
+        """
+        self.cache_dir = cache_dir
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in ttls]
+        self.max_bytes = max_bytes
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+        self._index = {}  # key -> [크기, 마지막 사용 시각]
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        """기존 캐시 파일로 LRU 인덱스 복원"""
+        for filename in os.listdir(self.cache_dir):
+            if not filename.endswith('.json'):
+                continue
+            key = filename[:-5]
+            meta_path = self._meta_path(key)
+            body_path = self._body_path(key)
+            try:
+                self._index[key] = [os.path.getsize(body_path), os.path.getmtime(meta_path)]
+            except OSError:
+                continue
+
+    def _meta_path(self, key):
+        return os.path.join(self.cache_dir, key + '.json')
+
+    def _body_path(self, key):
+        return os.path.join(self.cache_dir, key + '.body')
+
+    def record(self, name):
+        """hits / misses / revalidated 카운터 증가"""
+        with self._lock:
+            self.stats[name] += 1
+
+    def get_ttl(self, url):
+        """URL에 적용할 TTL (캐시 대상이 아니면 None)"""
+        for pattern, ttl in self.ttls:
+            if pattern.search(url):
+                return ttl
+        return None
+
+    def make_key(self, url, params=None):
+        """URL과 정렬된 파라미터로 캐시 키 생성"""
+        if params:
+            url = url + '?' + urlencode(sorted(dict(params).items()))
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def load(self, key):
+        """
+        캐시 항목 읽기
+
+        Returns:
+            tuple: (메타 dict, 본문 bytes) 또는 None
+        """
+        try:
+            with open(self._meta_path(key), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(self._body_path(key), 'rb') as f:
+                body = f.read()
+            return meta, body
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, meta, url):
+        """저장된 응답이 아직 TTL 안에 있는지 확인"""
+        ttl = self.get_ttl(url)
+        return ttl is not None and time.time() - meta.get('stored_at', 0) < ttl
+
+    def conditional_headers(self, meta):
+        """재검증용 If-None-Match / If-Modified-Since 헤더"""
+        headers = {}
+        stored = meta.get('headers', {})
+        if stored.get('ETag'):
+            headers['If-None-Match'] = stored['ETag']
+        if stored.get('Last-Modified'):
+            headers['If-Modified-Since'] = stored['Last-Modified']
+        return headers
+
+    def store(self, key, response):
+        """200 응답 저장"""
+        meta = {
+            'url': response.url,
+            'stored_at': time.time(),
+            'headers': {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+        }
+        body = response.content
+        with self._lock:
+            self._write(self._body_path(key), body, 'wb')
+            self._write(self._meta_path(key), json.dumps(meta), 'w')
+            self._index[key] = [len(body), time.time()]
+            self._evict()
+
+    def refresh(self, key, meta, response):
+        """304 응답을 받은 항목의 저장 시각과 검증 헤더 갱신"""
+        meta['stored_at'] = time.time()
+        for name in ('ETag', 'Last-Modified', 'Cache-Control', 'Date'):
+            if name in response.headers:
+                meta['headers'][name] = response.headers[name]
+        with self._lock:
+            self._write(self._meta_path(key), json.dumps(meta), 'w')
+            if key in self._index:
+                self._index[key][1] = time.time()
+
+    def touch(self, key):
+        """LRU 순서를 위해 마지막 사용 시각 갱신"""
+        now = time.time()
+        with self._lock:
+            if key in self._index:
+                self._index[key][1] = now
+            try:
+                os.utime(self._meta_path(key), (now, now))
+            except OSError:
+                pass
+
+    def to_response(self, meta, body):
+        """캐시 항목을 requests.Response로 변환"""
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.url = meta.get('url', '')
+        response.headers = CaseInsensitiveDict(meta.get('headers', {}))
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response._content = body
+        return response
+
+    def total_bytes(self):
+        with self._lock:
+            return sum(size for size, _ in self._index.values())
+
+    def _write(self, path, data, mode):
+        """임시 파일에 쓴 뒤 교체하여 중간에 끊겨도 깨진 항목이 남지 않게 함"""
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, mode, **({} if 'b' in mode else {'encoding': 'utf-8'})) as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _evict(self):
+        """크기 상한을 넘으면 오래 사용하지 않은 항목부터 삭제 (잠금 안에서 호출)"""
+        total = sum(size for size, _ in self._index.values())
+        if total <= self.max_bytes:
+            return
+
+        for key, (size, _) in sorted(self._index.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            for path in (self._meta_path(key), self._body_path(key)):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            del self._index[key]
+            total -= size
+            self.stats['evictions'] += 1
@@ -0,0 +1,203 @@
+import time
+import threading
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from HttpCache import HttpCache
+from Metrics import get_metrics
+
+try:
+    import brotli  # noqa: F401  (urllib3이 br 응답을 풀 때 사용)
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = 'gzip, deflate, br'
+    except ImportError:
+        ACCEPT_ENCODING = 'gzip, deflate'
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class SourceAddressAdapter(HTTPAdapter):
+    """지정한 로컬 주소에서 연결을 여는 어댑터 (여러 출구 주소로 요청을 나눌 때 사용)"""
+
+    def __init__(self, source_address, **kwargs):
+        # HTTPAdapter.__init__이 init_poolmanager를 호출하므로 먼저 설정
+        self.source_address = (source_address, 0)
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['source_address'] = self.source_address
+        super().init_poolmanager(*args, **kwargs)
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        proxy_kwargs['source_address'] = self.source_address
+        return super().proxy_manager_for(proxy, **proxy_kwargs)
+
+
+class HttpClient:
+    def __init__(self, pool_connections=10, pool_maxsize=20, max_retries=3,
+                 backoff_factor=0.5, backoff_jitter=0.5, backoff_max=60, timeout=30, headers=None,
+                 max_per_host=None, cache=None, metrics=None, proxy=None, source_address=None):
+        """
+        두 스크래퍼가 공유하는 HTTP 클라이언트
+
+        호스트별 keep-alive 커넥션 풀을 유지하고, 429/5xx 응답은
+        Retry-After 헤더를 따르거나 지터가 섞인 지수 백오프로 재시도한다.
+
+        Args:
+            pool_connections: 커넥션 풀을 유지할 호스트 수
+            pool_maxsize: 호스트당 최대 커넥션 수 (동시 요청 수 이상으로 설정)
+            max_retries: 최대 재시도 횟수
+            backoff_factor: 지수 백오프 기본값 (초)
+            backoff_jitter: 백오프에 더할 무작위 지연 최대값 (초)
+            backoff_max: 백오프 최대 대기 시간 (초)
+            timeout: 기본 요청 타임아웃 (초)
+            headers: 모든 요청에 붙일 기본 헤더
+            max_per_host: 호스트당 동시 요청 수 상한 (None이면 제한 없음)
+            cache: 응답을 저장/재검증할 HttpCache (None이면 캐시 사용 안 함)
+            metrics: 요청 수/응답 시간/전송량/재시도를 기록할 Metrics (기본값: 공유 Metrics)
+            proxy: 모든 요청을 보낼 프록시 URL (http://, socks5:// 등, 환경 변수 프록시보다 우선)
+            source_address: 연결에 사용할 로컬 IP 주소 (여러 출구 주소가 있는 서버용)
+        """
+        self.cache = cache
+        self.metrics = metrics or get_metrics()
+        self.timeout = timeout
+        self.max_per_host = max_per_host
+        # 세션 proxies는 환경 변수 프록시에 덮어써지므로 요청마다 지정
+        self.proxies = {'http': proxy, 'https': proxy} if proxy else None
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
+        self.session = requests.Session()
+        self.session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+        if headers:
+            self.session.headers.update(headers)
+
+        retry = Retry(
+            total=max_retries,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            backoff_factor=backoff_factor,
+            backoff_jitter=backoff_jitter,
+            backoff_max=backoff_max,
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        if source_address:
+            adapter = SourceAddressAdapter(source_address, pool_connections=pool_connections,
+                                           pool_maxsize=pool_maxsize, max_retries=retry)
+        else:
+            adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get(self, url, params=None, headers=None, timeout=None, rate_limiter=None, **kwargs):
+        """
+        GET 요청 (재시도 후에도 실패한 상태 코드는 그대로 반환)
+
+        캐시 규칙에 해당하는 URL은 TTL 안이면 저장된 응답을 그대로 반환하고,
+        TTL이 지났으면 조건부 요청으로 재검증한다.
+        rate_limiter를 넘기면 실제로 네트워크 요청을 보낼 때만 토큰을 확보한다
+        (캐시 적중은 토큰을 쓰지 않음).
+
+        Returns:
+            requests.Response
+        """
+        if self.cache is None or kwargs.get('stream') or self.cache.get_ttl(url) is None:
+            return self._send(url, params, headers, timeout, rate_limiter, **kwargs)
+
+        key = self.cache.make_key(url, params)
+        entry = self.cache.load(key)
+        if entry:
+            meta, body = entry
+            if self.cache.is_fresh(meta, url):
+                self.cache.record('hits')
+                self.metrics.increment('http_cache_total', result='hit')
+                self.cache.touch(key)
+                return self.cache.to_response(meta, body)
+            headers = {**(headers or {}), **self.cache.conditional_headers(meta)}
+
+        response = self._send(url, params, headers, timeout, rate_limiter, **kwargs)
+
+        if response.status_code == 304 and entry:
+            self.cache.record('revalidated')
+            self.metrics.increment('http_cache_total', result='revalidated')
+            self.cache.refresh(key, meta, response)
+            return self.cache.to_response(meta, body)
+
+        self.cache.record('misses')
+        self.metrics.increment('http_cache_total', result='miss')
+        if response.status_code == 200:
+            self.cache.store(key, response)
+        return response
+
+    def post(self, url, data=None, params=None, headers=None, timeout=None, **kwargs):
+        """POST 요청 (캐시/재시도 대상이 아님)"""
+        return self._request('POST', url, params=params, data=data, headers=headers,
+                             timeout=timeout or self.timeout, **kwargs)
+
+    def _send(self, url, params, headers, timeout, rate_limiter=None, **kwargs):
+        """실제 네트워크 GET 요청"""
+        if rate_limiter:
+            rate_limiter.acquire()
+        return self._request('GET', url, params=params, headers=headers, timeout=timeout or self.timeout, **kwargs)
+
+    def _request(self, method, url, **kwargs):
+        """호스트별 동시 요청 수 제한을 적용해 요청하고 지표 기록"""
+        if self.proxies:
+            kwargs.setdefault('proxies', self.proxies)
+        started = time.perf_counter()
+        try:
+            if not self.max_per_host:
+                response = self.session.request(method, url, **kwargs)
+            else:
+                with self._host_slot(url):
+                    response = self.session.request(method, url, **kwargs)
+        except requests.RequestException as e:
+            self.metrics.increment('http_errors_total', host=urlparse(url).netloc, error=type(e).__name__)
+            raise
+        self._record(method, url, response, time.perf_counter() - started, kwargs.get('stream'))
+        return response
+
+    def _record(self, method, url, response, elapsed, stream=False):
+        """요청 수, 응답 시간, 수신 바이트(압축 상태 기준), urllib3 재시도 횟수 기록"""
+        host = urlparse(url).netloc
+        self.metrics.increment('http_requests_total', host=host, method=method, status=response.status_code)
+        self.metrics.observe('http_request_seconds', elapsed, host=host, method=method)
+
+        raw = response.raw
+        if not stream:
+            received = raw.tell() if hasattr(raw, 'tell') else 0
+            self.metrics.increment('http_received_bytes_total', received or len(response.content), host=host)
+        retries = getattr(raw, 'retries', None)
+        if retries is not None and retries.history:
+            self.metrics.increment('http_retries_total', len(retries.history), host=host)
+
+    def _host_slot(self, url):
+        """호스트별 동시 요청 수를 제한하는 세마포어 반환"""
+        host = urlparse(url).netloc
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.max_per_host)
+                self._host_slots[host] = slot
+            return slot
+
+    def close(self):
+        """풀에 남은 커넥션 정리"""
+        self.session.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client():
+    """프로세스 전체에서 공유하는 기본 HttpClient 반환 (exports/.http_cache 캐시 사용)"""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = HttpClient(cache=HttpCache())
+        return _default_client
@@ -0,0 +1,643 @@
+import os
+import sys
+import time
+import socket
+import sqlite3
+import argparse
+import threading
+import itertools
+from datetime import datetime
+from urllib.parse import urlparse
+import FastJson
+
+# 작업 종류: chart(차트 목록 수집) → details(상세 정보 배치) → merge(셀 파일 병합)
+# 진행 중인 셀을 먼저 끝내도록 merge > details > chart 순서로 임대
+TASK_PRIORITY = "CASE kind WHEN 'merge' THEN 0 WHEN 'details' THEN 1 ELSE 2 END"
+
+PLAY_CHART = 'topselling_free'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    options TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    store TEXT NOT NULL,
+    country TEXT NOT NULL,
+    chart TEXT NOT NULL,
+    genre TEXT NOT NULL,
+    batch INTEGER NOT NULL DEFAULT 0,
+    payload TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    UNIQUE (run_id, kind, store, country, chart, genre, batch)
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, lease_expires);
+CREATE INDEX IF NOT EXISTS idx_tasks_cell ON tasks (run_id, store, country, chart, genre, kind, status);
+"""
+
+TASK_COLUMNS = ('id', 'run_id', 'kind', 'store', 'country', 'chart', 'genre', 'batch', 'payload', 'status',
+                'attempts', 'lease_owner', 'lease_expires', 'result', 'error')
+
+# 실행(run) 기본 옵션
+RUN_DEFAULTS = {
+    'limit': 100,
+    'batch_size': 50,
+    'fetch_details': True,
+    'fields': None,
+    'format': 'jsonl',
+    'output_dir': 'exports',
+    'snapshots': True,
+    'requests_per_second': 2.0,
+    'appstore_base_url': 'https://itunes.apple.com',
+    'play_base_url': 'https://play.google.com',
+    'egress': None
+}
+
+# 작업자 프로세스 안에서 재사용할 출구 풀 (출구 목록별)
+_egress_pools = {}
+
+
+class JobQueue:
+    def __init__(self, db_path=os.path.join("exports", "jobs.db"), lease_seconds=120, max_attempts=3):
+        """
+        SQLite 기반의 내구성 있는 수집 작업 큐
+
+        수집을 (스토어, 국가, 차트, 상세 정보 배치) 단위 작업으로 나누어 저장하고,
+        작업자 프로세스가 작업을 임대(lease)해 처리한다. 완료한 작업은 결과 파일 경로와 함께
+        기록되므로 중단 후 다시 실행해도 끝난 작업은 반복하지 않는다.
+        임대 시간 안에 완료/연장하지 못한 작업(작업자 종료 등)은 다른 작업자가 다시 임대한다.
+
+        프로세스마다 JobQueue를 따로 만들어 사용한다. WAL 모드는 공유 메모리 파일로 프로세스 사이를
+        조율하므로 한 서버 안의 작업자 프로세스끼리만 db_path를 공유할 수 있다 (NFS/SMB 같은
+        네트워크 폴더에 두면 안 됨). 여러 서버에 나누려면 서버마다 다른 run_id와 db_path를 사용한다.
+
+        Args:
+            db_path: 큐 데이터베이스 파일 경로
+            lease_seconds: 작업 임대 시간 (초, 작업자는 이 시간의 1/3마다 임대를 연장)
+            max_attempts: 작업당 최대 시도 횟수 (넘으면 failed)
+        """
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # 트랜잭션은 BEGIN IMMEDIATE로 직접 관리 (여러 프로세스가 같은 작업을 임대하지 않도록)
+        self._conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def _transaction(self):
+        return _Transaction(self._conn, self._lock)
+
+    def create_run(self, run_id=None, **options):
+        """
+        실행 하나 등록 (같은 run_id가 있으면 저장된 옵션을 그대로 사용)
+
+        Returns:
+            tuple: (run_id, 옵션 dict)
+        """
+        run_id = run_id or datetime.now().strftime('%Y%m%d_%H%M%S')
+        merged = {**RUN_DEFAULTS, **{key: value for key, value in options.items() if value is not None}}
+        with self._transaction() as conn:
+            conn.execute("INSERT OR IGNORE INTO runs (run_id, options, created_at) VALUES (?, ?, ?)",
+                         (run_id, FastJson.dumps(merged), datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+        return run_id, self.get_run(run_id)
+
+    def get_run(self, run_id):
+        """실행 옵션 조회"""
+        with self._lock:
+            row = self._conn.execute("SELECT options FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"등록되지 않은 실행: {run_id}")
+        return FastJson.loads(row[0])
+
+    def run_created_at(self, run_id):
+        """실행 등록 시각 조회 (같은 실행의 결과를 같은 시각으로 기록할 때 사용)"""
+        with self._lock:
+            row = self._conn.execute("SELECT created_at FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"등록되지 않은 실행: {run_id}")
+        return row[0]
+
+    def enqueue(self, run_id, kind, store, country, chart, genre='all', batch=0, payload=None):
+        """
+        작업 추가 (같은 작업이 이미 있으면 무시하므로 여러 번 호출해도 안전)
+
+        Returns:
+            bool: 새로 추가되었는지 여부
+        """
+        with self._transaction() as conn:
+            return self._insert(conn, run_id, kind, store, country, chart, genre, batch, payload)
+
+    def enqueue_many(self, tasks):
+        """
+        여러 작업을 한 트랜잭션으로 추가 (일부만 보이는 상태를 다른 작업자가 보지 않도록)
+
+        Args:
+            tasks: enqueue 인자 dict 리스트 (run_id, kind, store, country, chart, genre, batch, payload)
+
+        Returns:
+            int: 새로 추가된 작업 수
+        """
+        with self._transaction() as conn:
+            return sum(self._insert(conn, **task) for task in tasks)
+
+    @staticmethod
+    def _insert(conn, run_id, kind, store, country, chart, genre='all', batch=0, payload=None):
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO tasks (run_id, kind, store, country, chart, genre, batch, payload, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (run_id, kind, store, country, chart, genre, batch,
+             FastJson.dumps(payload) if payload is not None else None, time.time())
+        )
+        return cursor.rowcount > 0
+
+    def plan(self, run_id, stores, countries, charts=('topfreeapplications',), genres=('all',)):
+        """
+        국가 × 차트 × 장르 조합의 chart 작업 등록 (구글 플레이는 국가별 하나)
+
+        Returns:
+            int: 새로 추가된 작업 수
+        """
+        added = 0
+        for store, country in itertools.product(stores, countries):
+            if store == 'appstore':
+                cells = itertools.product(charts, genres)
+            else:
+                cells = [(PLAY_CHART, 'all')]
+            for chart, genre in cells:
+                added += self.enqueue(run_id, 'chart', store, country, chart, genre)
+        return added
+
+    def lease(self, worker_id, run_id=None):
+        """
+        처리할 작업 하나 임대
+
+        대기 중인 작업 또는 임대 시간이 지난 작업 중 하나를 골라 worker_id에 임대한다.
+
+        Returns:
+            dict: 작업 정보 (없으면 None)
+        """
+        now = time.time()
+        run_filter = " AND run_id = ?" if run_id else ""
+        run_params = (run_id,) if run_id else ()
+        with self._transaction() as conn:
+            # 시도 횟수를 모두 쓴 상태로 임대가 끝난 작업은 실패 처리
+            conn.execute(
+                "UPDATE tasks SET status = 'failed', error = COALESCE(error, '임대 시간 초과'), updated_at = ? "
+                f"WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?{run_filter}",
+                (now, now, self.max_attempts, *run_params)
+            )
+            row = conn.execute(
+                f"SELECT {', '.join(TASK_COLUMNS)} FROM tasks "
+                f"WHERE (status = 'pending' OR (status = 'leased' AND lease_expires < ?)){run_filter} "
+                f"ORDER BY {TASK_PRIORITY}, id LIMIT 1",
+                (now, *run_params)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE tasks SET status = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1, "
+                "updated_at = ? WHERE id = ?",
+                (worker_id, now + self.lease_seconds, now, row[0])
+            )
+        task = dict(zip(TASK_COLUMNS, row))
+        task['payload'] = FastJson.loads(task['payload']) if task['payload'] else None
+        task['attempts'] += 1
+        task['lease_owner'] = worker_id
+        return task
+
+    def heartbeat(self, task_id, worker_id):
+        """
+        임대 연장
+
+        Returns:
+            bool: 아직 이 작업자의 임대인지 여부 (False면 다른 작업자에게 넘어간 것)
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET lease_expires = ?, updated_at = ? "
+                "WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+                (now + self.lease_seconds, now, task_id, worker_id)
+            )
+            return cursor.rowcount > 0
+
+    def complete(self, task, worker_id, result=None, then_merge=False):
+        """
+        작업 완료 기록 (체크포인트)
+
+        then_merge=True면 같은 트랜잭션에서 셀의 상세 정보 배치가 모두 끝났는지 확인하고 병합 작업을 등록한다.
+        완료 기록과 병합 등록 사이에 작업자가 죽어도 병합이 빠지지 않는다.
+
+        Args:
+            task: lease로 받은 작업
+            worker_id: 작업자 ID
+            result: 결과(체크포인트 경로)
+            then_merge: 상세 정보 작업이면 True
+
+        Returns:
+            bool: 기록 여부 (임대를 잃은 뒤라면 False)
+        """
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = 'done', result = ?, error = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+                (result, time.time(), task['id'], worker_id)
+            )
+            if cursor.rowcount == 0:
+                return False
+            if then_merge and self._cell_remaining(conn, task, 'details') == 0:
+                self._insert(conn, task['run_id'], 'merge', task['store'], task['country'], task['chart'],
+                             task['genre'])
+            return True
+
+    def fail(self, task_id, worker_id, error):
+        """작업 실패 기록 (시도 횟수가 남았으면 다시 대기 상태로)"""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "error = ?, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+                (self.max_attempts, str(error), time.time(), task_id, worker_id)
+            )
+
+    def retry_failed(self, run_id):
+        """failed 작업을 시도 횟수를 초기화해 다시 대기 상태로 (반환: 작업 수)"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = 'pending', attempts = 0, updated_at = ? WHERE run_id = ? AND status = 'failed'",
+                (time.time(), run_id)
+            )
+            return cursor.rowcount
+
+    def cell_done(self, task, kind='details'):
+        """task와 같은 셀의 kind 작업이 모두 끝났는지 여부"""
+        with self._lock:
+            return self._cell_remaining(self._conn, task, kind) == 0
+
+    @staticmethod
+    def _cell_remaining(conn, task, kind):
+        """task와 같은 셀에서 아직 끝나지 않은 kind 작업 수"""
+        return conn.execute(
+            "SELECT COUNT(*) FROM tasks WHERE run_id = ? AND store = ? AND country = ? AND chart = ? "
+            "AND genre = ? AND kind = ? AND status != 'done'",
+            (task['run_id'], task['store'], task['country'], task['chart'], task['genre'], kind)
+        ).fetchone()[0]
+
+    def cell_results(self, task, kind='details'):
+        """task와 같은 셀의 완료된 kind 작업 결과 경로 (배치 순서)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT result FROM tasks WHERE run_id = ? AND store = ? AND country = ? AND chart = ? "
+                "AND genre = ? AND kind = ? AND status = 'done' ORDER BY batch",
+                (task['run_id'], task['store'], task['country'], task['chart'], task['genre'], kind)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def counts(self, run_id=None):
+        """
+        상태별 작업 수
+
+        Returns:
+            dict: {상태: 개수} (pending / leased / done / failed)
+        """
+        sql = "SELECT status, COUNT(*) FROM tasks"
+        params = ()
+        if run_id:
+            sql += " WHERE run_id = ?"
+            params = (run_id,)
+        with self._lock:
+            rows = self._conn.execute(sql + " GROUP BY status", params).fetchall()
+        counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        counts.update(dict(rows))
+        return counts
+
+    def failures(self, run_id):
+        """실패한 작업 목록"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(TASK_COLUMNS)} FROM tasks WHERE run_id = ? AND status = 'failed' ORDER BY id",
+                (run_id,)
+            ).fetchall()
+        return [dict(zip(TASK_COLUMNS, row)) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ~ COMMIT/ROLLBACK (스레드 잠금 포함)"""
+
+    def __init__(self, conn, lock):
+        self.conn = conn
+        self.lock = lock
+
+    def __enter__(self):
+        self.lock.acquire()
+        try:
+            self.conn.execute("BEGIN IMMEDIATE")
+        except Exception:
+            self.lock.release()
+            raise
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.lock.release()
+
+
+def _work_dir(options, task):
+    """셀 하나의 체크포인트 파일 폴더"""
+    return os.path.join(options['output_dir'], "jobs", task['run_id'],
+                        f"{task['store']}_{task['country']}_{task['chart']}_{task['genre']}")
+
+
+def _write_checkpoint(path, data):
+    """체크포인트 파일을 임시 파일에 쓴 뒤 교체 (쓰다 만 파일이 남지 않도록)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    FastJson.dump_file(data, tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _read_checkpoint(path):
+    with open(path, 'rb') as f:
+        return FastJson.loads(f.read())
+
+
+def _appstore_scraper(options, country):
+    from AppStoreTopScraper import AppStoreTopScraper
+    return AppStoreTopScraper(country=country, limit=options['limit'], base_url=options['appstore_base_url'],
+                              requests_per_second=options['requests_per_second'], fields=options['fields'])
+
+
+def _play_transport(options):
+    """구글 플레이 요청에 쓸 출구 풀 (출구 목록이 없으면 None: 기본 클라이언트/페이서 사용)"""
+    if not options.get('egress'):
+        return None
+    key = tuple(options['egress'])
+    if key not in _egress_pools:
+        from EgressPool import EgressPool
+        _egress_pools[key] = EgressPool(options['egress'], host=urlparse(options['play_base_url']).netloc)
+    return _egress_pools[key]
+
+
+def handle_chart(queue, task, options):
+    """
+    차트 목록을 받아 체크포인트로 저장하고 상세 정보 배치 작업(없으면 병합 작업) 등록
+
+    임대 시간이 지나 다시 실행될 때 이전 시도가 저장한 목록이 있으면 그대로 사용한다.
+    이미 등록된 배치는 그 목록의 구간이므로, 목록을 새로 받으면 배치와 순위가 어긋난다.
+    """
+    from AppRecord import to_dicts
+
+    path = os.path.join(_work_dir(options, task), "list.json")
+    if task['store'] == 'appstore':
+        scraper = _appstore_scraper(options, task['country'])
+        fetch_details = options['fetch_details'] and bool(scraper.detail_sources)
+    else:
+        fetch_details = options['fetch_details']
+
+    if os.path.exists(path):
+        apps = _read_checkpoint(path)
+    else:
+        if task['store'] == 'appstore':
+            apps = scraper.get_top_apps(category=task['genre'], chart_type=task['chart'])
+        else:
+            from GooglePlayStoreTopScraper import GooglePlayStoreTopScraper
+            pool = _play_transport(options)
+            apps = GooglePlayStoreTopScraper.get_google_play_top_apps(
+                country=task['country'], limit=options['limit'], fetch_details=False,
+                base_url=options['play_base_url'], fields=options['fields'], client=pool, pacer=pool)
+        if not apps:
+            raise RuntimeError("앱 목록 수집 실패")
+        _write_checkpoint(path, to_dicts(apps))
+
+    cell = {'run_id': task['run_id'], 'store': task['store'], 'country': task['country'], 'chart': task['chart'],
+            'genre': task['genre']}
+    if fetch_details:
+        batch_size = max(1, int(options['batch_size']))
+        tasks = [{**cell, 'kind': 'details', 'batch': batch, 'payload': {'list': path, 'start': start,
+                                                                         'end': start + batch_size}}
+                 for batch, start in enumerate(range(0, len(apps), batch_size))]
+    else:
+        tasks = [{**cell, 'kind': 'merge', 'payload': {'list': path}}]
+    # 배치를 한 번에 등록해야 먼저 끝난 배치가 셀 완료로 잘못 판단되지 않음
+    queue.enqueue_many(tasks)
+    return path
+
+
+def handle_details(queue, task, options):
+    """목록의 한 구간만 상세 정보를 받아 배치 체크포인트로 저장"""
+    from AppRecord import to_dicts
+
+    payload = task['payload']
+    apps = _read_checkpoint(payload['list'])[payload['start']:payload['end']]
+    if task['store'] == 'appstore':
+        scraper = _appstore_scraper(options, task['country'])
+        app_ids = [app['app_id'] for app in apps if app.get('app_id')]
+        details = scraper.get_app_details_batch(app_ids) if app_ids else {}
+        # 일괄 요청 실패는 빈 결과로 돌아오므로, 하나라도 빠지면 완료로 기록하지 않고 재시도 대상으로 처리
+        missing = [app_id for app_id in app_ids if not details.get(str(app_id))]
+        if missing:
+            raise RuntimeError(f"상세 정보 누락 {len(missing)}개: {', '.join(map(str, missing[:5]))}")
+        for app in apps:
+            if app.get('app_id'):
+                app.update(details.get(app['app_id'], {}))
+    else:
+        from GooglePlayStoreTopScraper import GooglePlayStoreTopScraper
+        pool = _play_transport(options)
+        GooglePlayStoreTopScraper.enrich_apps_with_details(apps, base_url=options['play_base_url'],
+                                                           fields=options['fields'], client=pool, pacer=pool,
+                                                           strict=True)
+
+    path = os.path.join(_work_dir(options, task), f"details_{task['batch']:04d}.json")
+    return _write_checkpoint(path, to_dicts(apps))
+
+
+def handle_merge(queue, task, options):
+    """셀의 배치 체크포인트를 순위 순서대로 합쳐 최종 파일로 저장"""
+    from StreamingExporter import StreamingExporter
+
+    parts = queue.cell_results(task, 'details') or [task['payload']['list']]
+    chart = task['chart'] if task['genre'] == 'all' else f"{task['chart']}_{task['genre']}"
+    filepath = os.path.join(options['output_dir'], task['store'],
+                            f"{task['store']}_{task['country']}_{chart}_{task['run_id']}.{options['format']}")
+
+    apps = []
+    with StreamingExporter(filepath) as exporter:
+        for part in parts:
+            records = _read_checkpoint(part)
+            exporter.write_all(records)
+            apps.extend(records)
+
+    if options['snapshots']:
+        from SnapshotStore import SnapshotStore
+        store = SnapshotStore(os.path.join(options['output_dir'], "snapshots.db"))
+        chart_name = task['chart'] if task['genre'] == 'all' else f"{task['chart']}/{task['genre']}"
+        # 실행 등록 시각을 수집 시각으로 써서 병합을 다시 해도 같은 스냅샷을 덮어쓰게 함
+        store.append(task['store'], task['country'], chart_name, apps,
+                     taken_at=queue.run_created_at(task['run_id']))
+        store.close()
+    return filepath
+
+
+HANDLERS = {'chart': handle_chart, 'details': handle_details, 'merge': handle_merge}
+
+
+def run_worker(db_path, run_id=None, worker_id=None, poll_interval=1.0, lease_seconds=120, max_attempts=3):
+    """
+    작업자 하나 실행 (대기/임대 중인 작업이 모두 없어질 때까지)
+
+    처리 중에는 별도 스레드가 임대를 연장하고, 작업이 끝나면 결과 경로를 완료로 기록한다.
+    같은 셀의 상세 정보 배치가 모두 끝나면 병합 작업을 등록한다.
+
+    Returns:
+        int: 처리한 작업 수
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    queue = JobQueue(db_path, lease_seconds=lease_seconds, max_attempts=max_attempts)
+    processed = 0
+    try:
+        while True:
+            task = queue.lease(worker_id, run_id)
+            if task is None:
+                counts = queue.counts(run_id)
+                if not counts['pending'] and not counts['leased']:
+                    break
+                # 다른 작업자가 처리 중인 작업이 끝나거나 임대가 만료될 때까지 대기
+                time.sleep(poll_interval)
+                continue
+
+            options = queue.get_run(task['run_id'])
+            stop = threading.Event()
+            keeper = threading.Thread(target=_keep_lease, args=(queue, task, worker_id, stop), daemon=True)
+            keeper.start()
+            try:
+                result = HANDLERS[task['kind']](queue, task, options)
+            except Exception as e:
+                print(f"[{worker_id}] 작업 실패 #{task['id']} {task['kind']} "
+                      f"{task['store']}/{task['country']}/{task['chart']} (시도 {task['attempts']}): {e}")
+                queue.fail(task['id'], worker_id, f"{type(e).__name__}: {e}")
+                continue
+            finally:
+                stop.set()
+                keeper.join()
+
+            if not queue.complete(task, worker_id, result, then_merge=task['kind'] == 'details'):
+                print(f"[{worker_id}] 임대를 잃은 작업 #{task['id']} - 결과는 다른 작업자 기록을 사용")
+                continue
+            processed += 1
+            if task['kind'] == 'merge':
+                print(f"[{worker_id}] 셀 완료: {result}")
+    finally:
+        queue.close()
+    return processed
+
+
+def _keep_lease(queue, task, worker_id, stop):
+    """작업이 끝날 때까지 임대 시간의 1/3마다 임대 연장"""
+    while not stop.wait(queue.lease_seconds / 3):
+        if not queue.heartbeat(task['id'], worker_id):
+            return
+
+
+def run_workers(db_path, processes=4, run_id=None, **kwargs):
+    """
+    작업자 프로세스 여러 개를 실행하고 모두 끝날 때까지 대기
+
+    Returns:
+        int: 비정상 종료한 프로세스 수
+    """
+    import multiprocessing
+
+    workers = [multiprocessing.Process(target=run_worker, args=(db_path, run_id), kwargs=kwargs)
+               for _ in range(max(1, processes))]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return sum(1 for worker in workers if worker.exitcode != 0)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="수집 작업 큐 (여러 프로세스/서버에서 나누어 수집, 중단 후 이어서 실행)")
+    parser.add_argument('--db', default=os.path.join("exports", "jobs.db"), help="큐 데이터베이스 경로 (로컬 디스크, 네트워크 폴더 불가)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    plan = commands.add_parser('plan', help="실행 등록 및 작업 생성 (같은 --run으로 다시 실행해도 안전)")
+    plan.add_argument('--run', help="실행 ID (기본값: 현재 시각)")
+    plan.add_argument('--stores', nargs='+', default=['appstore'], choices=['appstore', 'googleplay'])
+    plan.add_argument('--countries', nargs='+', default=['kr'])
+    plan.add_argument('--charts', nargs='+', default=['topfreeapplications'])
+    plan.add_argument('--genres', nargs='+', default=['all'])
+    plan.add_argument('--limit', type=int)
+    plan.add_argument('--batch-size', type=int, help="상세 정보 작업 하나에 포함할 앱 수")
+    plan.add_argument('--no-details', dest='fetch_details', action='store_false', default=None)
+    plan.add_argument('--fields', nargs='+')
+    plan.add_argument('--format', choices=['jsonl', 'jsonl.gz', 'csv', 'csv.gz'])
+    plan.add_argument('--output-dir')
+    plan.add_argument('--requests-per-second', type=float, help="작업자 프로세스당 iTunes 초당 요청 수")
+    plan.add_argument('--egress', nargs='+', help="구글 플레이 요청을 나눠 보낼 출구 목록 (프록시 URL, source:IP, direct)")
+
+    work = commands.add_parser('work', help="작업자 실행")
+    work.add_argument('--run', help="이 실행의 작업만 처리 (기본값: 전체)")
+    work.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    work.add_argument('--lease-seconds', type=int, default=120)
+
+    status = commands.add_parser('status', help="작업 상태 확인")
+    status.add_argument('--run')
+
+    retry = commands.add_parser('retry', help="failed 작업을 다시 대기 상태로")
+    retry.add_argument('--run', required=True)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+    if args.command == 'work':
+        started = time.monotonic()
+        errors = run_workers(args.db, args.processes, args.run, lease_seconds=args.lease_seconds)
+        queue = JobQueue(args.db)
+        counts = queue.counts(args.run)
+        print(f"작업자 {args.processes}개 종료 ({time.monotonic() - started:.1f}초): {counts}")
+        return 1 if errors or counts['failed'] else 0
+
+    queue = JobQueue(args.db)
+    if args.command == 'plan':
+        run_id, options = queue.create_run(
+            args.run, limit=args.limit, batch_size=args.batch_size, fetch_details=args.fetch_details,
+            fields=args.fields, format=args.format, output_dir=args.output_dir,
+            requests_per_second=args.requests_per_second, egress=args.egress)
+        added = queue.plan(run_id, args.stores, args.countries, args.charts, args.genres)
+        print(f"실행 {run_id}: 작업 {added}개 추가, 상태 {queue.counts(run_id)}")
+    elif args.command == 'retry':
+        print(f"작업 {queue.retry_failed(args.run)}개를 다시 대기 상태로 변경")
+    else:
+        print(queue.counts(args.run))
+        if args.run:
+            for task in queue.failures(args.run):
+                print(f"  실패 #{task['id']} {task['kind']} {task['store']}/{task['country']}/{task['chart']}"
+                      f"/{task['genre']} 배치 {task['batch']}: {task['error']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
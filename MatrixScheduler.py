@@ -0,0 +1,147 @@
+import os
+import itertools
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+CHART_TYPES = ('topfreeapplications', 'toppaidapplications', 'topgrossingapplications')
+STREAM_TYPES = ('jsonl', 'jsonl.gz', 'csv.gz')
+
+
+class MatrixScheduler:
+    def __init__(self, countries, chart_types=CHART_TYPES, genres=('all',), limit=100,
+                 fetch_details=True, save_type='csv', export_dir=os.path.join("exports", "matrix"),
+                 max_workers=8, max_per_host=4, requests_per_second=2.0, incremental=False,
+                 snapshot_store=None, fields=None, compact=False, asset_downloader=None,
+                 blob_store=None):
+        """
+        국가 × 차트 × 장르 매트릭스를 병렬로 수집하는 스케줄러
+
+        Args:
+            countries: 국가 코드 리스트
+            chart_types: 차트 타입 리스트
+            genres: 장르 리스트 (all, games 등 또는 장르 ID)
+            limit: 셀당 수집할 앱 개수
+            fetch_details: 상세 정보 수집 여부
+            save_type: 저장 형식 (csv/json 또는 스트리밍 형식 jsonl/jsonl.gz/csv.gz)
+            export_dir: 셀별 결과 파일을 저장할 폴더
+            max_workers: 동시에 수집할 셀 수
+            max_per_host: 호스트당 동시 요청 수 상한
+            requests_per_second: iTunes 호스트에 대한 초당 요청 수 제한
+            incremental: 이전 스냅샷과 비교해 바뀐 앱만 상세 정보를 다시 수집할지 여부
+            snapshot_store: 셀별 수집 결과를 누적할 SnapshotStore
+            fields: 레코드에 남길 필드 목록 (None이면 전체)
+            compact: json 형식을 들여쓰기 없이 저장할지 여부
+            asset_downloader: 셀마다 아이콘/스크린샷을 내려받을 AssetDownloader (None이면 받지 않음)
+            blob_store: 큰 필드를 내용 해시 참조로 바꿔 저장할 BlobStore (None이면 그대로 저장)
+        """
+        self.countries = list(countries)
+        self.chart_types = list(chart_types)
+        self.genres = list(genres)
+        self.limit = limit
+        self.fetch_details = fetch_details
+        self.save_type = save_type
+        self.export_dir = export_dir
+        self.max_workers = max_workers
+        self.requests_per_second = requests_per_second
+        self.incremental = incremental
+        self.snapshot_store = snapshot_store
+        self.fields = fields
+        self.compact = compact
+        self.asset_downloader = asset_downloader
+        self.blob_store = blob_store
+
+        # requests 등 수집 의존성은 스케줄러를 만들 때 불러옴 (CHART_TYPES만 쓰는 CLI 시작 시간 단축)
+        from HttpClient import HttpClient
+        from HttpCache import HttpCache
+        self.client = HttpClient(pool_maxsize=max(max_per_host, 1), max_per_host=max_per_host, cache=HttpCache())
+
+    def get_cells(self):
+        """수집할 (국가, 차트, 장르) 조합 리스트"""
+        return list(itertools.product(self.countries, self.chart_types, self.genres))
+
+    def get_filepath(self, country, chart_type, genre, today=None):
+        """셀 하나의 결과 파일 경로"""
+        today = today or datetime.now().strftime("%Y%m%d")
+        extension = "." + self.save_type if self.save_type == "json" or self.save_type in STREAM_TYPES else ".csv"
+        return os.path.join(self.export_dir, f"appstore_{country}_{chart_type}_{genre}_{today}{extension}")
+
+    def run_cell(self, country, chart_type, genre, today=None):
+        """
+        셀 하나를 수집하여 파일로 저장
+
+        Returns:
+            dict: 셀 수집 결과 요약
+        """
+        from AppStoreTopScraper import AppStoreTopScraper
+
+        result = {'country': country, 'chart_type': chart_type, 'genre': genre, 'count': 0, 'filepath': None, 'error': None}
+
+        scraper = AppStoreTopScraper(country=country, limit=self.limit,
+                                     requests_per_second=self.requests_per_second, client=self.client,
+                                     incremental=self.incremental, snapshot_store=self.snapshot_store,
+                                     fields=self.fields, blob_store=self.blob_store)
+        filepath = self.get_filepath(country, chart_type, genre, today)
+        if self.save_type in STREAM_TYPES:
+            # 스트리밍 형식은 레코드가 완성되는 즉시 셀 파일에 기록
+            apps = None
+            try:
+                with scraper.open_stream(filepath) as sink:
+                    apps = scraper.scrape_top_apps_with_details(chart_type=chart_type, category=genre,
+                                                                fetch_details=self.fetch_details, sink=sink)
+            finally:
+                # 실패한 셀의 빈 파일이 성공한 셀 파일 사이에 남지 않도록 삭제
+                if not apps and os.path.exists(filepath):
+                    os.remove(filepath)
+        else:
+            apps = scraper.scrape_top_apps_with_details(chart_type=chart_type, category=genre,
+                                                        fetch_details=self.fetch_details)
+            if apps and self.save_type == "json":
+                scraper.save_to_json(apps, filepath, compact=self.compact)
+            elif apps:
+                scraper.save_to_csv(apps, filepath)
+
+        if not apps:
+            result['error'] = "앱 정보 수집 실패"
+            return result
+
+        if self.asset_downloader:
+            self.asset_downloader.download_records(apps, manifest_path=self.asset_downloader.manifest_path_for(filepath))
+
+        result['count'] = len(apps)
+        result['filepath'] = filepath
+        return result
+
+    def run(self):
+        """
+        전체 매트릭스를 병렬로 수집
+
+        Returns:
+            list: 셀별 수집 결과 요약 (매트릭스 순서)
+        """
+        os.makedirs(self.export_dir, exist_ok=True)
+        today = datetime.now().strftime("%Y%m%d")
+        cells = self.get_cells()
+        print(f"매트릭스 수집 시작: {len(cells)}개 셀 (동시 {self.max_workers}개)")
+
+        results = [None] * len(cells)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.run_cell, *cell, today): i for i, cell in enumerate(cells)}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    country, chart_type, genre = cells[i]
+                    results[i] = {'country': country, 'chart_type': chart_type, 'genre': genre,
+                                  'count': 0, 'filepath': None, 'error': str(e)}
+
+        failed = [result for result in results if result['error']]
+        print(f"매트릭스 수집 완료: 성공 {len(results) - len(failed)}개, 실패 {len(failed)}개")
+        for result in failed:
+            print(f"  실패: {result['country']}/{result['chart_type']}/{result['genre']} - {result['error']}")
+        return results
+
+
+if __name__ == "__main__":
+    scheduler = MatrixScheduler(countries=['kr', 'us', 'jp'], genres=['all', 'games'], limit=100)
+    scheduler.run()
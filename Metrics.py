@@ -0,0 +1,215 @@
+import os
+import json
+import time
+import pstats
+import cProfile
+import threading
+from contextlib import contextmanager
+
+# 히스토그램 기본 구간 (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _label_key(labels):
+    """레이블 dict를 정렬된 튜플로 (dict 키로 쓰기 위함)"""
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(key, extra=()):
+    """Prometheus 레이블 문자열 {a="1",b="2"}"""
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class Metrics:
+    def __init__(self, namespace='app_scraper', buckets=DEFAULT_BUCKETS):
+        """
+        단계별 실행 시간, 요청 수, 전송량, 재시도, 파싱 실패를 모으는 계측 저장소 (스레드 안전)
+
+        카운터는 누적 값, 게이지는 마지막 값, 히스토그램은 구간별 관측 수/합계/개수를 레이블 조합마다 보관하며,
+        JSON 또는 Prometheus textfile 형식으로 내보낼 수 있다.
+
+        Args:
+            namespace: Prometheus 지표 이름 앞에 붙일 접두어
+            buckets: 히스토그램 구간 상한 목록
+        """
+        self.namespace = namespace
+        self.buckets = tuple(sorted(buckets))
+        self.started_at = time.time()
+        self._counters = {}  # 이름 -> {레이블 키: 값}
+        self._gauges = {}  # 이름 -> {레이블 키: 마지막 값}
+        self._histograms = {}  # 이름 -> {레이블 키: [구간별 개수, 합계, 개수]}
+        self._lock = threading.Lock()
+
+    def increment(self, name, value=1, **labels):
+        """카운터 증가"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        """게이지 값 설정"""
+        key = _label_key(labels)
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    def observe(self, name, value, **labels):
+        """히스토그램에 값 하나 기록"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram[0][index] += 1
+                    break
+            histogram[1] += value
+            histogram[2] += 1
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """with 블록 실행 시간(초)을 히스토그램에 기록 (예외가 나도 기록)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def stage(self, store, stage):
+        """스크래퍼 단계(fetch/parse/enrich/export) 실행 시간 기록"""
+        return self.timer('stage_seconds', store=store, stage=stage)
+
+    def get_counter(self, name, **labels):
+        """카운터 값 (레이블을 주지 않으면 전체 합계)"""
+        with self._lock:
+            series = self._counters.get(name, {})
+            if labels:
+                return series.get(_label_key(labels), 0)
+            return sum(series.values())
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+            self.started_at = time.time()
+
+    def to_dict(self):
+        """
+        JSON으로 저장할 수 있는 지표 요약
+
+        Returns:
+            dict: {'counters': [...], 'gauges': [...], 'histograms': [...]} (히스토그램은 누적이 아닌 구간별 개수)
+        """
+        with self._lock:
+            counters = [{'name': name, 'labels': dict(key), 'value': value}
+                        for name, series in sorted(self._counters.items())
+                        for key, value in sorted(series.items())]
+            gauges = [{'name': name, 'labels': dict(key), 'value': value}
+                      for name, series in sorted(self._gauges.items())
+                      for key, value in sorted(series.items())]
+            histograms = [{'name': name, 'labels': dict(key), 'count': count, 'sum': round(total, 6),
+                           'buckets': dict(zip(self.buckets, counts))}
+                          for name, series in sorted(self._histograms.items())
+                          for key, (counts, total, count) in sorted(series.items())]
+        return {'started_at': self.started_at, 'elapsed': round(time.time() - self.started_at, 3),
+                'counters': counters, 'gauges': gauges, 'histograms': histograms}
+
+    def to_prometheus(self):
+        """Prometheus 텍스트 노출 형식 문자열"""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                metric = f"{self.namespace}_{name}"
+                lines.append(f"# TYPE {metric} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{metric}{_format_labels(key)} {value}")
+
+            for name, series in sorted(self._gauges.items()):
+                metric = f"{self.namespace}_{name}"
+                lines.append(f"# TYPE {metric} gauge")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{metric}{_format_labels(key)} {value}")
+
+            for name, series in sorted(self._histograms.items()):
+                metric = f"{self.namespace}_{name}"
+                lines.append(f"# TYPE {metric} histogram")
+                for key, (counts, total, count) in sorted(series.items()):
+                    cumulative = 0
+                    for bound, bucket_count in zip(self.buckets, counts):
+                        cumulative += bucket_count
+                        lines.append(f"{metric}_bucket{_format_labels(key, [('le', bound)])} {cumulative}")
+                    lines.append(f"{metric}_bucket{_format_labels(key, [('le', '+Inf')])} {count}")
+                    lines.append(f"{metric}_sum{_format_labels(key)} {total}")
+                    lines.append(f"{metric}_count{_format_labels(key)} {count}")
+        return '\n'.join(lines) + '\n'
+
+    def save(self, filepath):
+        """
+        지표 저장 (.prom이면 Prometheus textfile, 그 외에는 JSON)
+
+        node_exporter textfile 수집기가 쓰다 만 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체한다.
+        """
+        directory = os.path.dirname(filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = filepath + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            if filepath.endswith('.prom'):
+                f.write(self.to_prometheus())
+            else:
+                json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, filepath)
+        print(f"지표 저장 완료: {filepath}")
+
+    def summary(self):
+        """단계별 소요 시간 요약 {(store, stage): (횟수, 합계 초)}"""
+        with self._lock:
+            series = self._histograms.get('stage_seconds', {})
+            return {(dict(key).get('store'), dict(key).get('stage')): (count, total)
+                    for key, (_, total, count) in series.items()}
+
+
+@contextmanager
+def profile(filepath=None, sort='cumulative', limit=30):
+    """
+    with 블록을 cProfile로 프로파일링
+
+    호출한 스레드만 측정하므로 병렬 상세 수집의 작업 스레드 시간은 대기 시간으로 보인다.
+
+    Args:
+        filepath: 통계를 저장할 파일 (.prof, snakeviz/pstats로 열기). None이면 상위 항목만 출력
+        sort: 출력 정렬 기준
+        limit: 출력할 상위 함수 수
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if filepath:
+            directory = os.path.dirname(filepath)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            profiler.dump_stats(filepath)
+            print(f"프로파일 저장 완료: {filepath}")
+        else:
+            pstats.Stats(profiler).sort_stats(sort).print_stats(limit)
+
+
+_default_metrics = Metrics()
+
+
+def get_metrics():
+    """프로세스 전체에서 공유하는 기본 Metrics 반환"""
+    return _default_metrics
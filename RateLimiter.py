@@ -0,0 +1,104 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class RateLimiter:
+    # 호스트별로 공유되는 리미터
+    _registry = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, rate=2.0, burst=None):
+        """
+        토큰 버킷 방식의 요청 속도 제한기 (스레드 안전)
+
+        Args:
+            rate: 초당 허용 요청 수
+            burst: 한 번에 몰아서 보낼 수 있는 최대 요청 수 (기본값: rate)
+        """
+        self.rate = float(rate)
+        self.burst = float(burst if burst else max(rate, 1))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """토큰을 확보할 때까지 대기"""
+        # 토큰을 먼저 예약하고 부족분만큼 잠금 밖에서 대기
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    def reserve(self, tokens=1):
+        """
+        대기하지 않고 토큰만 예약
+
+        Returns:
+            float: 예약한 토큰을 쓸 수 있을 때까지 기다려야 할 시간 (초)
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= tokens
+            return -self._tokens / self.rate if self._tokens < 0 else 0
+
+    def delay(self, tokens=1):
+        """토큰을 예약하지 않고, 지금 요청하면 기다려야 할 시간 (초)"""
+        with self._lock:
+            self._refill()
+            missing = tokens - self._tokens
+            return missing / self.rate if missing > 0 else 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def configure(self, rate=None, burst=None):
+        """속도/버스트 값 변경"""
+        with self._lock:
+            if rate:
+                self.rate = float(rate)
+            if burst:
+                self.burst = float(burst)
+                self._tokens = min(self._tokens, self.burst)
+
+    def pause(self, seconds):
+        """이후 요청들이 최소 seconds 동안 대기하도록 토큰을 비움"""
+        with self._lock:
+            self._tokens = min(self._tokens, -seconds * self.rate)
+            self._updated = time.monotonic()
+
+    def tighten(self, rate=None, burst=None):
+        """지정한 값이 현재보다 작을 때만 속도/버스트를 낮춤"""
+        with self._lock:
+            if rate and rate < self.rate:
+                self.rate = float(rate)
+            if burst and burst < self.burst:
+                self.burst = float(burst)
+                self._tokens = min(self._tokens, self.burst)
+
+    @classmethod
+    def for_host(cls, url_or_host, rate=None, burst=None, lowest=False):
+        """
+        호스트별 공유 리미터 반환 (없으면 생성)
+
+        Args:
+            url_or_host: URL 또는 호스트명
+            rate: 초당 허용 요청 수 (지정 시 기존 리미터 설정 변경)
+            burst: 최대 버스트 크기
+            lowest: True면 기존 리미터를 덮어쓰지 않고 더 낮은 값일 때만 반영
+                    (같은 호스트를 쓰는 여러 수집기 중 가장 보수적인 설정 유지)
+        """
+        host = urlparse(url_or_host).netloc or url_or_host
+        with cls._registry_lock:
+            limiter = cls._registry.get(host)
+            if limiter is None:
+                limiter = cls(rate or 2.0, burst)
+                cls._registry[host] = limiter
+                return limiter
+
+        if lowest:
+            limiter.tighten(rate, burst)
+        else:
+            limiter.configure(rate, burst)
+        return limiter
@@ -0,0 +1,344 @@
+import os
+import re
+import json
+import time
+import random
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# 녹화한 응답 파일 이름 (fixtures 폴더 안에 있으면 합성 응답 대신 사용)
+FIXTURE_FILES = {
+    'rss': 'rss.json',
+    'lookup': 'lookup.json',
+    'play_page': 'play_page.html',
+    'play_collection': 'play_collection.txt',
+    'play_details': 'play_details.html'
+}
+
+# 오류 주입 시 Play 요청에 돌려줄 봇 확인 페이지
+CHALLENGE_PAGE = '<html><body>Our systems have detected unusual traffic from your computer network.</body></html>'
+
+
+def build_rss_entry(index):
+    """iTunes RSS 피드 항목 하나 (실제 피드와 같은 구조)"""
+    app_id = str(1000000 + index)
+    return {
+        'im:name': {'label': f"Replay App {index}"},
+        'im:artist': {'label': f"Replay Developer {index % 37}"},
+        'category': {'attributes': {'im:id': '6014', 'label': ('Games', 'Finance', 'Social Networking')[index % 3]}},
+        'im:price': {'label': '0.00', 'attributes': {'amount': '0.00', 'currency': 'USD'}},
+        'im:releaseDate': {'label': '2024-01-01T00:00:00-07:00'},
+        'id': {'label': f"https://apps.apple.com/app/id{app_id}",
+               'attributes': {'im:id': app_id, 'im:bundleId': f"com.replay{index % 37}.app{index}"}},
+        'link': [{'attributes': {'rel': 'alternate', 'type': 'text/html',
+                                 'href': f"https://apps.apple.com/app/id{app_id}"}}],
+        'im:image': [{'label': f"https://is1.example/{app_id}/{size}x{size}.png", 'attributes': {'height': str(size)}}
+                     for size in (53, 75, 100)],
+        'summary': {'label': f"Replay App {index} summary. " * 40},
+        'rights': {'label': f"© 2024 Replay Developer {index % 37}"}
+    }
+
+
+def build_lookup_result(index):
+    """iTunes /lookup 결과 항목 하나"""
+    return {
+        'trackId': 1000000 + index,
+        'version': f"{index % 9}.{index % 5}.0",
+        'fileSizeBytes': str(50000000 + index * 1000),
+        'averageUserRating': 3.5 + (index % 15) / 10,
+        'userRatingCount': 1000 + index * 37,
+        'contentAdvisoryRating': '4+',
+        'description': f"Replay App {index} description line.\n" * 120,
+        'screenshotUrls': [f"https://is1.example/{index}/screen{n}.png" for n in range(8)],
+        'languageCodesISO2A': ['EN', 'JA', 'KO', 'ZH'],
+        'genres': ['Games', 'Puzzle'],
+        'minimumOsVersion': '15.0',
+        'currentVersionReleaseDate': '2024-06-01T00:00:00Z',
+        'artistViewUrl': f"https://apps.apple.com/developer/id{index % 37}",
+        'supportUrl': f"https://replay{index % 37}.example/support"
+    }
+
+
+def build_play_entry(index):
+    """구글 플레이 컬렉션 항목 하나 (GooglePlayParser.ENTRY_PATHS 위치에 값 배치)"""
+    app_id = f"com.replay{index % 37}.app{index}"
+    info = [None] * 15
+    info[0] = [app_id, 7]
+    info[1] = [None, 2, [512, 512], [None, None, f"https://play-lh.example/{app_id}"]]
+    info[3] = f"Replay Play App {index}"
+    info[4] = [f"{4.0 + (index % 10) / 10:.1f}", 4.0 + (index % 10) / 10]
+    info[8] = [None, [[0, 'KRW', '']]]
+    info[10] = [None, None, None, None, [None, None, f"/store/apps/details?id={app_id}"]]
+    info[13] = [None, f"Replay Play App {index} summary"]
+    info[14] = f"Replay Developer {index % 37}"
+    return [info]
+
+
+def build_init_data_script(key, data):
+    """페이지에 포함되는 AF_initDataCallback 블록"""
+    return (f"<script class=\"ds:{key[3:]}\" nonce=\"x\">AF_initDataCallback({{key: '{key}', hash: '1', "
+            f"data:{json.dumps(data, ensure_ascii=False)}, sideChannel: {{}}}});</script>")
+
+
+def build_play_page(count=30):
+    """구조화 데이터에 앞쪽 순위만 들어 있는 컬렉션 페이지 (나머지는 컬렉션 요청으로 받음)"""
+    entries = [build_play_entry(index) for index in range(count)]
+    return ("<!doctype html><html><head><title>Replay Play</title></head><body>"
+            + build_init_data_script('ds:3', [None, [[None, [None, [entries]]]]])
+            + "</body></html>")
+
+
+def build_play_collection(count=200):
+    """batchexecute(vyAe2) 응답 본문"""
+    entries = [build_play_entry(index) for index in range(count)]
+    payload = [[None, [[None] * 28 + [[entries]]]]]
+    envelope = [['wrb.fr', 'vyAe2', json.dumps(payload, ensure_ascii=False), None, None, None, 'generic']]
+    body = json.dumps(envelope, ensure_ascii=False)
+    return f")]}}'\n\n{len(body)}\n{body}\n"
+
+
+def build_play_details(index=0):
+    """상세 페이지 (ds:5 블록에 평점/평점 수/설치 수/업데이트 시각)"""
+    detail = [None] * 146
+    detail[13] = [f"{(index % 9 + 1) * 100000:,}+", 1, (index % 9 + 1) * 100000]
+    detail[51] = [[None, 4.3], None, [None, 12000 + index]]
+    detail[145] = [[None, [1717200000, 0]]]
+    return ("<!doctype html><html><head><title>Replay Details</title></head><body>"
+            + build_init_data_script('ds:5', [None, [None, None, detail]])
+            + "</body></html>")
+
+
+class ReplayServer:
+    def __init__(self, fixtures_dir=None, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503,
+                 challenge_rate=0.0, budget=None, host='127.0.0.1', port=0, seed=None):
+        """
+        네트워크 없이 벤치마크를 돌리기 위한 로컬 HTTP 대역 서버
+
+        iTunes RSS 피드, /lookup, 구글 플레이 컬렉션 페이지/컬렉션 데이터 요청/상세 페이지를
+        녹화한 응답(fixtures_dir) 또는 같은 구조의 합성 응답으로 돌려준다.
+        요청마다 지연과 오류(HTTP 오류, 봇 확인 페이지)를 주입할 수 있다.
+        프록시 형식(절대 URL) 요청도 같은 응답으로 처리하므로, 여러 개를 띄워 프록시 대역으로 쓸 수 있다.
+
+        Args:
+            fixtures_dir: 녹화한 응답 폴더 (FIXTURE_FILES 이름, 없는 파일은 합성 응답 사용)
+            latency: 요청당 기본 지연 (초)
+            jitter: 기본 지연에 더할 무작위 지연 최대값 (초)
+            error_rate: error_status로 응답할 확률 (0~1)
+            error_status: 주입할 HTTP 상태 코드
+            challenge_rate: Play 요청에 봇 확인 페이지를 돌려줄 확률 (0~1)
+            budget: 클라이언트 주소별 초당 허용 Play 요청 수 (넘으면 봇 확인 페이지, None이면 제한 없음)
+            host, port: 바인드 주소 (port=0이면 빈 포트 자동 선택)
+            seed: 지연/오류 주입용 난수 시드
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.challenge_rate = challenge_rate
+        self.budget = budget
+        self._budgets = {}  # 클라이언트 주소 -> [남은 요청 수, 갱신 시각]
+        self.stats = {'requests': 0, 'errors': 0, 'challenges': 0, 'bytes': 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+        self.fixtures = self._load_fixtures(fixtures_dir)
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                server.handle(self, 'GET')
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                self.rfile.read(length)
+                server.handle(self, 'POST')
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _load_fixtures(self, fixtures_dir):
+        """녹화한 응답을 읽고, 없는 항목은 합성 응답으로 채움"""
+        fixtures = {
+            'rss': [build_rss_entry(index) for index in range(200)],
+            'lookup': [build_lookup_result(index) for index in range(200)],
+            'play_page': build_play_page(),
+            'play_collection': build_play_collection(),
+            'play_details': build_play_details()
+        }
+        if not fixtures_dir:
+            return fixtures
+
+        for name, filename in FIXTURE_FILES.items():
+            path = os.path.join(fixtures_dir, filename)
+            if not os.path.exists(path):
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                if name == 'rss':
+                    fixtures[name] = json.load(f)['feed']['entry']
+                elif name == 'lookup':
+                    fixtures[name] = json.load(f)['results']
+                else:
+                    fixtures[name] = f.read()
+        return fixtures
+
+    def start(self):
+        """백그라운드 스레드에서 서버 시작"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def handle(self, request, method):
+        """경로에 맞는 응답을 골라 지연/오류를 주입한 뒤 전송"""
+        parsed = urlparse(request.path)
+        query = parse_qs(parsed.query)
+        is_play = parsed.path.startswith('/store/apps') or parsed.path.startswith('/_/PlayStoreUi')
+
+        with self._lock:
+            self.stats['requests'] += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+            inject_error = self._random.random() < self.error_rate
+            inject_challenge = self._random.random() < self.challenge_rate
+            if self.budget and is_play and not inject_challenge:
+                inject_challenge = not self._spend_budget(request.client_address[0])
+        if delay:
+            time.sleep(delay)
+
+        if inject_error:
+            with self._lock:
+                self.stats['errors'] += 1
+            return self.send(request, self.error_status, b'', 'text/plain', {'Retry-After': '0'})
+
+        if '/rss/' in parsed.path:
+            return self.send_json(request, {'feed': {'entry': self.get_rss_entries(parsed.path)}})
+        if parsed.path == '/lookup':
+            ids = (query.get('id') or [''])[0].split(',')
+            results = self.get_lookup_results(ids)
+            return self.send_json(request, {'resultCount': len(results), 'results': results})
+
+        if is_play:
+            if inject_challenge:
+                with self._lock:
+                    self.stats['challenges'] += 1
+                return self.send(request, 200, CHALLENGE_PAGE.encode('utf-8'), 'text/html; charset=utf-8')
+            if parsed.path.endswith('/batchexecute') and method == 'POST':
+                body = self.fixtures['play_collection']
+                return self.send(request, 200, body.encode('utf-8'), 'application/json; charset=utf-8')
+            if parsed.path == '/store/apps/details':
+                body = self.fixtures['play_details']
+            else:
+                body = self.fixtures['play_page']
+            return self.send(request, 200, body.encode('utf-8'), 'text/html; charset=utf-8')
+
+        return self.send(request, 404, b'', 'text/plain')
+
+    def _spend_budget(self, address):
+        """주소별 허용량에서 요청 하나를 차감 (남은 허용량이 없으면 False, 잠금 안에서 호출)"""
+        now = time.monotonic()
+        tokens, updated = self._budgets.get(address, (self.budget, now))
+        tokens = min(self.budget, tokens + (now - updated) * self.budget)
+        allowed = tokens >= 1
+        self._budgets[address] = [tokens - 1 if allowed else tokens, now]
+        return allowed
+
+    def get_rss_entries(self, path):
+        """피드 경로의 limit만큼 항목 반환 (녹화 항목이 모자라면 ID를 바꿔 반복)"""
+        match = re.search(r'limit=(\d+)', path)
+        limit = int(match.group(1)) if match else 100
+        recorded = self.fixtures['rss']
+        if limit <= len(recorded):
+            return recorded[:limit]
+        entries = list(recorded)
+        for index in range(len(recorded), limit):
+            entry = json.loads(json.dumps(recorded[index % len(recorded)]))
+            entry['id']['attributes']['im:id'] = str(1000000 + index)
+            entries.append(entry)
+        return entries
+
+    def get_lookup_results(self, ids):
+        """요청한 ID마다 녹화 결과 하나를 골라 trackId만 바꿔 반환"""
+        recorded = self.fixtures['lookup']
+        results = []
+        for app_id in ids:
+            if not app_id.isdigit():
+                continue
+            result = dict(recorded[int(app_id) % len(recorded)])
+            result['trackId'] = int(app_id)
+            results.append(result)
+        return results
+
+    def send_json(self, request, data):
+        return self.send(request, 200, json.dumps(data, ensure_ascii=False).encode('utf-8'),
+                         'application/json; charset=utf-8')
+
+    def send(self, request, status, body, content_type, headers=None):
+        with self._lock:
+            self.stats['bytes'] += len(body)
+        request.send_response(status)
+        request.send_header('Content-Type', content_type)
+        request.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            request.send_header(name, value)
+        request.end_headers()
+        request.wfile.write(body)
+
+    @staticmethod
+    def record_fixtures(fixtures_dir, client, country='kr', app_id='com.google.android.youtube'):
+        """
+        실제 서버 응답을 fixtures_dir에 녹화 (네트워크가 있을 때 한 번만 실행)
+
+        Args:
+            fixtures_dir: 저장할 폴더
+            client: 요청에 사용할 HttpClient
+            country: 녹화할 국가 코드
+            app_id: 상세 페이지를 녹화할 Play 앱 패키지명
+
+        Returns:
+            list: 저장한 파일 경로
+        """
+        from GooglePlayParser import PLAY_BASE_URL, build_collection_request
+
+        os.makedirs(fixtures_dir, exist_ok=True)
+        rss = client.get(f"https://itunes.apple.com/{country}/rss/topfreeapplications/limit=200/json").json()
+        ids = [entry['id']['attributes']['im:id'] for entry in rss['feed']['entry']]
+        lookup = client.get("https://itunes.apple.com/lookup",
+                            params={'id': ','.join(ids[:100]), 'country': country, 'entity': 'software'}).json()
+        play_page = client.get(f"{PLAY_BASE_URL}/store/apps/collection/topselling_free",
+                               params={'gl': country.upper()}).text
+        play_collection = client.post(f"{PLAY_BASE_URL}/_/PlayStoreUi/data/batchexecute",
+                                      data=build_collection_request('topselling_free', 'APPLICATION', 200),
+                                      params={'rpcids': 'vyAe2', 'source-path': '/store/apps', 'hl': 'ko',
+                                              'gl': country.upper(), 'rt': 'c'}).text
+        play_details = client.get(f"{PLAY_BASE_URL}/store/apps/details", params={'id': app_id}).text
+
+        contents = {'rss': json.dumps(rss, ensure_ascii=False), 'lookup': json.dumps(lookup, ensure_ascii=False),
+                    'play_page': play_page, 'play_collection': play_collection, 'play_details': play_details}
+        paths = []
+        for name, content in contents.items():
+            path = os.path.join(fixtures_dir, FIXTURE_FILES[name])
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            paths.append(path)
+        print(f"녹화 완료: {fixtures_dir} ({len(paths)}개 파일)")
+        return paths
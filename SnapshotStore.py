@@ -0,0 +1,215 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    store TEXT NOT NULL,
+    country TEXT NOT NULL,
+    chart TEXT NOT NULL,
+    taken_at TEXT NOT NULL,
+    app_count INTEGER NOT NULL,
+    PRIMARY KEY (store, country, chart, taken_at)
+);
+CREATE TABLE IF NOT EXISTS chart_entries (
+    store TEXT NOT NULL,
+    country TEXT NOT NULL,
+    chart TEXT NOT NULL,
+    taken_at TEXT NOT NULL,
+    app_id TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    name TEXT,
+    developer TEXT,
+    category TEXT,
+    price TEXT,
+    rating REAL,
+    rating_count INTEGER,
+    version TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_chart_entries_snapshot
+    ON chart_entries (store, country, chart, taken_at, app_id);
+CREATE INDEX IF NOT EXISTS idx_chart_entries_app
+    ON chart_entries (app_id, store, country, chart, taken_at);
+"""
+
+ENTRY_COLUMNS = ('store', 'country', 'chart', 'taken_at', 'app_id', 'rank', 'name', 'developer',
+                 'category', 'price', 'rating', 'rating_count', 'version')
+
+
+class SnapshotStore:
+    def __init__(self, db_path=os.path.join("exports", "snapshots.db")):
+        """
+        차트 스냅샷을 누적 저장하는 SQLite 저장소 (추가 전용)
+
+        (store, country, chart, taken_at, app_id) 인덱스로
+        앱별 순위 추이와 두 스냅샷 사이의 순위 변화를 빠르게 조회한다.
+
+        Args:
+            db_path: SQLite 파일 경로
+        """
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def append(self, store, country, chart, apps, taken_at=None):
+        """
+        스냅샷 하나 추가
+
+        Args:
+            store: 스토어 이름 (appstore, googleplay)
+            country: 국가 코드
+            chart: 차트 이름
+            apps: 순위 순서의 앱 정보 리스트
+            taken_at: 수집 시각 (기본값: 현재 시각)
+
+        Returns:
+            str: 저장된 스냅샷의 수집 시각
+        """
+        taken_at = taken_at or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        rows = []
+        for i, app in enumerate(apps, 1):
+            if not app.get('app_id'):
+                continue
+            rows.append((
+                store, country, chart, taken_at, str(app['app_id']), app.get('rank') or i,
+                app.get('name'), app.get('artist') or app.get('developer'), app.get('category'),
+                app.get('price'), self._to_number(app.get('rating'), float),
+                self._to_number(app.get('rating_count'), int), app.get('version')
+            ))
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO snapshots (store, country, chart, taken_at, app_count) VALUES (?, ?, ?, ?, ?)",
+                (store, country, chart, taken_at, len(rows))
+            )
+            self._conn.execute(
+                "DELETE FROM chart_entries WHERE store = ? AND country = ? AND chart = ? AND taken_at = ?",
+                (store, country, chart, taken_at)
+            )
+            self._conn.executemany(
+                f"INSERT INTO chart_entries ({', '.join(ENTRY_COLUMNS)}) VALUES ({', '.join('?' * len(ENTRY_COLUMNS))})",
+                rows
+            )
+        return taken_at
+
+    def list_snapshots(self, store, country, chart):
+        """스냅샷 수집 시각 목록 (오래된 순)"""
+        return [row['taken_at'] for row in self._query(
+            "SELECT taken_at FROM snapshots WHERE store = ? AND country = ? AND chart = ? ORDER BY taken_at",
+            (store, country, chart)
+        )]
+
+    def get_snapshot(self, store, country, chart, taken_at):
+        """스냅샷 하나의 순위 목록"""
+        return [dict(row) for row in self._query(
+            "SELECT * FROM chart_entries WHERE store = ? AND country = ? AND chart = ? AND taken_at = ? ORDER BY rank",
+            (store, country, chart, taken_at)
+        )]
+
+    def fetch_entries(self, stores=None, countries=None, charts=None, since=None, until=None):
+        """
+        여러 스냅샷의 순위 항목을 한 번에 조회 (분석용)
+
+        Args:
+            stores, countries, charts: 포함할 값 목록 (None이면 전체)
+            since, until: 조회 구간 ('YYYY-MM-DD HH:MM:SS' 형식 문자열)
+
+        Returns:
+            list: ENTRY_COLUMNS 순서의 튜플 리스트
+        """
+        sql = f"SELECT {', '.join(ENTRY_COLUMNS)} FROM chart_entries WHERE 1 = 1"
+        params = []
+        for column, values in (('store', stores), ('country', countries), ('chart', charts)):
+            if values:
+                values = [values] if isinstance(values, str) else list(values)
+                sql += f" AND {column} IN ({', '.join('?' * len(values))})"
+                params.extend(values)
+        if since:
+            sql += " AND taken_at >= ?"
+            params.append(since)
+        if until:
+            sql += " AND taken_at <= ?"
+            params.append(until)
+        with self._lock:
+            # 대량 조회이므로 sqlite3.Row 대신 일반 튜플로 받음
+            cursor = self._conn.cursor()
+            cursor.row_factory = None
+            return cursor.execute(sql, params).fetchall()
+
+    def rank_history(self, app_id, store, country, chart, since=None, until=None):
+        """
+        앱 하나의 순위 추이
+
+        Args:
+            since, until: 조회 구간 ('YYYY-MM-DD HH:MM:SS' 형식 문자열)
+
+        Returns:
+            list: [{'taken_at', 'rank'}, ...] (시간 순)
+        """
+        sql = ("SELECT taken_at, rank FROM chart_entries "
+               "WHERE app_id = ? AND store = ? AND country = ? AND chart = ?")
+        params = [str(app_id), store, country, chart]
+        if since:
+            sql += " AND taken_at >= ?"
+            params.append(since)
+        if until:
+            sql += " AND taken_at <= ?"
+            params.append(until)
+        sql += " ORDER BY taken_at"
+        return [dict(row) for row in self._query(sql, params)]
+
+    def rank_deltas(self, store, country, chart, from_taken_at=None, to_taken_at=None):
+        """
+        두 스냅샷 사이의 순위 변화 (기본값: 가장 최근 두 스냅샷)
+
+        Returns:
+            list: [{'app_id', 'name', 'rank', 'previous_rank', 'delta'}, ...]
+                  새로 진입한 앱은 previous_rank가, 빠진 앱은 rank가 None
+        """
+        if not from_taken_at or not to_taken_at:
+            snapshots = self.list_snapshots(store, country, chart)
+            if len(snapshots) < 2:
+                return []
+            from_taken_at = from_taken_at or snapshots[-2]
+            to_taken_at = to_taken_at or snapshots[-1]
+
+        previous = {row['app_id']: row for row in self.get_snapshot(store, country, chart, from_taken_at)}
+        current = {row['app_id']: row for row in self.get_snapshot(store, country, chart, to_taken_at)}
+
+        deltas = []
+        for app_id, row in current.items():
+            previous_rank = previous[app_id]['rank'] if app_id in previous else None
+            deltas.append({
+                'app_id': app_id,
+                'name': row['name'],
+                'rank': row['rank'],
+                'previous_rank': previous_rank,
+                'delta': previous_rank - row['rank'] if previous_rank is not None else None
+            })
+        for app_id, row in previous.items():
+            if app_id not in current:
+                deltas.append({'app_id': app_id, 'name': row['name'], 'rank': None,
+                               'previous_rank': row['rank'], 'delta': None})
+        return deltas
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _query(self, sql, params):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _to_number(self, value, cast):
+        """'N/A' 같은 값은 None으로 저장"""
+        try:
+            return cast(value) if value not in (None, '') else None
+        except (TypeError, ValueError):
+            return None
@@ -0,0 +1,110 @@
+import os
+import csv
+import gzip
+import FastJson
+import time
+from Metrics import get_metrics
+
+# 확장자 -> (형식, gzip 압축 여부)
+FORMATS = {
+    '.jsonl': ('jsonl', False),
+    '.jsonl.gz': ('jsonl', True),
+    '.csv': ('csv', False),
+    '.csv.gz': ('csv', True)
+}
+
+
+class StreamingExporter:
+    def __init__(self, filepath, fieldnames=None, append=False, blob_store=None):
+        """
+        레코드를 수집되는 즉시 한 줄씩 기록하는 내보내기 클래스
+
+        전체 리스트를 메모리에 모으지 않고 레코드마다 flush하므로
+        수집 도중 중단되어도 그때까지의 결과가 파일에 남는다.
+
+        Args:
+            filepath: 저장 경로 (.jsonl, .jsonl.gz, .csv, .csv.gz)
+            fieldnames: CSV 컬럼 목록 (없으면 첫 레코드의 키 사용)
+            append: True면 기존 파일 뒤에 이어서 기록 (CSV 헤더는 빈 파일일 때만 기록)
+            blob_store: 큰 필드를 내용 해시 참조로 바꿔 기록할 BlobStore (선택)
+        """
+        self.filepath = filepath
+        self.format, self.compressed = self.get_format(filepath)
+        self.fieldnames = list(fieldnames) if fieldnames else None
+        self.append = append
+        self.blob_store = blob_store
+        self.count = 0
+        self.write_seconds = 0.0
+        self._file = None
+        self._writer = None
+        self._has_header = False
+
+    @staticmethod
+    def get_format(filepath):
+        """파일 확장자로 (형식, 압축 여부) 판단"""
+        for extension, fmt in sorted(FORMATS.items(), key=lambda item: -len(item[0])):
+            if filepath.endswith(extension):
+                return fmt
+        raise ValueError(f"지원하지 않는 스트리밍 형식: {filepath}")
+
+    @staticmethod
+    def is_supported(filepath):
+        return any(filepath.endswith(extension) for extension in FORMATS)
+
+    def open(self):
+        if os.path.dirname(self.filepath):
+            os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
+        existing = self.append and os.path.exists(self.filepath) and os.path.getsize(self.filepath) > 0
+        mode = 'a' if self.append else 'w'
+        if self.compressed:
+            self._file = gzip.open(self.filepath, mode + 't', encoding='utf-8', newline='')
+        else:
+            encoding = 'utf-8-sig' if self.format == 'csv' and not existing else 'utf-8'
+            self._file = open(self.filepath, mode, encoding=encoding, newline='')
+        self._has_header = existing
+        return self
+
+    def write(self, record):
+        """레코드 하나 기록 후 flush"""
+        if self._file is None:
+            self.open()
+
+        started = time.perf_counter()
+        if self.blob_store:
+            record = self.blob_store.pack(record)
+        if self.format == 'jsonl':
+            self._file.write(FastJson.dumps(record) + '\n')
+        else:
+            if self._writer is None:
+                self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames or list(record.keys()),
+                                              extrasaction='ignore')
+                if not self._has_header:
+                    self._writer.writeheader()
+            # 리스트/딕셔너리 값은 JSON 문자열로 기록
+            self._writer.writerow({
+                key: FastJson.dumps(value) if isinstance(value, (list, dict)) else value
+                for key, value in record.items()
+            })
+
+        self._file.flush()
+        self.count += 1
+        self.write_seconds += time.perf_counter() - started
+
+    def write_all(self, records):
+        for record in records:
+            self.write(record)
+
+    def close(self):
+        """파일을 닫고 기록한 레코드 수/쓰기 시간을 지표에 반영"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            fmt = self.format + ('.gz' if self.compressed else '')
+            get_metrics().increment('exported_records_total', self.count, format=fmt)
+            get_metrics().observe('export_write_seconds', self.write_seconds, format=fmt)
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
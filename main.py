@@ -1,9 +1,20 @@
 import os
-from AppStoreTopScraper import AppStoreTopScraper
-from GooglePlayStoreTopScraper import GooglePlayStoreTopScraper
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from MatrixScheduler import MatrixScheduler, CHART_TYPES, STREAM_TYPES
+from SnapshotStore import SnapshotStore
+from StreamingExporter import StreamingExporter
+from Metrics import get_metrics, profile
 from datetime import datetime
 
+# 스크래퍼 모듈은 선택한 스토어만 불러옴 (requests/lxml/pandas 로딩을 실제 수집 시점으로 미룸)
+
 def run_appstore():
+    from AppStoreTopScraper import AppStoreTopScraper
+
     # 오늘 날짜 형식 생성
     today = datetime.now().strftime("%Y%m%d")  # 20250813 형식
     country = input("앱스토어 국가 코드 입력 (예: kr, us, jp) [기본값: kr]: ").strip() or "kr"
@@ -11,13 +22,22 @@ def run_appstore():
     limit = int(limit) if limit.isdigit() else 100
     chart_type = input("차트 타입 입력 (topfreeapplications, toppaidapplications, topgrossingapplications) [기본값: topfreeapplications]: ").strip() or "topfreeapplications"
 
-    scraper = AppStoreTopScraper(country=country, limit=limit)
+    scraper = AppStoreTopScraper(country=country, limit=limit, snapshot_store=SnapshotStore())
+    save_type = input("저장 형식 선택 (csv/json/jsonl/jsonl.gz/csv.gz) [기본값: csv]: ").strip().lower() or "csv"
+    filename = input(f"저장 파일명 입력 (확장자 제외) [기본값: appstore_top_apps_{today}]: ").strip() or f"appstore_top_apps_{today}"
+    export_dir = os.path.join("exports")
+    os.makedirs(export_dir, exist_ok=True)
+
+    if save_type in STREAM_TYPES:
+        # 상세 정보가 붙는 즉시 한 줄씩 기록
+        filepath = os.path.join(export_dir, filename + "." + save_type)
+        with scraper.open_stream(filepath) as sink:
+            scraper.scrape_top_apps_with_details(chart_type=chart_type, sink=sink)
+        print(f"스트리밍 저장 완료: {filepath} ({sink.count}개)")
+        return
+
     apps = scraper.scrape_top_apps_with_details(chart_type=chart_type)
     if apps:
-        save_type = input("저장 형식 선택 (csv/json) [기본값: csv]: ").strip().lower() or "csv"
-        filename = input(f"저장 파일명 입력 (확장자 제외) [기본값: appstore_top_apps_{today}]: ").strip() or f"appstore_top_apps_{today}"
-        export_dir = os.path.join("exports")
-        os.makedirs(export_dir, exist_ok=True)
         filepath = os.path.join(export_dir, filename + (".json" if save_type == "json" else ".csv"))
         if save_type == "json":
             scraper.save_to_json(apps, filepath)
@@ -25,15 +45,23 @@ def run_appstore():
             scraper.save_to_csv(apps, filepath)
 
 def run_googleplay():
+    from GooglePlayStoreTopScraper import GooglePlayStoreTopScraper
+
     # 오늘 날짜 형식 생성
     today = datetime.now().strftime("%Y%m%d")  # 20250813 형식
     print("구글 플레이스토어 Top 앱 정보 수집 시작...")
-    apps = GooglePlayStoreTopScraper.get_google_play_top_apps()
+    apps = GooglePlayStoreTopScraper.get_google_play_top_apps(snapshot_store=SnapshotStore())
     if apps:
-        save_type = input("저장 형식 선택 (csv/json) [기본값: csv]: ").strip().lower() or "csv"
+        save_type = input("저장 형식 선택 (csv/json/jsonl/jsonl.gz/csv.gz) [기본값: csv]: ").strip().lower() or "csv"
         filename = input(f"저장 파일명 입력 (확장자 제외) [기본값: googleplay_top_apps_{today}]: ").strip() or f"googleplay_top_apps_{today}"
         export_dir = os.path.join("exports")
         os.makedirs(export_dir, exist_ok=True)
+        if save_type in STREAM_TYPES:
+            filepath = os.path.join(export_dir, filename + "." + save_type)
+            with StreamingExporter(filepath) as sink:
+                sink.write_all(apps)
+            print(f"스트리밍 저장 완료: {filepath}")
+            return
         filepath = os.path.join(export_dir, filename + (".json" if save_type == "json" else ".csv"))
         if save_type == "json":
             GooglePlayStoreTopScraper.save_to_json(apps, filepath)
@@ -42,12 +70,31 @@ def run_googleplay():
     else:
         print("앱 정보를 수집하지 못했습니다.")
 
+def run_matrix():
+    countries = input("국가 코드 목록 입력 (쉼표 구분) [기본값: kr,us,jp]: ").strip() or "kr,us,jp"
+    chart_types = input(f"차트 타입 목록 입력 (쉼표 구분) [기본값: {','.join(CHART_TYPES)}]: ").strip() or ",".join(CHART_TYPES)
+    genres = input("장르 목록 입력 (all, games 또는 장르 ID, 쉼표 구분) [기본값: all]: ").strip() or "all"
+    limit = input("셀당 수집할 앱 개수 입력 (최대 200) [기본값: 100]: ").strip()
+    limit = int(limit) if limit.isdigit() else 100
+    save_type = input("저장 형식 선택 (csv/json/jsonl/jsonl.gz/csv.gz) [기본값: csv]: ").strip().lower() or "csv"
+
+    scheduler = MatrixScheduler(
+        countries=[c.strip() for c in countries.split(",") if c.strip()],
+        chart_types=[c.strip() for c in chart_types.split(",") if c.strip()],
+        genres=[g.strip() for g in genres.split(",") if g.strip()],
+        limit=limit,
+        save_type=save_type,
+        snapshot_store=SnapshotStore()
+    )
+    scheduler.run()
+
 def main():
     print("수집할 스토어를 선택하세요:")
     print("1. Apple App Store")
     print("2. Google Play Store")
     print("3. 둘 다")
-    choice = input("번호 입력 (1/2/3): ").strip()
+    print("4. 앱스토어 매트릭스 (국가 × 차트 × 장르)")
+    choice = input("번호 입력 (1/2/3/4): ").strip()
 
     if choice == "1":
         run_appstore()
@@ -56,8 +103,264 @@ def main():
     elif choice == "3":
         run_appstore()
         run_googleplay()
+    elif choice == "4":
+        run_matrix()
     else:
         print("잘못된 입력입니다. 프로그램을 종료합니다.")
 
+# 배치 실행 기본값 (설정 파일 < 명령행 인자 순으로 덮어씀)
+BATCH_DEFAULTS = {
+    'stores': ['appstore', 'googleplay'],
+    'countries': ['kr'],
+    'charts': ['topfreeapplications'],
+    'genres': ['all'],
+    'limit': 100,
+    'format': 'csv',
+    'details': True,
+    'incremental': False,
+    'output_dir': 'exports',
+    'summary': None,
+    'fields': None,
+    'compact': False,
+    'assets': False,
+    'blobs': False,
+    'egress': None,
+    'watch': None,
+    'events': None,
+    'metrics': None,
+    'profile': None
+}
+
+# 배치 저장 형식 (스트리밍 형식 + json/csv)
+BATCH_FORMATS = ('csv', 'json') + STREAM_TYPES
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="앱스토어/구글 플레이 Top 차트 배치 수집 (입력 없이 실행)")
+    parser.add_argument('--config', help="설정 파일 (JSON, 키는 아래 옵션 이름과 같음)")
+    parser.add_argument('--stores', nargs='+', choices=list(BATCH_RUNNERS), help="수집할 스토어")
+    parser.add_argument('--countries', nargs='+', help="국가 코드 목록 (예: kr us jp)")
+    parser.add_argument('--charts', nargs='+', choices=list(CHART_TYPES), help="앱스토어 차트 타입 목록")
+    parser.add_argument('--genres', nargs='+', help="앱스토어 장르 목록 (all, games 또는 장르 ID)")
+    parser.add_argument('--limit', type=int, help="차트당 수집할 앱 개수 (최대 200)")
+    parser.add_argument('--format', choices=BATCH_FORMATS, help="저장 형식")
+    parser.add_argument('--no-details', dest='details', action='store_false', default=None, help="상세 정보 수집 생략")
+    parser.add_argument('--incremental', action='store_true', default=None, help="앱스토어 증분 상세 수집")
+    parser.add_argument('--fields', nargs='+', help="레코드에 남길 필드 (예: name artist rating, 생략 시 전체)")
+    parser.add_argument('--compact', action='store_true', default=None, help="json 형식을 들여쓰기 없이 저장")
+    parser.add_argument('--assets', action='store_true', default=None,
+                        help="아이콘/스크린샷을 output-dir/assets에 내려받고 매니페스트 저장")
+    parser.add_argument('--blobs', action='store_true', default=None,
+                        help="설명/요약/스크린샷/언어를 output-dir/blobs.db에 한 번만 저장하고 파일에는 참조만 기록")
+    parser.add_argument('--egress', nargs='+',
+                        help="구글 플레이 요청을 나눠 보낼 출구 목록 (프록시 URL, source:IP, direct)")
+    parser.add_argument('--watch', type=float,
+                        help="감시 모드: 이 주기(초)마다 차트를 확인해 바뀐 내용만 이벤트로 기록 (종료: Ctrl+C)")
+    parser.add_argument('--events', help="감시 모드 이벤트를 이어서 기록할 JSONL 파일 (기본값: output-dir/chart_events.jsonl)")
+    parser.add_argument('--output-dir', help="결과 저장 폴더")
+    parser.add_argument('--summary', help="실행 요약을 저장할 JSON 파일")
+    parser.add_argument('--metrics', help="단계별 지표를 저장할 파일 (.prom이면 Prometheus textfile, 그 외 JSON)")
+    parser.add_argument('--profile', help="cProfile 통계를 저장할 파일 (.prof, 지정 시 스토어를 차례로 수집)")
+    return parser
+
+def load_batch_options(args, parser):
+    """
+    기본값, 설정 파일, 명령행 인자를 합친 배치 옵션
+
+    설정 파일 값은 argparse의 choices 검사를 거치지 않으므로 합친 뒤 다시 확인하고,
+    허용되지 않는 값이 있으면 사용법 오류로 종료한다.
+    """
+    options = dict(BATCH_DEFAULTS)
+    if args.config:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            options.update({key.replace('-', '_'): value for key, value in json.load(f).items()})
+    options.update({key: value for key, value in vars(args).items() if key != 'config' and value is not None})
+
+    for key, allowed in (('stores', BATCH_RUNNERS), ('charts', CHART_TYPES)):
+        if not isinstance(options[key], list):
+            parser.error(f"{key}: 목록이어야 합니다 (현재 값: {options[key]!r})")
+        invalid = [value for value in options[key] if value not in allowed]
+        if invalid:
+            parser.error(f"{key}: 알 수 없는 값 {', '.join(map(str, invalid))} (허용: {', '.join(allowed)})")
+    if not options['stores']:
+        parser.error("수집할 스토어가 없습니다: stores에 appstore, googleplay 중 하나 이상을 지정하세요")
+    if options['format'] not in BATCH_FORMATS:
+        parser.error(f"format: 알 수 없는 형식 {options['format']!r} (허용: {', '.join(BATCH_FORMATS)})")
+    return options
+
+def run_appstore_batch(options):
+    """앱스토어 국가 × 차트 × 장르 수집 (MatrixScheduler 사용)"""
+    scheduler = MatrixScheduler(
+        countries=options['countries'],
+        chart_types=options['charts'],
+        genres=options['genres'],
+        limit=options['limit'],
+        fetch_details=options['details'],
+        save_type=options['format'],
+        export_dir=os.path.join(options['output_dir'], "appstore"),
+        incremental=options['incremental'],
+        snapshot_store=SnapshotStore(os.path.join(options['output_dir'], "snapshots.db")),
+        fields=options['fields'],
+        compact=options['compact'],
+        asset_downloader=options.get('asset_downloader'),
+        blob_store=options.get('blob_store')
+    )
+    results = scheduler.run()
+    return {
+        'files': [result['filepath'] for result in results if result['filepath']],
+        'count': sum(result['count'] for result in results),
+        'errors': [f"{r['country']}/{r['chart_type']}/{r['genre']}: {r['error']}" for r in results if r['error']]
+    }
+
+def run_googleplay_batch(options):
+    """구글 플레이 국가별 수집"""
+    from GooglePlayStoreTopScraper import GooglePlayStoreTopScraper
+
+    today = datetime.now().strftime("%Y%m%d")
+    export_dir = os.path.join(options['output_dir'], "googleplay")
+    os.makedirs(export_dir, exist_ok=True)
+    snapshot_store = SnapshotStore(os.path.join(options['output_dir'], "snapshots.db"))
+    asset_downloader = options.get('asset_downloader')
+    blob_store = options.get('blob_store')
+    # 출구 풀이 있으면 클라이언트와 페이서 역할을 함께 맡음 (없으면 기본값)
+    egress_pool = options.get('egress_pool')
+
+    summary = {'files': [], 'count': 0, 'errors': []}
+    for country in options['countries']:
+        apps = GooglePlayStoreTopScraper.get_google_play_top_apps(
+            country=country, limit=options['limit'], fetch_details=options['details'], snapshot_store=snapshot_store,
+            fields=options['fields'], client=egress_pool, pacer=egress_pool)
+        if not apps:
+            summary['errors'].append(f"{country}: 앱 정보 수집 실패")
+            continue
+
+        filepath = os.path.join(export_dir, f"googleplay_{country}_{today}.{options['format']}")
+        if options['format'] in STREAM_TYPES:
+            with StreamingExporter(filepath, blob_store=blob_store) as sink:
+                sink.write_all(apps)
+        elif options['format'] == "json":
+            GooglePlayStoreTopScraper.save_to_json(apps, filepath, compact=options['compact'], blob_store=blob_store)
+        else:
+            GooglePlayStoreTopScraper.save_to_csv(apps, filepath, blob_store=blob_store)
+        if asset_downloader:
+            asset_downloader.download_records(apps, manifest_path=asset_downloader.manifest_path_for(filepath))
+        summary['files'].append(filepath)
+        summary['count'] += len(apps)
+    return summary
+
+# 스토어별 배치 실행 함수 (stores 옵션에 허용되는 값)
+BATCH_RUNNERS = {
+    'appstore': run_appstore_batch,
+    'googleplay': run_googleplay_batch
+}
+
+def run_store_batch(store, options):
+    """스토어 하나를 실행하고 소요 시간/오류를 포함한 요약 반환"""
+    started = time.monotonic()
+    try:
+        summary = BATCH_RUNNERS[store](options)
+    except Exception as e:
+        summary = {'files': [], 'count': 0, 'errors': [f"{type(e).__name__}: {e}"]}
+    summary['store'] = store
+    summary['ok'] = not summary['errors'] and summary['count'] > 0
+    summary['elapsed'] = round(time.monotonic() - started, 2)
+    return summary
+
+def run_watch(options):
+    """감시 모드: 한 프로세스에서 차트를 계속 확인하며 변화 이벤트만 기록"""
+    from ChartWatcher import ChartWatcher
+
+    targets = ChartWatcher.make_targets(options['stores'], options['countries'], options['charts'], options['genres'])
+    events = options['events'] or os.path.join(options['output_dir'], "chart_events.jsonl")
+    watcher = ChartWatcher(targets, interval=options['watch'], output=events, limit=options['limit'],
+                           cache_dir=os.path.join(options['output_dir'], ".watch_cache"))
+    stats = watcher.run()
+    if options['metrics']:
+        get_metrics().save(options['metrics'])
+    # 한 번도 차트를 받지 못했으면(모든 확인 실패) cron/감시 도구가 알 수 있도록 실패로 종료
+    return 1 if stats['checks'] and stats['failures'] == stats['checks'] else 0
+
+def run_batch(argv):
+    """
+    입력 없이 실행하는 배치 모드 (cron 등)
+
+    선택한 스토어들을 동시에 수집하고, 모두 성공하면 0, 하나라도 실패하면 1을 반환한다.
+    """
+    parser = build_parser()
+    options = load_batch_options(parser.parse_args(argv), parser)
+    if options['watch']:
+        return run_watch(options)
+    if options['assets']:
+        # 두 스토어가 같은 저장소를 써야 같은 이미지가 한 번만 저장됨
+        from AssetDownloader import AssetDownloader
+        options['asset_downloader'] = AssetDownloader(os.path.join(options['output_dir'], "assets"))
+    if options['blobs']:
+        from BlobStore import BlobStore
+        options['blob_store'] = BlobStore(os.path.join(options['output_dir'], "blobs.db"))
+    if options['egress'] and 'googleplay' in options['stores']:
+        from urllib.parse import urlparse
+        from EgressPool import EgressPool
+        from GooglePlayParser import PLAY_BASE_URL
+        try:
+            options['egress_pool'] = EgressPool(options['egress'], host=urlparse(PLAY_BASE_URL).netloc,
+                                                state_path=os.path.join(options['output_dir'], ".play_pacer.json"))
+        except ValueError as e:
+            parser.error(f"egress: {e}")
+    started_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    started = time.monotonic()
+
+    if options['profile']:
+        # cProfile은 호출한 스레드만 측정하므로 프로파일링할 때는 스토어를 이 스레드에서 차례로 수집
+        with profile(options['profile']):
+            summaries = [run_store_batch(store, options) for store in options['stores']]
+    else:
+        with ThreadPoolExecutor(max_workers=len(options['stores'])) as executor:
+            summaries = list(executor.map(lambda store: run_store_batch(store, options), options['stores']))
+    if options.get('egress_pool'):
+        # 출구별 학습 속도를 다음 실행에 이어 쓰도록 저장하고 커넥션 정리
+        options['egress_pool'].save()
+        options['egress_pool'].close()
+
+    metrics = get_metrics()
+    run_summary = {
+        'started_at': started_at,
+        'elapsed': round(time.monotonic() - started, 2),
+        'ok': all(summary['ok'] for summary in summaries),
+        'stores': summaries,
+        'stages': [{'store': store, 'stage': stage, 'count': count, 'seconds': round(seconds, 3)}
+                   for (store, stage), (count, seconds) in sorted(metrics.summary().items())],
+        'requests': metrics.get_counter('http_requests_total'),
+        'retries': metrics.get_counter('http_retries_total')
+    }
+
+    print("\n=== 실행 요약 ===")
+    for summary in summaries:
+        status = "성공" if summary['ok'] else "실패"
+        print(f"{summary['store']}: {status} - {summary['count']}개 앱, 파일 {len(summary['files'])}개, {summary['elapsed']}초")
+        for error in summary['errors']:
+            print(f"  오류: {error}")
+    print(f"HTTP 요청 {run_summary['requests']}회, 재시도 {run_summary['retries']}회")
+    if options.get('blob_store'):
+        blob_stats = options['blob_store'].stats
+        print(f"blob 저장 {blob_stats['stored']}개, 중복 {blob_stats['deduplicated']}개, "
+              f"절약 {blob_stats['bytes_saved']:,} 바이트")
+    if options.get('egress_pool'):
+        for egress in options['egress_pool'].status():
+            print(f"  출구 {egress['name']}: {egress['rate']}/s, 요청 {egress['requests']}회, "
+                  f"차단 {egress['blocked']}회, 오류 {egress['errors']}회, 격리 {egress['quarantined']}회")
+    for stage in run_summary['stages']:
+        print(f"  {stage['store']}/{stage['stage']}: {stage['count']}회, 누적 {stage['seconds']}초")
+    print(f"전체 소요 시간: {run_summary['elapsed']}초")
+
+    if options['metrics']:
+        metrics.save(options['metrics'])
+
+    if options['summary']:
+        with open(options['summary'], 'w', encoding='utf-8') as f:
+            json.dump(run_summary, f, ensure_ascii=False, indent=2)
+
+    return 0 if run_summary['ok'] else 1
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(run_batch(sys.argv[1:]))
     main()
\ No newline at end of file